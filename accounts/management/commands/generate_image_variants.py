@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from linkedin_project.images import generate_variants, image_fields, variants_ready
+
+
+class Command(BaseCommand):
+    help = "Génère les déclinaisons (srcset) des images déjà téléversées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Régénère aussi les déclinaisons existantes")
+
+    def handle(self, *args, **options):
+        generated = failed = 0
+        for model, field, preset in image_fields():
+            instances = model.objects.exclude(**{field: ''}).only('pk', field)
+            for instance in instances.iterator(chunk_size=500):
+                file = getattr(instance, field)
+                if not options['force'] and variants_ready(file, preset):
+                    continue
+                try:
+                    generate_variants(file, preset)
+                except (OSError, Image.DecompressionBombError) as exc:
+                    failed += 1
+                    self.stderr.write(f"  {file.name} : {exc}")
+                    continue
+                generated += 1
+            self.stdout.write(f"{model._meta.verbose_name_plural} ({field}) traités")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Déclinaisons générées pour {generated} image(s), {failed} échec(s)"
+        ))
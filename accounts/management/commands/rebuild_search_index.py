@@ -0,0 +1,16 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from accounts.models import UserSkill, Experience
+from accounts.search import get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des utilisateurs"
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        rebuild_index(User, UserSkill, Experience)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Index reconstruit ({backend.__class__.__name__}, {User.objects.count()} utilisateur(s))"
+        ))
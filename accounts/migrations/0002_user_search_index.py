@@ -0,0 +1,99 @@
+from django.db import migrations
+
+# Instantané de accounts/search.py au moment de la migration : la migration ne
+# dépend pas du code courant, qui peut évoluer (commande rebuild_search_index)
+SEARCH_TABLE = 'accounts_user_search'
+
+CREATE_SQL = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "name, username, bio, skills, companies, "
+        "tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    'postgresql': [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "user_id bigint PRIMARY KEY REFERENCES auth_user (id) ON DELETE CASCADE, "
+        "document tsvector NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_gin ON {SEARCH_TABLE} USING GIN (document)",
+    ],
+}
+
+INSERT_SQL = {
+    'sqlite': (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, name, username, bio, skills, companies) "
+        "VALUES (%s, %s, %s, %s, %s, %s)"
+    ),
+    'postgresql': (
+        f"INSERT INTO {SEARCH_TABLE} (user_id, document) VALUES (%s, "
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C')) "
+        "ON CONFLICT (user_id) DO UPDATE SET document = EXCLUDED.document"
+    ),
+}
+
+BATCH_SIZE = 1000
+
+
+def iter_rows(apps, vendor):
+    """Paramètres d'insertion de chaque utilisateur, par lots de BATCH_SIZE"""
+    User = apps.get_model('auth', 'User')
+    UserSkill = apps.get_model('accounts', 'UserSkill')
+    Experience = apps.get_model('accounts', 'Experience')
+
+    ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        skills = {}
+        for user_id, name in UserSkill.objects.filter(user_id__in=batch).values_list('user_id', 'skill__name'):
+            skills.setdefault(user_id, []).append(name)
+        companies = {}
+        for user_id, company in Experience.objects.filter(user_id__in=batch).values_list('user_id', 'company'):
+            companies.setdefault(user_id, []).append(company)
+
+        rows = []
+        users = User.objects.filter(id__in=batch).values_list(
+            'id', 'first_name', 'last_name', 'username', 'profile__bio'
+        )
+        for user_id, first_name, last_name, username, bio in users:
+            name = f'{first_name} {last_name}'.strip()
+            user_skills = ' '.join(skills.get(user_id, []))
+            user_companies = ' '.join(companies.get(user_id, []))
+            if vendor == 'sqlite':
+                rows.append((user_id, name, username, bio or '', user_skills, user_companies))
+            else:
+                rows.append((user_id, name, username, user_skills, user_companies, bio or ''))
+        yield rows
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE_SQL:
+        # Autres bases : recherche par filtres icontains, sans index
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in CREATE_SQL[vendor]:
+            cursor.execute(sql)
+        for rows in iter_rows(apps, vendor):
+            cursor.executemany(INSERT_SQL[vendor], rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in CREATE_SQL:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
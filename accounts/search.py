@@ -0,0 +1,258 @@
+"""
+Index de recherche plein texte des utilisateurs.
+
+Chaque utilisateur est indexé avec son nom, son username, sa bio, ses compétences
+et les entreprises de ses expériences. Selon la base de données :
+
+- SQLite : table virtuelle FTS5 (rowid = id de l'utilisateur), classement bm25 ;
+- PostgreSQL : colonne tsvector pondérée avec index GIN, classement ts_rank ;
+- autres : repli sur des filtres icontains.
+
+L'index est tenu à jour par les signaux de accounts/signals.py.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'accounts_user_search'
+
+# Nombre maximal de termes pris en compte dans une recherche
+MAX_TERMS = 8
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def iter_documents(User, UserSkill, Experience, user_ids=None, batch_size=1000):
+    """Documents à indexer, par lots de batch_size utilisateurs"""
+    users = User.objects.order_by('id')
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    ids = list(users.values_list('id', flat=True))
+
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        skills = {}
+        for user_id, name in UserSkill.objects.filter(user_id__in=batch).values_list('user_id', 'skill__name'):
+            skills.setdefault(user_id, []).append(name)
+        companies = {}
+        for user_id, company in Experience.objects.filter(user_id__in=batch).values_list('user_id', 'company'):
+            companies.setdefault(user_id, []).append(company)
+
+        rows = User.objects.filter(id__in=batch).values_list(
+            'id', 'first_name', 'last_name', 'username', 'profile__bio'
+        )
+        for user_id, first_name, last_name, username, bio in rows:
+            yield {
+                'user_id': user_id,
+                'name': f'{first_name} {last_name}'.strip(),
+                'username': username,
+                'bio': bio or '',
+                'skills': ' '.join(skills.get(user_id, [])),
+                'companies': ' '.join(companies.get(user_id, [])),
+            }
+
+
+class BaseSearchBackend:
+    """Interface commune des index de recherche"""
+
+    def create_index(self, cursor):
+        """
+        Crée les structures de l'index. La migration 0002_user_search_index en
+        garde sa propre copie : une modification ici demande une nouvelle migration.
+        """
+
+    def drop_index(self, cursor):
+        """Supprime les structures de l'index"""
+
+    def write(self, cursor, documents):
+        """Insère ou remplace les documents donnés"""
+
+    def delete(self, cursor, user_ids):
+        """Retire des utilisateurs de l'index"""
+
+    def filter(self, queryset, query):
+        """
+        Filtre un queryset d'utilisateurs sur la recherche et l'annote avec
+        search_rank (plus grand = plus pertinent).
+        """
+        raise NotImplementedError
+
+    def no_results(self, queryset):
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Recherche sans index, par filtres icontains"""
+
+    def filter(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.no_results(queryset)
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(first_name__icontains=term) |
+                Q(last_name__icontains=term) |
+                Q(username__icontains=term) |
+                Q(profile__bio__icontains=term)
+            )
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Table virtuelle FTS5"""
+
+    # Poids bm25 des colonnes : name, username, bio, skills, companies
+    WEIGHTS = '10.0, 10.0, 1.0, 4.0, 4.0'
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "name, username, bio, skills, companies, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def write(self, cursor, documents):
+        documents = list(documents)
+        self.delete(cursor, [document['user_id'] for document in documents])
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, username, bio, skills, companies) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [
+                (d['user_id'], d['name'], d['username'], d['bio'], d['skills'], d['companies'])
+                for d in documents
+            ]
+        )
+
+    def delete(self, cursor, user_ids):
+        for user_id in user_ids:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [user_id])
+
+    def filter(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.no_results(queryset)
+        # Chaque terme est une recherche par préfixe, tous les termes sont requis
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+        ).annotate(search_rank=RawSQL(
+            f"SELECT -bm25({SEARCH_TABLE}, {self.WEIGHTS}) FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = \"{table}\".\"id\"",
+            [match],
+            output_field=FloatField()
+        ))
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """Colonne tsvector pondérée et index GIN"""
+
+    DOCUMENT_SQL = (
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C')"
+    )
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "user_id bigint PRIMARY KEY REFERENCES auth_user (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_gin ON {SEARCH_TABLE} USING GIN (document)"
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def write(self, cursor, documents):
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (user_id, document) VALUES (%s, {self.DOCUMENT_SQL}) "
+            "ON CONFLICT (user_id) DO UPDATE SET document = EXCLUDED.document",
+            [
+                (d['user_id'], d['name'], d['username'], d['skills'], d['companies'], d['bio'])
+                for d in documents
+            ]
+        )
+
+    def delete(self, cursor, user_ids):
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE user_id = ANY(%s)", [list(user_ids)])
+
+    def filter(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.no_results(queryset)
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT user_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s)",
+                [tsquery]
+            )
+        ).annotate(search_rank=RawSQL(
+            f"SELECT ts_rank(document, to_tsquery('simple', %s)) FROM {SEARCH_TABLE} "
+            f"WHERE user_id = \"{table}\".\"id\"",
+            [tsquery],
+            output_field=FloatField()
+        ))
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(vendor=None):
+    """Index adapté à la base de données utilisée"""
+    return BACKENDS.get(vendor or connection.vendor, FallbackSearchBackend)()
+
+
+def search_users(queryset, query):
+    """Utilisateurs correspondant à la recherche, du plus pertinent au moins pertinent"""
+    return get_search_backend().filter(queryset, query).order_by('-search_rank', 'id')
+
+
+def index_users(user_ids):
+    """Met à jour l'index pour les utilisateurs donnés"""
+    from django.contrib.auth.models import User
+    from .models import UserSkill, Experience
+
+    backend = get_search_backend()
+    with connection.cursor() as cursor:
+        backend.write(cursor, iter_documents(User, UserSkill, Experience, user_ids=user_ids))
+
+
+def unindex_users(user_ids):
+    """Retire des utilisateurs de l'index"""
+    with connection.cursor() as cursor:
+        get_search_backend().delete(cursor, user_ids)
+
+
+def rebuild_index(User, UserSkill, Experience):
+    """Recrée et remplit entièrement l'index"""
+    backend = get_search_backend()
+    with connection.cursor() as cursor:
+        backend.drop_index(cursor)
+        backend.create_index(cursor)
+        batch = []
+        for document in iter_documents(User, UserSkill, Experience):
+            batch.append(document)
+            if len(batch) >= 1000:
+                backend.write(cursor, batch)
+                batch = []
+        if batch:
+            backend.write(cursor, batch)
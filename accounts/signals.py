@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from linkedin_project.images import discard_variants, file_name, schedule_variants
+from .models import Profile, Skill, UserSkill, Experience
+from .search import index_users, unindex_users
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # La mise à jour de last_login à chaque connexion ne touche pas l'index
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    index_users([instance.id])
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    unindex_users([instance.id])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=UserSkill)
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=UserSkill)
+@receiver(post_delete, sender=Experience)
+def user_document_changed(sender, instance, **kwargs):
+    index_users([instance.user_id])
+
+
+@receiver(post_init, sender=Skill)
+def remember_skill_name(sender, instance, **kwargs):
+    instance._initial_name = instance.name
+
+
+@receiver(post_save, sender=Skill)
+def skill_saved(sender, instance, created, **kwargs):
+    if not created and instance._initial_name != instance.name:
+        index_users(list(instance.user_skills.values_list('user_id', flat=True)))
+    instance._initial_name = instance.name
+
+
+@receiver(post_init, sender=Profile)
+def remember_profile_pictures(sender, instance, **kwargs):
+    instance._initial_pictures = {
+        field: file_name(instance, field) for field in ('profile_picture', 'cover_picture')
+    }
+
+
+@receiver(post_save, sender=Profile)
+def profile_pictures_saved(sender, instance, **kwargs):
+    for field, preset in (('profile_picture', 'avatar'), ('cover_picture', 'cover')):
+        schedule_variants(instance, field, instance._initial_pictures[field], preset)
+        instance._initial_pictures[field] = file_name(instance, field)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_pictures_deleted(sender, instance, **kwargs):
+    discard_variants(instance._initial_pictures['profile_picture'], 'avatar')
+    discard_variants(instance._initial_pictures['cover_picture'], 'cover')
@@ -0,0 +1,37 @@
+from django import template
+from django.utils.html import format_html
+
+from linkedin_project.images import variant_urls
+
+register = template.Library()
+
+# Emplacement réservé (gris uni) affiché pendant le traitement d'une image
+PLACEHOLDER = (
+    "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 1 1'%3E"
+    "%3Crect width='1' height='1' fill='%23e9ecef'/%3E%3C/svg%3E"
+)
+
+
+@register.simple_tag
+def responsive_image(file, preset, size):
+    """
+    Attributs src, srcset et sizes d'une image déclinée, affichée sur size
+    pixels (ou selon une valeur sizes CSS) :
+
+        <img {% responsive_image post.image 'post' 600 %} alt="...">
+
+    Tant que les déclinaisons ne sont pas prêtes, un emplacement réservé est
+    affiché à la place de l'original.
+    """
+    variants = variant_urls(file, preset)
+    if not variants:
+        return format_html('src="{}" data-image-pending', PLACEHOLDER)
+
+    if isinstance(size, int):
+        src = next((url for width, url in variants if width >= size), variants[-1][1])
+        sizes = f'{size}px'
+    else:
+        src = variants[-1][1]
+        sizes = size
+    srcset = ', '.join(f'{url} {width}w' for width, url in variants)
+    return format_html('src="{}" srcset="{}" sizes="{}"', src, srcset, sizes)
@@ -1,3 +1,194 @@
-from django.test import TestCase
+import tempfile
+from importlib import import_module
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from io import BytesIO, StringIO
+from unittest import mock
+from PIL import Image
 
-# Create your tests here.
+from jobs.queue import run_pending
+from linkedin_project.images import variant_name
+from posts.models import Post
+from .models import Profile, Skill, UserSkill, Experience
+from .search import search_users
+
+
+class UserSearchTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', first_name='Alice', last_name='Martin')
+        Profile.objects.create(user=self.alice, bio="Développeuse backend")
+        self.bob = User.objects.create_user('bob', first_name='Bob', last_name='Durand')
+        Profile.objects.create(user=self.bob, bio="Chef de projet, parle de Martin Luther")
+        self.django = Skill.objects.create(name='Django')
+
+    def search(self, query):
+        return list(search_users(User.objects.all(), query).values_list('username', flat=True))
+
+    def test_prefix_and_accents(self):
+        self.assertEqual(self.search('mart'), ['alice', 'bob'])
+        self.assertEqual(self.search('developpeuse'), ['alice'])
+        self.assertEqual(self.search('alice mar'), ['alice'])
+        self.assertEqual(self.search('   '), [])
+
+    def test_index_follows_skills_and_experiences(self):
+        UserSkill.objects.create(user=self.bob, skill=self.django)
+        Experience.objects.create(user=self.alice, company='Linkedong', position='Dev', start_date='2024-01-01')
+        self.assertEqual(self.search('djan'), ['bob'])
+        self.assertEqual(self.search('linkedong'), ['alice'])
+
+        self.django.name = 'Flask'
+        self.django.save()
+        self.assertEqual(self.search('djan'), [])
+        self.assertEqual(self.search('flask'), ['bob'])
+
+        self.bob.delete()
+        self.assertEqual(self.search('flask'), [])
+
+    def test_rebuild_command(self):
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('durand'), ['bob'])
+
+    def test_migration_backfill(self):
+        UserSkill.objects.create(user=self.bob, skill=self.django)
+        migration = import_module('accounts.migrations.0002_user_search_index')
+        schema_editor = mock.Mock(connection=connection)
+        migration.drop_search_index(apps, schema_editor)
+        migration.create_search_index(apps, schema_editor)
+        self.assertEqual(self.search('durand'), ['bob'])
+        self.assertEqual(self.search('djan'), ['bob'])
+        self.assertEqual(self.search('developpeuse'), ['alice'])
+
+
+def upload(name, size, exif=None, color='steelblue'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG', exif=exif or Image.Exif())
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageVariantsTest(TestCase):
+    """Déclinaisons des images téléversées, traitées par la file de tâches"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+        self.user = User.objects.create_user('alice')
+
+    def sizes(self, name, preset_widths):
+        result = []
+        for width in preset_widths:
+            with default_storage.open(variant_name(name, width)) as file, Image.open(file) as image:
+                result.append(image.size)
+        return result
+
+    def test_upload_generates_variants(self):
+        # Orientation 6 : photo prise en portrait, à tourner de 90°
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        profile = Profile.objects.create(user=self.user, profile_picture=upload('photo.jpg', (1200, 800), exif))
+        post = Post.objects.create(author=self.user, content='Bonjour', image=upload('post.jpg', (700, 350)))
+        self.assertFalse(default_storage.exists(variant_name(post.image.name, 480)))
+        original = profile.profile_picture.name
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_pending(), (2, 0))
+
+        # L'original avec ses métadonnées est remplacé par une copie sans EXIF
+        profile.refresh_from_db()
+        self.assertNotEqual(profile.profile_picture.name, original)
+        self.assertFalse(default_storage.exists(original))
+        self.assertEqual(self.sizes(profile.profile_picture.name, [48, 320]), [(48, 48), (320, 320)])
+        with default_storage.open(profile.profile_picture.name) as file, Image.open(file) as image:
+            self.assertEqual((image.size, dict(image.getexif())), ((800, 1200), {}))
+        # Jamais d'agrandissement au-delà de l'original
+        self.assertEqual(self.sizes(post.image.name, [480, 960, 1440]), [(480, 240), (700, 350), (700, 350)])
+
+    def test_placeholder_until_variants_are_ready(self):
+        profile = Profile.objects.create(user=self.user, profile_picture=upload('photo.jpg', (400, 400)))
+        template = Template("{% load images %}<img {% responsive_image picture 'avatar' 60 %}>")
+
+        html = template.render(Context({'picture': profile.profile_picture}))
+        self.assertIn('data-image-pending', html)
+        self.assertNotIn(profile.profile_picture.url, html)
+
+        call_command('run_jobs', '--burst', stdout=StringIO())
+        html = template.render(Context({'picture': profile.profile_picture}))
+        self.assertIn('.96w.', html.split('srcset')[0])
+        self.assertIn('sizes="60px"', html)
+        self.assertEqual(html.count('w, '), 3)
+
+    def test_replaced_picture_drops_old_variants(self):
+        profile = Profile.objects.create(user=self.user, profile_picture=upload('old.jpg', (400, 400)))
+        run_pending()
+        old = variant_name(profile.profile_picture.name, 96)
+        self.assertTrue(default_storage.exists(old))
+
+        profile.profile_picture = upload('new.jpg', (400, 400))
+        profile.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_pending()
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(default_storage.exists(variant_name(profile.profile_picture.name, 96)))
+
+    def test_failed_job_keeps_the_original(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        profile = Profile.objects.create(user=self.user, profile_picture=upload('photo.jpg', (400, 400), exif))
+        original = profile.profile_picture.name
+        with mock.patch('linkedin_project.images.generate_variants', side_effect=OSError):
+            with self.captureOnCommitCallbacks(execute=True), self.assertLogs('jobs.queue', 'ERROR'):
+                self.assertEqual(run_pending(), (0, 1))
+
+        # Le champ désigne toujours l'original, et la copie annulée est supprimée
+        profile.refresh_from_db()
+        self.assertEqual(profile.profile_picture.name, original)
+        self.assertTrue(default_storage.exists(original))
+        self.assertEqual(default_storage.listdir('profile_pics')[1], ['photo.jpg'])
+
+    def test_variants_deleted_only_when_delete_commits(self):
+        post = Post.objects.create(author=self.user, content='Bonjour', image=upload('post.jpg', (700, 350)))
+        run_pending()
+        variant = variant_name(post.image.name, 480)
+
+        # Suppression annulée : les déclinaisons restent en place
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Post.objects.filter(id=post.id).delete()
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertTrue(default_storage.exists(variant))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertFalse(default_storage.exists(variant))
+
+    def test_same_stem_uploads_keep_their_own_variants(self):
+        alice = Profile.objects.create(user=self.user, profile_picture=upload('photo.jpg', (400, 400), color='red'))
+        bob = Profile.objects.create(
+            user=User.objects.create_user('bob'), profile_picture=upload('photo.png', (400, 400), color='blue')
+        )
+        run_pending()
+        alice_variant = variant_name(alice.profile_picture.name, 96)
+        self.assertNotEqual(alice_variant, variant_name(bob.profile_picture.name, 96))
+        with default_storage.open(alice_variant) as file, Image.open(file) as image:
+            red, green, blue = image.convert('RGB').getpixel((0, 0))
+            self.assertGreater(red, blue)
+
+        # Les déclinaisons de l'un survivent au remplacement de la photo de l'autre
+        bob.profile_picture = upload('other.jpg', (400, 400))
+        bob.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_pending()
+        self.assertTrue(default_storage.exists(alice_variant))
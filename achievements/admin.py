@@ -1,3 +1,28 @@
 from django.contrib import admin
+from .models import Trophy, UserTrophy, AchievementCounters
 
-# Register your models here.
+class TrophyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'metric', 'required_count')
+    list_filter = ('metric',)
+    search_fields = ('name', 'description')
+    ordering = ('metric', 'required_count')
+
+class UserTrophyAdmin(admin.ModelAdmin):
+    list_display = ('user', 'trophy', 'earned_at')
+    list_filter = ('trophy', 'earned_at')
+    search_fields = ('user__username', 'trophy__name')
+    ordering = ('-earned_at',)
+    readonly_fields = ('earned_at',)
+    date_hierarchy = 'earned_at'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'trophy')
+
+class AchievementCountersAdmin(admin.ModelAdmin):
+    list_display = ('user', 'likes_received', 'posts_count', 'connections_count')
+    search_fields = ('user__username',)
+    readonly_fields = ('likes_received', 'posts_count', 'connections_count')
+
+admin.site.register(Trophy, TrophyAdmin)
+admin.site.register(UserTrophy, UserTrophyAdmin)
+admin.site.register(AchievementCounters, AchievementCountersAdmin)
@@ -0,0 +1,157 @@
+"""
+Moteur d'attribution des trophées.
+
+Chaque événement (réaction reçue, publication, connexion acceptée) ajuste un
+compteur de AchievementCounters par un UPDATE atomique. Quand le compteur
+augmente, seuls les trophées dont le seuil vient d'être franchi sont cherchés,
+par l'index (metric, required_count) : l'historique de l'utilisateur n'est
+jamais relu. Un trophée obtenu reste acquis si le compteur redescend.
+
+record_events applique de la même façon les événements d'une action groupée
+(acceptation de demandes en masse) en un nombre fixe de requêtes.
+
+rebuild_counters et award_all recalculent tout en quelques requêtes
+ensemblistes, pour les données antérieures (commande backfill_achievements).
+"""
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from connections.models import ConnectionEdge
+from posts.models import Post, Reaction
+from .models import AchievementCounters, Trophy, UserTrophy
+
+# Compteur -> champ de AchievementCounters
+METRIC_FIELDS = {
+    'LIKES_RECEIVED': 'likes_received',
+    'POSTS': 'posts_count',
+    'CONNECTIONS': 'connections_count',
+}
+
+
+def record_event(user_id, metric, delta=1):
+    """
+    Ajoute delta au compteur de l'utilisateur et attribue les trophées dont le
+    seuil vient d'être franchi ; retourne les trophées attribués.
+    """
+    field = METRIC_FIELDS[metric]
+    counters = AchievementCounters.objects.filter(user_id=user_id)
+    if not counters.update(**{field: Greatest(F(field) + delta, Value(0))}) and delta > 0:
+        # Premier événement de l'utilisateur (les données antérieures sont reprises par le backfill)
+        try:
+            with transaction.atomic():
+                AchievementCounters.objects.create(user_id=user_id, **{field: delta})
+        except IntegrityError:
+            # Ligne créée entre-temps par une requête concurrente
+            counters.update(**{field: Greatest(F(field) + delta, Value(0))})
+    if delta <= 0:
+        return []
+
+    value = counters.values_list(field, flat=True).first()
+    trophies = list(Trophy.objects.filter(
+        metric=metric,
+        required_count__gt=value - delta,
+        required_count__lte=value
+    ))
+    if trophies:
+        UserTrophy.objects.bulk_create(
+            [UserTrophy(user_id=user_id, trophy=trophy) for trophy in trophies],
+            ignore_conflicts=True
+        )
+    return trophies
+
+
+def record_events(metric, deltas, batch_size=500):
+    """
+    Version groupée de record_event pour deltas {user_id: delta} : un UPDATE
+    groupé, l'insertion des compteurs manquants et une recherche des trophées
+    par lot d'utilisateurs, quel que soit leur nombre. Retourne le nombre de
+    trophées attribués.
+    """
+    field = METRIC_FIELDS[metric]
+    trophies = None
+    awarded = 0
+    items = [(user_id, delta) for user_id, delta in deltas.items() if delta]
+    for start in range(0, len(items), batch_size):
+        batch = dict(items[start:start + batch_size])
+        by_delta = defaultdict(list)
+        for user_id, delta in batch.items():
+            by_delta[delta].append(user_id)
+        counters = AchievementCounters.objects.filter(user_id__in=batch)
+        existing = set(counters.values_list('user_id', flat=True))
+        counters.update(**{field: Greatest(F(field) + Case(
+            *[When(user_id__in=user_ids, then=Value(delta)) for delta, user_ids in by_delta.items()],
+            default=Value(0)
+        ), Value(0))})
+        AchievementCounters.objects.bulk_create([
+            AchievementCounters(user_id=user_id, **{field: delta})
+            for user_id, delta in batch.items() if delta > 0 and user_id not in existing
+        ], ignore_conflicts=True)
+
+        gained = {user_id: delta for user_id, delta in batch.items() if delta > 0}
+        if not gained:
+            continue
+        if trophies is None:
+            trophies = list(Trophy.objects.filter(metric=metric))
+        values = AchievementCounters.objects.filter(user_id__in=gained).values_list('user_id', field)
+        awards = [
+            UserTrophy(user_id=user_id, trophy=trophy)
+            for user_id, value in values
+            for trophy in trophies
+            if value - gained[user_id] < trophy.required_count <= value
+        ]
+        awarded += len(UserTrophy.objects.bulk_create(awards, ignore_conflicts=True))
+    return awarded
+
+
+def _count_subquery(queryset, field):
+    """Sous-requête corrélée comptant les lignes liées à l'utilisateur courant"""
+    counts = queryset.filter(**{field: OuterRef('user_id')}).order_by().values(field).annotate(
+        count=Count('id')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def rebuild_counters(batch_size=5000):
+    """
+    Recalcule les compteurs de tous les utilisateurs : une insertion des lignes
+    manquantes puis un seul UPDATE avec des sous-requêtes corrélées.
+    Retourne le nombre de compteurs mis à jour.
+    """
+    existing = AchievementCounters.objects.values('user_id')
+    missing = User.objects.exclude(id__in=existing).values_list('id', flat=True).iterator(chunk_size=batch_size)
+    batch = []
+    for user_id in missing:
+        batch.append(AchievementCounters(user_id=user_id))
+        if len(batch) >= batch_size:
+            AchievementCounters.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    AchievementCounters.objects.bulk_create(batch, ignore_conflicts=True)
+
+    return AchievementCounters.objects.update(
+        # Les réactions à ses propres publications ne comptent pas
+        likes_received=_count_subquery(Reaction.objects.exclude(user=F('post__author')), 'post__author'),
+        posts_count=_count_subquery(Post.objects.all(), 'author'),
+        connections_count=_count_subquery(ConnectionEdge.objects.filter(status='ACCEPTED'), 'user'),
+    )
+
+
+def award_all(batch_size=5000):
+    """Attribue tous les trophées mérités d'après les compteurs ; retourne le nombre de nouveaux trophées"""
+    before = UserTrophy.objects.count()
+    for trophy in Trophy.objects.all():
+        field = METRIC_FIELDS[trophy.metric]
+        user_ids = AchievementCounters.objects.filter(
+            **{f'{field}__gte': trophy.required_count}
+        ).exclude(user__trophies__trophy=trophy).values_list('user_id', flat=True)
+        batch = []
+        for user_id in user_ids.iterator(chunk_size=batch_size):
+            batch.append(UserTrophy(user_id=user_id, trophy=trophy))
+            if len(batch) >= batch_size:
+                UserTrophy.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        UserTrophy.objects.bulk_create(batch, ignore_conflicts=True)
+    return UserTrophy.objects.count() - before
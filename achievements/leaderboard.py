@@ -0,0 +1,118 @@
+"""
+Classements des auteurs les plus appréciés.
+
+Les réactions reçues sont comptées par auteur et par journée (LikeBucket) au
+moment où elles sont ajoutées ou retirées. Un classement n'agrège donc que les
+tranches de sa période, jamais la table Reaction : quelques dizaines de lignes
+par auteur au lieu de toutes ses réactions.
+
+Chaque classement est matérialisé dans LeaderboardEntry par refresh_leaderboard
+(commande refresh_leaderboards, à planifier). get_leaderboard lit le top N et
+le rang d'un utilisateur en une requête, par les index (board, rank) et
+(board, user).
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from posts.models import Reaction
+from .models import LeaderboardEntry, LikeBucket
+
+EPOCH = date(1970, 1, 1)
+
+LEADERBOARD_SIZE = 10
+
+
+def day_bucket(dt=None):
+    """Journée (jours depuis l'epoch, UTC) d'une date, aujourd'hui par défaut"""
+    if dt is None:
+        dt = timezone.now()
+    if isinstance(dt, datetime):
+        dt = dt.astimezone(dt_timezone.utc).date()
+    return (dt - EPOCH).days
+
+
+def board_start(board, now=None):
+    """Première journée prise en compte par un classement"""
+    if now is None:
+        now = timezone.now()
+    if board == 'week':
+        return day_bucket(now) - 6
+    if board == 'month':
+        return day_bucket(now.astimezone(dt_timezone.utc).date().replace(day=1))
+    raise ValueError(f"Classement inconnu : {board}")
+
+
+def record_likes(author_id, delta, when=None):
+    """Ajoute delta aux réactions reçues par l'auteur pendant la journée de when (date ou datetime)"""
+    bucket = day_bucket(when)
+    if delta > 0:
+        LikeBucket.objects.bulk_create([LikeBucket(author_id=author_id, bucket=bucket)], ignore_conflicts=True)
+    LikeBucket.objects.filter(author_id=author_id, bucket=bucket).update(
+        count=Greatest(F('count') + delta, Value(0))
+    )
+
+
+def received_reactions(reactions):
+    """Réactions (hors réactions à ses propres posts) groupées par auteur et par journée"""
+    rows = reactions.exclude(user=F('post__author')).annotate(
+        day=TruncDate('created_at', tzinfo=dt_timezone.utc)
+    ).values('post__author', 'day').annotate(count=Count('id')).order_by()
+    for row in rows:
+        yield row['post__author'], row['day'], row['count']
+
+
+def rebuild_like_buckets(batch_size=5000):
+    """Recalcule toutes les tranches en une requête groupée ; retourne le nombre de tranches"""
+    LikeBucket.objects.all().delete()
+    buckets = LikeBucket.objects.bulk_create(
+        (
+            LikeBucket(author_id=author_id, bucket=day_bucket(day), count=count)
+            for author_id, day, count in received_reactions(Reaction.objects.all())
+        ),
+        batch_size=batch_size
+    )
+    return len(buckets)
+
+
+def refresh_leaderboard(board, now=None, batch_size=5000):
+    """Recalcule un classement à partir des tranches de sa période ; retourne le nombre d'entrées"""
+    scores = LikeBucket.objects.filter(
+        bucket__gte=board_start(board, now),
+        count__gt=0
+    ).values('author').annotate(score=Sum('count')).order_by('-score', 'author')
+    refreshed_at = timezone.now()
+    entries = (
+        LeaderboardEntry(board=board, rank=rank, user_id=row['author'], score=row['score'],
+                         refreshed_at=refreshed_at)
+        for rank, row in enumerate(scores.iterator(chunk_size=batch_size), start=1)
+    )
+    # Les lecteurs voient l'ancien classement jusqu'à la validation
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(board=board).delete()
+        return len(LeaderboardEntry.objects.bulk_create(entries, batch_size=batch_size))
+
+
+def refresh_leaderboards(now=None):
+    """Recalcule tous les classements ; retourne {classement: nombre d'entrées}"""
+    return {board: refresh_leaderboard(board, now) for board, _ in LeaderboardEntry.BOARD_CHOICES}
+
+
+def get_leaderboard(board, limit=LEADERBOARD_SIZE, user=None):
+    """
+    Top limit d'un classement et entrée de l'utilisateur donné (None s'il n'est
+    pas classé), en une requête.
+    """
+    # board est répété dans chaque branche pour que chacune utilise son index
+    condition = Q(board=board, rank__lte=limit)
+    if user is not None:
+        condition |= Q(board=board, user=user)
+    entries = list(LeaderboardEntry.objects.filter(condition).select_related(
+        'user', 'user__profile'
+    ).order_by('rank'))
+    top = [entry for entry in entries if entry.rank <= limit]
+    own = next((entry for entry in entries if user is not None and entry.user_id == user.id), None)
+    return top, own
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from achievements.engine import award_all, rebuild_counters
+from achievements.leaderboard import rebuild_like_buckets, refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = ("Recalcule les compteurs de succès, attribue les trophées mérités et reconstruit "
+            "les classements d'après les données existantes")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            counters = rebuild_counters()
+            self.stdout.write(f"{counters} compteur(s) recalculé(s) ({time.perf_counter() - start:.1f}s)")
+            awarded = award_all()
+            self.stdout.write(f"{awarded} trophée(s) attribué(s)")
+            buckets = rebuild_like_buckets()
+            self.stdout.write(f"{buckets} tranche(s) de réactions reconstruite(s)")
+            entries = refresh_leaderboards()
+        for board, count in entries.items():
+            self.stdout.write(f"Classement {board} : {count} auteur(s)")
+        self.stdout.write(self.style.SUCCESS(f"✓ Succès recalculés en {time.perf_counter() - start:.1f}s"))
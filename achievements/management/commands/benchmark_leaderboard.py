@@ -0,0 +1,99 @@
+import random
+import statistics
+import time
+from collections import Counter
+from itertools import accumulate
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from achievements.leaderboard import day_bucket, get_leaderboard, refresh_leaderboards
+from achievements.models import LikeBucket
+
+BATCH_SIZE = 5000
+# Réactions tirées par lot lors de la génération
+DRAW_SIZE = 1_000_000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mesure le recalcul et la lecture des classements sur des réactions synthétiques"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reactions', type=int, default=10_000_000, help="Nombre de réactions synthétiques")
+        parser.add_argument('--authors', type=int, default=100_000, help="Nombre d'auteurs")
+        parser.add_argument('--days', type=int, default=90, help="Période couverte par les réactions, en jours")
+        parser.add_argument('--reads', type=int, default=200, help="Nombre de lectures mesurées")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def create_authors(self, count):
+        batch = []
+        for i in range(count):
+            batch.append(User(username=f'bench_{i}', password='!'))
+            if len(batch) >= BATCH_SIZE:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        return list(User.objects.filter(username__startswith='bench_').order_by('id').values_list('id', flat=True))
+
+    def aggregate_reactions(self, author_ids, count, days):
+        """
+        Réactions synthétiques comptées par (auteur, journée) : quelques auteurs
+        reçoivent la plupart des réactions (distribution de Zipf).
+        """
+        cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(author_ids))))
+        today = day_bucket()
+        counts = Counter()
+        remaining = count
+        while remaining:
+            size = min(DRAW_SIZE, remaining)
+            authors = self.rng.choices(author_ids, cum_weights=cum_weights, k=size)
+            buckets = self.rng.choices(range(today - days + 1, today + 1), k=size)
+            counts.update(zip(authors, buckets))
+            remaining -= size
+        return counts
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+
+        # Les données synthétiques sont annulées à la fin de la mesure
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                author_ids = self.create_authors(options['authors'])
+                counts = self.aggregate_reactions(author_ids, options['reactions'], options['days'])
+                LikeBucket.objects.bulk_create(
+                    (LikeBucket(author_id=author_id, bucket=bucket, count=n) for (author_id, bucket), n in counts.items()),
+                    batch_size=BATCH_SIZE
+                )
+                self.stdout.write(
+                    f"{options['reactions']:,} réactions de {len(author_ids):,} auteurs sur {options['days']} jours "
+                    f"-> {len(counts):,} tranches ({time.perf_counter() - start:.1f}s)"
+                )
+
+                start = time.perf_counter()
+                entries = refresh_leaderboards()
+                self.stdout.write(f"Recalcul des classements : {time.perf_counter() - start:.2f}s")
+                for board, count in entries.items():
+                    self.stdout.write(f"  {board} : {count:,} auteurs classés")
+
+                timings = []
+                for _ in range(options['reads']):
+                    user = User(id=self.rng.choice(author_ids))
+                    start = time.perf_counter()
+                    get_leaderboard('month', user=user)
+                    timings.append((time.perf_counter() - start) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f"Lecture du top et du rang : médiane {statistics.median(timings):.2f}ms, "
+                    f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f}ms"
+                )
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("✓ Mesure terminée, aucune donnée conservée"))
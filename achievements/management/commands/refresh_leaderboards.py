@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from achievements.leaderboard import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recalcule les classements des auteurs les plus appréciés (tâche planifiée)"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        for board, count in refresh_leaderboards().items():
+            self.stdout.write(f"Classement {board} : {count} auteur(s)")
+        self.stdout.write(self.style.SUCCESS(f"✓ Classements recalculés en {time.perf_counter() - start:.2f}s"))
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AchievementCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='achievement_counters', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+                ('likes_received', models.PositiveIntegerField(default=0, verbose_name='Réactions reçues')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Publications')),
+                ('connections_count', models.PositiveIntegerField(default=0, verbose_name='Connexions')),
+            ],
+            options={
+                'verbose_name': 'Compteurs de succès',
+                'verbose_name_plural': 'Compteurs de succès',
+            },
+        ),
+        migrations.CreateModel(
+            name='Trophy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom')),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('metric', models.CharField(choices=[('LIKES_RECEIVED', 'Réactions reçues'), ('POSTS', 'Publications'), ('CONNECTIONS', 'Connexions')], default='LIKES_RECEIVED', max_length=20, verbose_name='Compteur')),
+                ('required_count', models.PositiveIntegerField(verbose_name='Seuil à atteindre')),
+            ],
+            options={
+                'verbose_name': 'Trophée',
+                'verbose_name_plural': 'Trophées',
+                'ordering': ['metric', 'required_count'],
+                'indexes': [models.Index(fields=['metric', 'required_count'], name='trophy_threshold_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserTrophy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('earned_at', models.DateTimeField(auto_now_add=True, verbose_name="Date d'obtention")),
+                ('trophy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='awards', to='achievements.trophy', verbose_name='Trophée')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trophies', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Trophée obtenu',
+                'verbose_name_plural': 'Trophées obtenus',
+                'ordering': ['-earned_at'],
+                'unique_together': {('user', 'trophy')},
+            },
+        ),
+    ]
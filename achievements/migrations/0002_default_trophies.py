@@ -0,0 +1,36 @@
+from django.db import migrations
+
+DEFAULT_TROPHIES = [
+    ("Première réaction", "Recevoir une première réaction sur une publication", 'LIKES_RECEIVED', 1),
+    ("Apprécié", "Recevoir 50 réactions", 'LIKES_RECEIVED', 50),
+    ("Populaire", "Recevoir 500 réactions", 'LIKES_RECEIVED', 500),
+    ("Première publication", "Publier un premier post", 'POSTS', 1),
+    ("Auteur régulier", "Publier 25 posts", 'POSTS', 25),
+    ("Premier contact", "Avoir une première connexion", 'CONNECTIONS', 1),
+    ("Réseauteur", "Avoir 50 connexions", 'CONNECTIONS', 50),
+    ("Influenceur", "Avoir 500 connexions", 'CONNECTIONS', 500),
+]
+
+
+def create_trophies(apps, schema_editor):
+    Trophy = apps.get_model('achievements', 'Trophy')
+    Trophy.objects.bulk_create([
+        Trophy(name=name, description=description, metric=metric, required_count=required_count)
+        for name, description, metric, required_count in DEFAULT_TROPHIES
+    ])
+
+
+def delete_trophies(apps, schema_editor):
+    Trophy = apps.get_model('achievements', 'Trophy')
+    Trophy.objects.filter(name__in=[trophy[0] for trophy in DEFAULT_TROPHIES]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trophies, delete_trophies),
+    ]
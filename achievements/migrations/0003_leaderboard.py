@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('achievements', '0002_default_trophies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('week', '7 derniers jours'), ('month', 'Mois en cours')], max_length=10, verbose_name='Classement')),
+                ('rank', models.PositiveIntegerField(verbose_name='Rang')),
+                ('score', models.PositiveIntegerField(verbose_name='Score')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Date de calcul')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Entrée de classement',
+                'verbose_name_plural': 'Entrées de classement',
+                'ordering': ['board', 'rank'],
+                'unique_together': {('board', 'rank'), ('board', 'user')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LikeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveIntegerField(verbose_name='Journée')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Réactions reçues')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='like_buckets', to=settings.AUTH_USER_MODEL, verbose_name='Auteur')),
+            ],
+            options={
+                'verbose_name': 'Tranche de réactions',
+                'verbose_name_plural': 'Tranches de réactions',
+                'indexes': [models.Index(fields=['bucket'], name='like_bucket_idx')],
+                'unique_together': {('author', 'bucket')},
+            },
+        ),
+    ]
@@ -1,3 +1,137 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class Trophy(models.Model):
+    METRIC_CHOICES = [
+        ('LIKES_RECEIVED', 'Réactions reçues'),
+        ('POSTS', 'Publications'),
+        ('CONNECTIONS', 'Connexions'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name="Nom")
+    description = models.TextField(blank=True, verbose_name="Description")
+    metric = models.CharField(
+        max_length=20,
+        choices=METRIC_CHOICES,
+        default='LIKES_RECEIVED',
+        verbose_name="Compteur"
+    )
+    required_count = models.PositiveIntegerField(verbose_name="Seuil à atteindre")
+
+    class Meta:
+        verbose_name = "Trophée"
+        verbose_name_plural = "Trophées"
+        ordering = ['metric', 'required_count']
+        indexes = [
+            models.Index(fields=['metric', 'required_count'], name='trophy_threshold_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.required_count} {self.get_metric_display().lower()})"
+
+
+class UserTrophy(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Utilisateur",
+        related_name='trophies'
+    )
+    trophy = models.ForeignKey(
+        Trophy,
+        on_delete=models.CASCADE,
+        verbose_name="Trophée",
+        related_name='awards'
+    )
+    earned_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date d'obtention"
+    )
+
+    class Meta:
+        verbose_name = "Trophée obtenu"
+        verbose_name_plural = "Trophées obtenus"
+        unique_together = ['user', 'trophy']
+        ordering = ['-earned_at']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.trophy.name}"
+
+
+class AchievementCounters(models.Model):
+    """
+    Compteurs courants d'un utilisateur, tenus à jour par les signaux
+    (achievements/engine.py) : l'attribution des trophées ne relit jamais
+    l'historique de l'utilisateur.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Utilisateur",
+        related_name='achievement_counters'
+    )
+    likes_received = models.PositiveIntegerField(default=0, verbose_name="Réactions reçues")
+    posts_count = models.PositiveIntegerField(default=0, verbose_name="Publications")
+    connections_count = models.PositiveIntegerField(default=0, verbose_name="Connexions")
+
+    class Meta:
+        verbose_name = "Compteurs de succès"
+        verbose_name_plural = "Compteurs de succès"
+
+    def __str__(self):
+        return f"Compteurs de {self.user.username}"
+
+
+class LikeBucket(models.Model):
+    """Réactions reçues par un auteur pendant une journée donnée"""
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Auteur",
+        related_name='like_buckets'
+    )
+    # Nombre de jours écoulés depuis l'epoch Unix (UTC)
+    bucket = models.PositiveIntegerField(verbose_name="Journée")
+    count = models.PositiveIntegerField(default=0, verbose_name="Réactions reçues")
+
+    class Meta:
+        verbose_name = "Tranche de réactions"
+        verbose_name_plural = "Tranches de réactions"
+        unique_together = ['author', 'bucket']
+        indexes = [
+            models.Index(fields=['bucket'], name='like_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.author.username} ({self.bucket}) : {self.count}"
+
+
+class LeaderboardEntry(models.Model):
+    """Classement matérialisé (achievements/leaderboard.py)"""
+    BOARD_CHOICES = [
+        ('week', '7 derniers jours'),
+        ('month', 'Mois en cours'),
+    ]
+
+    board = models.CharField(max_length=10, choices=BOARD_CHOICES, verbose_name="Classement")
+    rank = models.PositiveIntegerField(verbose_name="Rang")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Utilisateur",
+        related_name='leaderboard_entries'
+    )
+    score = models.PositiveIntegerField(verbose_name="Score")
+    refreshed_at = models.DateTimeField(verbose_name="Date de calcul")
+
+    class Meta:
+        verbose_name = "Entrée de classement"
+        verbose_name_plural = "Entrées de classement"
+        ordering = ['board', 'rank']
+        # (board, rank) sert le top N, (board, user) le rang d'un utilisateur
+        unique_together = [['board', 'rank'], ['board', 'user']]
+
+    def __str__(self):
+        return f"{self.get_board_display()} #{self.rank} : {self.user.username} ({self.score})"
@@ -0,0 +1,94 @@
+from collections import Counter
+from functools import partial
+
+from asgiref.local import Local
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from connections.signals import connection_status_changed, connections_bulk_changed
+from posts.models import Post, Reaction
+from .engine import record_event, record_events
+from .leaderboard import received_reactions, record_likes
+
+# Posts en cours de suppression : leurs réactions sont décomptées en une fois
+_deleting = Local()
+
+
+def _deleting_posts():
+    if not hasattr(_deleting, 'post_ids'):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+def reaction_received(author_id, delta, when):
+    """
+    Appelé après la validation : les réactions sont écrites sous le verrou du
+    post (posts/reactions.py), que compteurs et classements ne prolongent pas
+    """
+    with transaction.atomic():
+        record_event(author_id, 'LIKES_RECEIVED', delta)
+        # Une réaction retirée l'est de la journée où elle avait été comptée
+        record_likes(author_id, delta, when)
+
+
+@receiver(post_save, sender=Reaction)
+def reaction_saved(sender, instance, created, **kwargs):
+    if created and instance.user_id != instance.post.author_id:
+        transaction.on_commit(partial(reaction_received, instance.post.author_id, 1, instance.created_at))
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts():
+        return
+    if instance.user_id != instance.post.author_id:
+        transaction.on_commit(partial(reaction_received, instance.post.author_id, -1, instance.created_at))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        record_event(instance.author_id, 'POSTS', 1)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # Les réactions sont supprimées en cascade avant le post
+    _deleting_posts().add(instance.id)
+    received = 0
+    for author_id, day, count in received_reactions(Reaction.objects.filter(post=instance)):
+        record_likes(author_id, -count, day)
+        received += count
+    if received:
+        record_event(instance.author_id, 'LIKES_RECEIVED', -received)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _deleting_posts().discard(instance.id)
+    record_event(instance.author_id, 'POSTS', -1)
+
+
+@receiver(connection_status_changed)
+def connection_status_updated(sender, instance, old_status, new_status, bulk=False, **kwargs):
+    if bulk:
+        return
+    if new_status == 'ACCEPTED':
+        delta = 1
+    elif old_status == 'ACCEPTED':
+        delta = -1
+    else:
+        return
+    record_event(instance.from_user_id, 'CONNECTIONS', delta)
+    record_event(instance.to_user_id, 'CONNECTIONS', delta)
+
+
+@receiver(connections_bulk_changed)
+def connections_bulk_updated(sender, user, connections, old_status, new_status, **kwargs):
+    if new_status == 'ACCEPTED':
+        deltas = Counter()
+        for connection in connections:
+            deltas[connection.from_user_id] += 1
+            deltas[connection.to_user_id] += 1
+        record_events('CONNECTIONS', deltas)
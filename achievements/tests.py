@@ -1,3 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from connections.models import Connection
+from posts.models import Post, Reaction
+from posts.reactions import toggle_reaction
+from .leaderboard import day_bucket, get_leaderboard, rebuild_like_buckets, refresh_leaderboards
+from .models import AchievementCounters, LikeBucket, Trophy, UserTrophy
+
+
+def counters(user):
+    row = AchievementCounters.objects.get(user=user)
+    return row.likes_received, row.posts_count, row.connections_count
+
+
+def trophy_names(user):
+    return set(UserTrophy.objects.filter(user=user).values_list('trophy__name', flat=True))
+
+
+class AchievementEngineTest(TestCase):
+    """Compteurs incrémentaux et attribution des trophées"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.fan1, cls.fan2 = [
+            User.objects.create_user(username=name, password='pass') for name in ('author', 'fan1', 'fan2')
+        ]
+        Trophy.objects.create(name="Deux réactions", metric='LIKES_RECEIVED', required_count=2)
+
+    def test_reactions_award_trophies_once(self):
+        post = Post.objects.create(author=self.author, content='Bonjour')
+        toggle_reaction(self.author, post.id, 'LIKE')
+        self.assertEqual(counters(self.author), (0, 1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            toggle_reaction(self.fan1, post.id, 'LIKE')
+            toggle_reaction(self.fan2, post.id, 'LOVE')
+        self.assertEqual(counters(self.author), (2, 1, 0))
+        self.assertEqual(trophy_names(self.author), {"Première publication", "Première réaction", "Deux réactions"})
+
+        # Un trophée reste acquis quand le compteur redescend
+        with self.captureOnCommitCallbacks(execute=True):
+            toggle_reaction(self.fan2, post.id, 'LOVE')
+            toggle_reaction(self.fan2, post.id, 'LIKE')
+        self.assertEqual(counters(self.author), (2, 1, 0))
+        self.assertEqual(UserTrophy.objects.filter(user=self.author).count(), 3)
+
+    def test_post_deletion_removes_its_reactions(self):
+        post = Post.objects.create(author=self.author, content='Bonjour')
+        Post.objects.create(author=self.author, content='Encore')
+        Reaction.objects.create(user=self.fan1, post=post, reaction_type='LIKE')
+        Reaction.objects.create(user=self.author, post=post, reaction_type='LIKE')
+
+        post.delete()
+        self.assertEqual(counters(self.author), (0, 1, 0))
+
+    def test_connections(self):
+        connection = Connection.objects.create(from_user=self.fan1, to_user=self.fan2)
+        self.assertFalse(AchievementCounters.objects.filter(user=self.fan1).exists())
+        connection.status = 'ACCEPTED'
+        connection.save()
+        self.assertEqual(counters(self.fan1)[2], 1)
+        self.assertIn("Premier contact", trophy_names(self.fan2))
+
+        connection.delete()
+        self.assertEqual(counters(self.fan2)[2], 0)
+
+    def test_backfill_matches_incremental_counters(self):
+        post = Post.objects.create(author=self.author, content='Bonjour')
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in (self.fan1, self.fan2, self.author):
+                Reaction.objects.create(user=user, post=post, reaction_type='LIKE')
+        Connection.objects.create(from_user=self.author, to_user=self.fan1, status='ACCEPTED')
+        expected = {user.id: counters(user) for user in (self.author, self.fan1)}
+        expected_trophies = trophy_names(self.author)
+
+        AchievementCounters.objects.all().delete()
+        UserTrophy.objects.all().delete()
+        out = StringIO()
+        call_command('backfill_achievements', stdout=out)
+
+        for user in (self.author, self.fan1):
+            self.assertEqual(counters(user), expected[user.id])
+        self.assertEqual(counters(self.fan2), (0, 0, 0))
+        self.assertEqual(trophy_names(self.author), expected_trophies)
+        self.assertIn('3 compteur(s)', out.getvalue())
+
+
+class LeaderboardTest(TestCase):
+    """Tranches de réactions et classements matérialisés"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [User.objects.create_user(username=f'author{i}', password='pass') for i in range(3)]
+        cls.fans = [User.objects.create_user(username=f'fan{i}', password='pass') for i in range(3)]
+        # author0 : 3 réactions, author1 : 2, author2 : 1
+        with cls.captureOnCommitCallbacks(execute=True):
+            for author, count in zip(cls.authors, (3, 2, 1)):
+                post = Post.objects.create(author=author, content='Bonjour')
+                for fan in cls.fans[:count]:
+                    toggle_reaction(fan, post.id, 'LIKE')
+
+    def buckets(self):
+        return set(LikeBucket.objects.filter(count__gt=0).values_list('author_id', 'bucket', 'count'))
+
+    def test_top_and_rank_in_one_query(self):
+        refresh_leaderboards()
+        with self.assertNumQueries(1):
+            top, own = get_leaderboard('week', limit=2, user=self.authors[2])
+        self.assertEqual([(entry.user, entry.score) for entry in top], [(self.authors[0], 3), (self.authors[1], 2)])
+        self.assertEqual((own.rank, own.score), (3, 1))
+
+        _, own = get_leaderboard('month', user=self.fans[0])
+        self.assertIsNone(own)
+
+    def test_unlike_updates_original_day(self):
+        post = Post.objects.get(author=self.authors[0])
+        last_week = timezone.now() - timedelta(days=8)
+        Reaction.objects.filter(post=post, user=self.fans[0]).update(created_at=last_week)
+        rebuild_like_buckets()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            toggle_reaction(self.fans[0], post.id, 'LIKE')
+        self.assertFalse(LikeBucket.objects.filter(author=self.authors[0], bucket=day_bucket(last_week), count__gt=0))
+        self.assertEqual(LikeBucket.objects.get(author=self.authors[0], bucket=day_bucket()).count, 2)
+
+    def test_rebuild_matches_incremental_buckets(self):
+        expected = self.buckets()
+        self.assertEqual(rebuild_like_buckets(), 3)
+        self.assertEqual(self.buckets(), expected)
+
+    def test_leaderboard_view(self):
+        refresh_leaderboards()
+        self.client.force_login(self.authors[1])
+        data = self.client.get(reverse('achievements:leaderboard'), {'board': 'week', 'limit': '1'}).json()
+        self.assertEqual([entry['user_id'] for entry in data['top']], [self.authors[0].id])
+        self.assertEqual(data['me']['rank'], 2)
 
-# Create your tests here.
+        response = self.client.get(reverse('achievements:leaderboard'), {'board': 'year'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'achievements'
+
+urlpatterns = [
+    path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+]
@@ -1,3 +1,38 @@
-from django.shortcuts import render
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views.generic import View
 
-# Create your views here.
+from .leaderboard import LEADERBOARD_SIZE, get_leaderboard
+from .models import LeaderboardEntry
+
+MAX_LEADERBOARD_SIZE = 100
+
+
+def serialize_entry(entry):
+    return {
+        'rank': entry.rank,
+        'user_id': entry.user_id,
+        'name': entry.user.get_full_name() or entry.user.username,
+        'score': entry.score,
+    }
+
+
+class LeaderboardView(LoginRequiredMixin, View):
+    """Top N d'un classement et rang de l'utilisateur connecté, en JSON"""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        board = request.GET.get('board', 'month')
+        if board not in dict(LeaderboardEntry.BOARD_CHOICES):
+            return JsonResponse({'success': False, 'error': 'Classement inconnu.'}, status=400)
+        limit = request.GET.get('limit', '')
+        limit = min(int(limit), MAX_LEADERBOARD_SIZE) if limit.isdigit() and int(limit) else LEADERBOARD_SIZE
+
+        top, own = get_leaderboard(board, limit, request.user)
+        return JsonResponse({
+            'success': True,
+            'board': board,
+            'top': [serialize_entry(entry) for entry in top],
+            'me': serialize_entry(own) if own else None,
+            'refreshed_at': top[0].refreshed_at.isoformat() if top else None,
+        })
@@ -0,0 +1,63 @@
+"""
+Actions groupées sur les demandes de connexion en attente.
+
+Les demandes sélectionnées sont verrouillées et lues en une requête, puis
+modifiées par un seul UPDATE (ou DELETE pour une annulation) dans une même
+transaction. connection_status_changed est ensuite envoyé pour chaque demande
+avec bulk=True, ce que les récepteurs ignorent, puis connections_bulk_changed
+une seule fois : chaque application applique alors ses effets par lot (fils
+d'actualité, compteurs, notifications), en un nombre de requêtes indépendant du
+nombre de demandes.
+"""
+from django.db import transaction
+
+from .edges import set_edges_status
+from .models import Connection
+from .signals import connection_status_changed, connections_bulk_changed
+
+# Action -> (côté de la demande que l'utilisateur doit occuper, nouveau statut ; None = suppression)
+BULK_ACTIONS = {
+    'accept': ('to_user', 'ACCEPTED'),
+    'reject': ('to_user', 'REJECTED'),
+    'cancel': ('from_user', None),
+}
+
+# Nombre maximal de demandes traitées par appel
+MAX_BULK_SIZE = 1000
+
+
+def apply_bulk_action(user, action, connection_ids=None):
+    """
+    Applique action aux demandes en attente connection_ids qui concernent user,
+    ou à toutes ses demandes en attente si connection_ids vaut None. Les
+    identifiants inconnus ou déjà traités sont ignorés. Retourne le nombre de
+    demandes traitées.
+    """
+    side, new_status = BULK_ACTIONS[action]
+    with transaction.atomic():
+        pending = Connection.objects.select_for_update().filter(status='PENDING', **{side: user})
+        if connection_ids is not None:
+            pending = pending.filter(id__in=list(connection_ids)[:MAX_BULK_SIZE])
+        connections = list(pending.order_by('id')[:MAX_BULK_SIZE])
+        if not connections:
+            return 0
+        ids = [connection.id for connection in connections]
+
+        if new_status is None:
+            # post_delete envoie connection_status_changed pour chaque demande
+            Connection.objects.filter(id__in=ids).delete()
+            return len(ids)
+
+        Connection.objects.filter(id__in=ids).update(status=new_status)
+        set_edges_status(ids, new_status)
+        for connection in connections:
+            connection.status = new_status
+            connection._initial_status = new_status
+            connection_status_changed.send(
+                sender=Connection, instance=connection, old_status='PENDING', new_status=new_status, bulk=True
+            )
+        connections_bulk_changed.send(
+            sender=Connection, user=user, connections=connections, old_status='PENDING', new_status=new_status
+        )
+    return len(ids)
+
@@ -0,0 +1,119 @@
+"""
+Degré de relation (1er, 2e, 3e) entre deux utilisateurs.
+
+Recherche en largeur bidirectionnelle bornée à CONNECTION_DEGREE_MAX niveaux
+sur les connexions acceptées. Chaque niveau est lu par lots d'identifiants et
+le côté dont la frontière est la plus petite est étendu en premier. Le dernier
+niveau n'est pas chargé : une requête d'existence suffit à savoir si les deux
+frontières se touchent.
+
+Les résultats sont mis en cache par paire. Une connexion acceptée ou retirée
+peut changer le degré de paires éloignées : elle incrémente une génération
+globale qui fait partie de la clé de cache.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ConnectionEdge
+
+# Nombre maximal d'identifiants par requête IN (limite de paramètres SQLite)
+BATCH_SIZE = 500
+
+GENERATION_KEY = 'degree:generation'
+
+# Valeur mise en cache pour « au-delà du degré maximal »
+NOT_CONNECTED = -1
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def _expand(frontier):
+    """Voisins acceptés de tous les utilisateurs de la frontière"""
+    neighbours = set()
+    for batch in _batches(frontier):
+        neighbours.update(ConnectionEdge.objects.filter(
+            user_id__in=batch,
+            status='ACCEPTED'
+        ).values_list('other_id', flat=True))
+    return neighbours
+
+
+def _touches(frontier, other_frontier):
+    """Vrai si une connexion acceptée relie les deux frontières"""
+    for batch in _batches(frontier):
+        for other_batch in _batches(other_frontier):
+            if ConnectionEdge.objects.filter(
+                user_id__in=batch,
+                other_id__in=other_batch,
+                status='ACCEPTED'
+            ).exists():
+                return True
+    return False
+
+
+def compute_degree(user_id, other_id, max_degree=None):
+    """Distance entre deux utilisateurs, ou None au-delà de max_degree"""
+    if max_degree is None:
+        max_degree = settings.CONNECTION_DEGREE_MAX
+    if user_id == other_id:
+        return 0
+
+    # Distance depuis chaque extrémité des utilisateurs déjà atteints
+    forward, backward = {user_id: 0}, {other_id: 0}
+    forward_frontier, backward_frontier = {user_id}, {other_id}
+    depth = 0
+
+    while depth < max_degree:
+        if depth + 1 == max_degree:
+            return max_degree if _touches(forward_frontier, backward_frontier) else None
+
+        if len(forward_frontier) > len(backward_frontier):
+            forward, backward = backward, forward
+            forward_frontier, backward_frontier = backward_frontier, forward_frontier
+
+        level = forward[next(iter(forward_frontier))] + 1
+        forward_frontier = _expand(forward_frontier) - forward.keys()
+        if not forward_frontier:
+            return None
+        for node in forward_frontier:
+            forward[node] = level
+        depth += 1
+
+        meetings = forward_frontier & backward.keys()
+        if meetings:
+            return min(forward[node] + backward[node] for node in meetings)
+
+    return None
+
+
+def _generation():
+    # Initialisée à l'heure courante pour ne pas réutiliser une ancienne génération après une éviction
+    cache.add(GENERATION_KEY, int(time.time()), None)
+    return cache.get(GENERATION_KEY)
+
+
+def get_degree(user_id, other_id):
+    """Degré de relation en cache, None au-delà du degré maximal"""
+    low, high = sorted((user_id, other_id))
+    key = f'degree:{_generation()}:{low}:{high}'
+    degree = cache.get(key)
+    if degree is None:
+        degree = compute_degree(low, high)
+        if degree is None:
+            degree = NOT_CONNECTED
+        cache.set(key, degree, settings.CONNECTION_DEGREE_TTL)
+    return None if degree == NOT_CONNECTED else degree
+
+
+def invalidate_degrees():
+    """Périme tous les degrés en cache (nouvelle génération)"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, int(time.time()), None)
@@ -0,0 +1,45 @@
+"""
+Maintenance de la liste d'adjacence ConnectionEdge.
+
+Connection reste la source de vérité (elle garde le sens de la demande) ;
+les arêtes sont écrites par les signaux de connections/signals.py et supprimées
+en cascade avec la connexion.
+"""
+from .models import Connection, ConnectionEdge
+
+
+def edges_for(connection):
+    """Les deux arêtes qui reflètent une connexion"""
+    common = {
+        'connection_id': connection.id,
+        'status': connection.status,
+        'created_at': connection.created_at,
+    }
+    return [
+        ConnectionEdge(user_id=connection.from_user_id, other_id=connection.to_user_id, outgoing=True, **common),
+        ConnectionEdge(user_id=connection.to_user_id, other_id=connection.from_user_id, outgoing=False, **common),
+    ]
+
+
+def create_edges(connection):
+    ConnectionEdge.objects.bulk_create(edges_for(connection))
+
+
+def set_edges_status(connection_ids, status):
+    """Reporte un changement de statut sur les arêtes des connexions données"""
+    ConnectionEdge.objects.filter(connection_id__in=connection_ids).update(status=status)
+
+
+def rebuild_edges(batch_size=5000):
+    """Recrée toutes les arêtes à partir des connexions"""
+    ConnectionEdge.objects.all().delete()
+    batch = []
+    count = 0
+    for connection in Connection.objects.order_by('id').iterator(chunk_size=batch_size):
+        batch.extend(edges_for(connection))
+        if len(batch) >= batch_size:
+            count += len(ConnectionEdge.objects.bulk_create(batch, ignore_conflicts=True))
+            batch = []
+    if batch:
+        count += len(ConnectionEdge.objects.bulk_create(batch, ignore_conflicts=True))
+    return count
@@ -0,0 +1,239 @@
+"""
+Instantané en mémoire du graphe des connexions acceptées, pour l'analyse.
+
+Le graphe est chargé en une seule passe sur la liste d'adjacence, triée par
+l'index unique (user, other), dans une structure CSR : les voisins de
+l'utilisateur d'indice i sont neighbours[offsets[i]:offsets[i + 1]].
+
+Avec NumPy, les tableaux sont des ndarray et les calculs (degrés, composantes
+connexes, PageRank) sont vectorisés. Sans NumPy, les mêmes calculs sont faits
+en Python pur sur des tableaux array, ce qui convient aux petits graphes.
+"""
+from array import array
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ConnectionEdge, UserGraphStats
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Lignes lues par aller-retour avec la base
+CHUNK_SIZE = 100_000
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_MAX_ITERATIONS = 100
+PAGERANK_TOLERANCE = 1e-8
+
+
+class GraphSnapshot:
+    """Graphe non orienté au format CSR, indexé de 0 à len(user_ids) - 1"""
+
+    def __init__(self, user_ids, offsets, neighbours):
+        self.user_ids = user_ids
+        self.offsets = offsets
+        self.neighbours = neighbours
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    @property
+    def edge_count(self):
+        """Nombre de connexions (chaque connexion apparaît dans les deux sens)"""
+        return len(self.neighbours) // 2
+
+
+def _stream_edges():
+    return ConnectionEdge.objects.filter(status='ACCEPTED').order_by('user_id', 'other_id').values_list(
+        'user_id', 'other_id'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_snapshot(use_numpy=None):
+    """Charge les connexions acceptées dans un GraphSnapshot"""
+    if use_numpy is None:
+        use_numpy = np is not None
+    user_id_rows = User.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=CHUNK_SIZE)
+
+    if use_numpy:
+        user_ids = np.fromiter(user_id_rows, dtype=np.int64)
+        sources, targets = [], []
+        for chunk in _chunks(_stream_edges()):
+            pairs = np.array(chunk, dtype=np.int64)
+            sources.append(pairs[:, 0])
+            targets.append(pairs[:, 1])
+        sources = np.concatenate(sources) if sources else np.empty(0, dtype=np.int64)
+        targets = np.concatenate(targets) if targets else np.empty(0, dtype=np.int64)
+        # Les identifiants triés servent d'index : recherche dichotomique vectorisée
+        degrees = np.bincount(np.searchsorted(user_ids, sources), minlength=len(user_ids))
+        offsets = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+        return GraphSnapshot(user_ids, offsets, np.searchsorted(user_ids, targets))
+
+    user_ids = array('q', user_id_rows)
+    index = {user_id: i for i, user_id in enumerate(user_ids)}
+    degrees = array('q', bytes(8 * len(user_ids)))
+    neighbours = array('q')
+    for user_id, other_id in _stream_edges():
+        degrees[index[user_id]] += 1
+        neighbours.append(index[other_id])
+    offsets = array('q', [0])
+    for degree in degrees:
+        offsets.append(offsets[-1] + degree)
+    return GraphSnapshot(user_ids, offsets, neighbours)
+
+
+def _is_numpy(snapshot):
+    return np is not None and isinstance(snapshot.offsets, np.ndarray)
+
+
+def compute_degrees(snapshot):
+    """Nombre de connexions de chaque utilisateur"""
+    if _is_numpy(snapshot):
+        return np.diff(snapshot.offsets)
+    offsets = snapshot.offsets
+    return array('q', (offsets[i + 1] - offsets[i] for i in range(len(snapshot))))
+
+
+def _sources(snapshot):
+    """Indice de l'extrémité d'origine de chaque entrée de neighbours"""
+    return np.repeat(np.arange(len(snapshot), dtype=np.int64), np.diff(snapshot.offsets))
+
+
+def compute_components(snapshot):
+    """
+    Composante connexe de chaque utilisateur, identifiée par le plus petit
+    indice qu'elle contient.
+    """
+    n = len(snapshot)
+    if _is_numpy(snapshot):
+        # Propagation du plus petit label, accélérée par saut de pointeurs
+        labels = np.arange(n, dtype=np.int64)
+        sources = _sources(snapshot)
+        while True:
+            updated = labels.copy()
+            np.minimum.at(updated, sources, labels[snapshot.neighbours])
+            np.minimum.at(updated, labels, updated)
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                return labels
+            labels = updated
+
+    # Union-find avec compression de chemin par moitié
+    parents = array('q', range(n))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    offsets, neighbours = snapshot.offsets, snapshot.neighbours
+    for i in range(n):
+        for j in neighbours[offsets[i]:offsets[i + 1]]:
+            if j > i:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parents[max(root_i, root_j)] = min(root_i, root_j)
+    return array('q', (find(i) for i in range(n)))
+
+
+def compute_pagerank(snapshot, damping=PAGERANK_DAMPING, max_iterations=PAGERANK_MAX_ITERATIONS,
+                     tolerance=PAGERANK_TOLERANCE):
+    """PageRank par itération de puissance ; la somme des scores vaut 1"""
+    n = len(snapshot)
+    if not n:
+        return np.zeros(0) if _is_numpy(snapshot) else []
+    degrees = compute_degrees(snapshot)
+
+    if _is_numpy(snapshot):
+        ranks = np.full(n, 1.0 / n)
+        sources = _sources(snapshot)
+        dangling = degrees == 0
+        safe_degrees = np.maximum(degrees, 1)
+        for _ in range(max_iterations):
+            shares = (ranks / safe_degrees)[sources]
+            updated = np.bincount(snapshot.neighbours, weights=shares, minlength=n)
+            updated = (1 - damping) / n + damping * (updated + ranks[dangling].sum() / n)
+            converged = np.abs(updated - ranks).sum() < tolerance
+            ranks = updated
+            if converged:
+                break
+        return ranks
+
+    offsets, neighbours = snapshot.offsets, snapshot.neighbours
+    ranks = [1.0 / n] * n
+    for _ in range(max_iterations):
+        updated = [0.0] * n
+        dangling_sum = 0.0
+        for i in range(n):
+            if degrees[i]:
+                share = ranks[i] / degrees[i]
+                for j in neighbours[offsets[i]:offsets[i + 1]]:
+                    updated[j] += share
+            else:
+                dangling_sum += ranks[i]
+        base = (1 - damping) / n + damping * dangling_sum / n
+        updated = [base + damping * value for value in updated]
+        converged = sum(abs(a - b) for a, b in zip(updated, ranks)) < tolerance
+        ranks = updated
+        if converged:
+            break
+    return ranks
+
+
+def compute_graph_stats(snapshot):
+    """Degrés, composantes (avec leur taille) et PageRank de chaque utilisateur"""
+    degrees = compute_degrees(snapshot)
+    components = compute_components(snapshot)
+    pagerank = compute_pagerank(snapshot)
+    if _is_numpy(snapshot):
+        sizes = np.bincount(components, minlength=len(snapshot))[components]
+        roots = snapshot.user_ids[components]
+        return degrees.tolist(), roots.tolist(), sizes.tolist(), pagerank.tolist()
+
+    counts = {}
+    for component in components:
+        counts[component] = counts.get(component, 0) + 1
+    user_ids = snapshot.user_ids
+    return (
+        list(degrees),
+        [user_ids[component] for component in components],
+        [counts[component] for component in components],
+        list(pagerank),
+    )
+
+
+def save_graph_stats(snapshot, stats, batch_size=5000):
+    """Remplace le contenu de UserGraphStats"""
+    degrees, components, sizes, pagerank = stats
+    computed_at = timezone.now()
+    rows = (
+        UserGraphStats(
+            user_id=user_id,
+            degree=degrees[i],
+            component=components[i],
+            component_size=sizes[i],
+            pagerank=pagerank[i],
+            computed_at=computed_at,
+        )
+        for i, user_id in enumerate(int(user_id) for user_id in snapshot.user_ids)
+    )
+    with transaction.atomic():
+        UserGraphStats.objects.all().delete()
+        UserGraphStats.objects.bulk_create(rows, batch_size=batch_size)
@@ -0,0 +1,57 @@
+"""
+Sections paginées de la page « Mes connexions ».
+
+Chaque section (connexions, demandes reçues, demandes envoyées) est lue dans
+la liste d'adjacence par pagination par curseur sur (created_at, id), servie
+par l'index (user, status, -created_at). Les totaux des trois sections
+proviennent d'une seule requête groupée.
+"""
+from django.db.models import Count, Q
+
+from posts.feed import CursorPage, decode_cursor, encode_cursor
+from .models import ConnectionEdge
+
+CONNECTIONS_PER_PAGE = 12
+
+# Section -> filtre sur les arêtes de l'utilisateur
+SECTIONS = {
+    'accepted': {'status': 'ACCEPTED'},
+    'received': {'status': 'PENDING', 'outgoing': False},
+    'sent': {'status': 'PENDING', 'outgoing': True},
+}
+
+
+def get_section_page(user, section, cursor=None, per_page=CONNECTIONS_PER_PAGE):
+    """Page d'une section située après le curseur donné"""
+    queryset = ConnectionEdge.objects.filter(user=user, **SECTIONS[section]).select_related(
+        'other', 'other__profile'
+    ).order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, edge_id = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, id__lt=edge_id)
+        )
+
+    # Un élément de plus pour savoir s'il existe une page suivante
+    edges = list(queryset[:per_page + 1])
+    next_cursor = encode_cursor(edges[per_page - 1]) if len(edges) > per_page else None
+    return CursorPage(edges[:per_page], next_cursor)
+
+
+def get_connection_counts(user_id):
+    """Total de chaque section, en une requête groupée"""
+    counts = dict.fromkeys(SECTIONS, 0)
+    rows = ConnectionEdge.objects.filter(
+        user_id=user_id,
+        status__in=['ACCEPTED', 'PENDING']
+    ).values('status', 'outgoing').annotate(count=Count('id')).order_by()
+    for row in rows:
+        if row['status'] == 'ACCEPTED':
+            counts['accepted'] += row['count']
+        elif row['outgoing']:
+            counts['sent'] = row['count']
+        else:
+            counts['received'] = row['count']
+    return counts
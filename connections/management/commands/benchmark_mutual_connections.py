@@ -0,0 +1,107 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from connections.edges import rebuild_edges
+from connections.models import Connection
+from connections.mutual import get_mutual_connections
+from connections.utils import get_connection_ids
+
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mesure le calcul des relations en commun sur un graphe synthétique"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000, help="Nombre d'utilisateurs synthétiques")
+        parser.add_argument('--edges', type=int, default=5_000_000, help="Nombre de connexions acceptées")
+        parser.add_argument('--requests', type=int, default=200, help="Nombre de requêtes mesurées")
+        parser.add_argument('--page-size', type=int, default=20, help="Profils par requête (page de recherche)")
+        parser.add_argument('--budget-ms', type=float, default=50.0, help="Budget de temps par requête")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def create_users(self, count):
+        users = (User(username=f'bench_{i}', password='!') for i in range(count))
+        batch = []
+        for user in users:
+            batch.append(user)
+            if len(batch) >= BATCH_SIZE:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        return list(User.objects.filter(username__startswith='bench_').values_list('id', flat=True))
+
+    def generate_pairs(self, user_ids, count):
+        """
+        Paires distinctes : chaque utilisateur est relié à (i + d) % n pour des
+        décalages d distincts inférieurs à n / 2, ce qui exclut les doublons.
+        """
+        n = len(user_ids)
+        per_user, extra = divmod(count, n)
+        for i, user_id in enumerate(user_ids):
+            k = min(per_user + (1 if i < extra else 0), (n - 1) // 2)
+            for offset in self.rng.sample(range(1, (n + 1) // 2), k):
+                yield user_id, user_ids[(i + offset) % n]
+
+    def create_connections(self, user_ids, count):
+        batch = []
+        for from_id, to_id in self.generate_pairs(user_ids, count):
+            batch.append(Connection(from_user_id=from_id, to_user_id=to_id, status='ACCEPTED'))
+            if len(batch) >= BATCH_SIZE:
+                Connection.objects.bulk_create(batch)
+                batch = []
+        Connection.objects.bulk_create(batch)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+
+        # Les données synthétiques sont annulées à la fin de la mesure
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                user_ids = self.create_users(options['users'])
+                self.create_connections(user_ids, options['edges'])
+                edges = rebuild_edges()
+                self.stdout.write(f"Graphe : {len(user_ids)} utilisateurs, {edges // 2} connexions "
+                                  f"({time.perf_counter() - start:.1f}s)")
+
+                timings = []
+                found = 0
+                for _ in range(options['requests']):
+                    viewer_id = self.rng.choice(user_ids)
+                    # Moitié de profils au hasard, moitié de relations de relations
+                    friend_ids = get_connection_ids(viewer_id)
+                    second_degree = get_connection_ids(self.rng.choice(friend_ids)) if friend_ids else []
+                    half = options['page_size'] // 2
+                    target_ids = self.rng.sample(user_ids, options['page_size'] - half)
+                    target_ids += self.rng.sample(second_degree, min(half, len(second_degree)))
+                    start = time.perf_counter()
+                    mutual = get_mutual_connections(viewer_id, target_ids)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    found += len(mutual)
+
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                self.stdout.write(
+                    f"{len(timings)} requêtes de {options['page_size']} profils : "
+                    f"médiane {statistics.median(timings):.1f}ms, p95 {p95:.1f}ms, max {timings[-1]:.1f}ms "
+                    f"({found} profils avec des relations en commun)"
+                )
+                if p95 <= options['budget_ms']:
+                    self.stdout.write(self.style.SUCCESS(f"✓ p95 sous le budget de {options['budget_ms']:.0f}ms"))
+                else:
+                    self.stdout.write(self.style.ERROR(f"✗ p95 au-dessus du budget de {options['budget_ms']:.0f}ms"))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("✓ Mesure terminée, aucune donnée conservée"))
@@ -0,0 +1,53 @@
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from connections import graph
+
+
+class Command(BaseCommand):
+    help = "Charge le graphe des connexions en mémoire et calcule degrés, composantes et centralité"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help="Nombre d'utilisateurs les plus centraux affichés")
+        parser.add_argument('--no-save', action='store_true', help="Ne pas écrire les résultats dans UserGraphStats")
+        parser.add_argument('--pure-python', action='store_true', help="Ne pas utiliser NumPy même s'il est installé")
+
+    def step(self, label, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.stdout.write(f"{label} : {time.perf_counter() - start:.2f}s")
+        return result
+
+    def handle(self, *args, **options):
+        use_numpy = graph.np is not None and not options['pure_python']
+        if not use_numpy:
+            self.stdout.write(self.style.WARNING("NumPy indisponible ou désactivé : calcul en Python pur"))
+
+        snapshot = self.step("Chargement", graph.load_snapshot, use_numpy)
+        self.stdout.write(f"  {len(snapshot)} utilisateurs, {snapshot.edge_count} connexions")
+
+        degrees, components, sizes, pagerank = stats = self.step(
+            "Degrés, composantes et PageRank", graph.compute_graph_stats, snapshot
+        )
+
+        if degrees:
+            ordered = sorted(degrees)
+            self.stdout.write(f"Degrés : min {ordered[0]}, médiane {ordered[len(ordered) // 2]}, max {ordered[-1]}")
+            component_sizes = Counter(dict(zip(components, sizes)))
+            self.stdout.write(f"Composantes : {len(component_sizes)} "
+                              f"(la plus grande : {component_sizes.most_common(1)[0][1]} utilisateurs)")
+
+            top = sorted(range(len(pagerank)), key=pagerank.__getitem__, reverse=True)[:options['top']]
+            users = User.objects.in_bulk([int(snapshot.user_ids[i]) for i in top])
+            self.stdout.write("Utilisateurs les plus centraux :")
+            for i in top:
+                user = users[int(snapshot.user_ids[i])]
+                self.stdout.write(f"  {user.username} : PageRank {pagerank[i]:.6f}, {degrees[i]} connexions")
+
+        if not options['no_save']:
+            self.step("Écriture de UserGraphStats", graph.save_graph_stats, snapshot, stats)
+
+        self.stdout.write(self.style.SUCCESS("✓ Statistiques du graphe calculées"))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from connections.suggestions import compute_suggestions
+
+
+class Command(BaseCommand):
+    help = "Recalcule les suggestions de connexions de tous les utilisateurs (tâche nocturne)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Utilisateurs écrits par transaction")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} utilisateurs traités...")
+
+        count = compute_suggestions(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Suggestions recalculées pour {count} utilisateur(s) en {time.perf_counter() - start:.1f}s"
+        ))
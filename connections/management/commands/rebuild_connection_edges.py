@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from connections.edges import rebuild_edges
+
+
+class Command(BaseCommand):
+    help = "Reconstruit la liste d'adjacence (ConnectionEdge) à partir des connexions"
+
+    def handle(self, *args, **options):
+        count = rebuild_edges()
+        self.stdout.write(self.style.SUCCESS(f"✓ {count} arête(s) reconstruite(s)"))
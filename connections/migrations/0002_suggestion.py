@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('connections', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Suggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Score')),
+                ('mutual_count', models.PositiveIntegerField(default=0, verbose_name='Relations en commun')),
+                ('shared_skills_count', models.PositiveIntegerField(default=0, verbose_name='Compétences en commun')),
+                ('shared_companies_count', models.PositiveIntegerField(default=0, verbose_name='Entreprises en commun')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de calcul')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur suggéré')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Suggestion',
+                'verbose_name_plural': 'Suggestions',
+                'indexes': [models.Index(fields=['user', '-score'], name='suggestion_user_score_idx')],
+                'unique_together': {('user', 'candidate')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_edges(apps, schema_editor):
+    Connection = apps.get_model('connections', 'Connection')
+    ConnectionEdge = apps.get_model('connections', 'ConnectionEdge')
+
+    batch = []
+    for connection in Connection.objects.order_by('id').iterator(chunk_size=5000):
+        common = {
+            'connection_id': connection.id,
+            'status': connection.status,
+            'created_at': connection.created_at,
+        }
+        batch.append(ConnectionEdge(user_id=connection.from_user_id, other_id=connection.to_user_id, outgoing=True, **common))
+        batch.append(ConnectionEdge(user_id=connection.to_user_id, other_id=connection.from_user_id, outgoing=False, **common))
+        if len(batch) >= 5000:
+            ConnectionEdge.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ConnectionEdge.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('connections', '0002_suggestion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConnectionEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('ACCEPTED', 'Acceptée'), ('REJECTED', 'Refusée'), ('BLOCKED', 'Bloquée')], max_length=20, verbose_name='Statut')),
+                ('outgoing', models.BooleanField(help_text="Vrai si user est l'émetteur de la demande", verbose_name='Demande envoyée')),
+                ('created_at', models.DateTimeField(verbose_name='Date de création')),
+                ('connection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='edges', to='connections.connection', verbose_name='Connexion')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Autre utilisateur')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='connection_edges', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Arête de connexion',
+                'verbose_name_plural': 'Arêtes de connexion',
+                'indexes': [models.Index(fields=['user', 'status', '-created_at'], name='edge_user_status_idx')],
+                'unique_together': {('user', 'other')},
+            },
+        ),
+        migrations.RunPython(fill_edges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('connections', '0003_connection_edge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserGraphStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='graph_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+                ('degree', models.PositiveIntegerField(default=0, verbose_name='Nombre de connexions')),
+                ('component', models.PositiveIntegerField(help_text="Plus petit identifiant d'utilisateur de la composante connexe", verbose_name='Composante')),
+                ('component_size', models.PositiveIntegerField(verbose_name='Taille de la composante')),
+                ('pagerank', models.FloatField(verbose_name='Centralité (PageRank)')),
+                ('computed_at', models.DateTimeField(verbose_name='Date de calcul')),
+            ],
+            options={
+                'verbose_name': 'Statistiques de graphe',
+                'verbose_name_plural': 'Statistiques de graphe',
+                'indexes': [models.Index(fields=['-pagerank'], name='graph_stats_pagerank_idx'), models.Index(fields=['-degree'], name='graph_stats_degree_idx')],
+            },
+        ),
+    ]
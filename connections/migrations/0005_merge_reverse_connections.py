@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Exists, F, OuterRef
+
+# Connexion conservée quand les deux sens existent : le statut le plus
+# restrictif, puis le plus avancé, puis la plus ancienne
+STATUS_PRIORITY = {'BLOCKED': 0, 'ACCEPTED': 1, 'PENDING': 2, 'REJECTED': 3}
+
+
+def merge_reverse_duplicates(apps, schema_editor):
+    Connection = apps.get_model('connections', 'Connection')
+    ConnectionEdge = apps.get_model('connections', 'ConnectionEdge')
+
+    reverse = Connection.objects.filter(from_user=OuterRef('to_user'), to_user=OuterRef('from_user'))
+    duplicates = list(Connection.objects.filter(Exists(reverse), from_user__lt=F('to_user')))
+    for connection in duplicates:
+        pair = [connection, Connection.objects.get(from_user=connection.to_user_id, to_user=connection.from_user_id)]
+        pair.sort(key=lambda c: (STATUS_PRIORITY.get(c.status, len(STATUS_PRIORITY)), c.created_at, c.id))
+        kept, dropped = pair
+        # Les arêtes de la paire ont pu être écrites pour l'une ou l'autre connexion
+        dropped.delete()
+        ConnectionEdge.objects.filter(connection=kept).delete()
+        common = {
+            'connection_id': kept.id,
+            'status': kept.status,
+            'created_at': kept.created_at,
+        }
+        ConnectionEdge.objects.bulk_create([
+            ConnectionEdge(user_id=kept.from_user_id, other_id=kept.to_user_id, outgoing=True, **common),
+            ConnectionEdge(user_id=kept.to_user_id, other_id=kept.from_user_id, outgoing=False, **common),
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('connections', '0004_user_graph_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_reverse_duplicates, migrations.RunPython.noop),
+    ]
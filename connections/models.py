@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Greatest, Least
 from django.contrib.auth.models import User
 
 class Connection(models.Model):
@@ -37,6 +38,124 @@ class Connection(models.Model):
         verbose_name_plural = "Connexions"
         unique_together = ['from_user', 'to_user']
         ordering = ['-created_at']
+        constraints = [
+            # Une seule connexion par paire d'utilisateurs, quel que soit le sens de la demande
+            models.UniqueConstraint(
+                Least('from_user', 'to_user'),
+                Greatest('from_user', 'to_user'),
+                name='connection_pair_unique'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.from_user.username} → {self.to_user.username} ({self.get_status_display()})"
+
+class ConnectionEdge(models.Model):
+    """
+    Liste d'adjacence non orientée : chaque Connection est reflétée par deux
+    lignes, une par extrémité. « A et B sont-ils liés ? » et « mes connexions
+    acceptées » deviennent une seule recherche d'index sur user.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Utilisateur",
+        related_name='connection_edges'
+    )
+    other = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Autre utilisateur",
+        related_name='+'
+    )
+    connection = models.ForeignKey(
+        Connection,
+        on_delete=models.CASCADE,
+        verbose_name="Connexion",
+        related_name='edges'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Connection.STATUS_CHOICES,
+        verbose_name="Statut"
+    )
+    outgoing = models.BooleanField(
+        verbose_name="Demande envoyée",
+        help_text="Vrai si user est l'émetteur de la demande"
+    )
+    created_at = models.DateTimeField(verbose_name="Date de création")
+
+    class Meta:
+        verbose_name = "Arête de connexion"
+        verbose_name_plural = "Arêtes de connexion"
+        unique_together = ['user', 'other']
+        indexes = [
+            models.Index(fields=['user', 'status', '-created_at'], name='edge_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} — {self.other_id} ({self.status})"
+
+class Suggestion(models.Model):
+    """Suggestion de connexion précalculée (« Vous connaissez peut-être »)"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Utilisateur",
+        related_name='suggestions'
+    )
+    candidate = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Utilisateur suggéré",
+        related_name='+'
+    )
+    score = models.FloatField(verbose_name="Score")
+    mutual_count = models.PositiveIntegerField(default=0, verbose_name="Relations en commun")
+    shared_skills_count = models.PositiveIntegerField(default=0, verbose_name="Compétences en commun")
+    shared_companies_count = models.PositiveIntegerField(default=0, verbose_name="Entreprises en commun")
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de calcul"
+    )
+
+    class Meta:
+        verbose_name = "Suggestion"
+        verbose_name_plural = "Suggestions"
+        unique_together = ['user', 'candidate']
+        indexes = [
+            models.Index(fields=['user', '-score'], name='suggestion_user_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.candidate_id} suggéré à {self.user_id} ({self.score})"
+
+
+class UserGraphStats(models.Model):
+    """Mesures du graphe des connexions acceptées (voir connections/graph.py)"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Utilisateur",
+        related_name='graph_stats'
+    )
+    degree = models.PositiveIntegerField(default=0, verbose_name="Nombre de connexions")
+    component = models.PositiveIntegerField(
+        verbose_name="Composante",
+        help_text="Plus petit identifiant d'utilisateur de la composante connexe"
+    )
+    component_size = models.PositiveIntegerField(verbose_name="Taille de la composante")
+    pagerank = models.FloatField(verbose_name="Centralité (PageRank)")
+    computed_at = models.DateTimeField(verbose_name="Date de calcul")
+
+    class Meta:
+        verbose_name = "Statistiques de graphe"
+        verbose_name_plural = "Statistiques de graphe"
+        indexes = [
+            models.Index(fields=['-pagerank'], name='graph_stats_pagerank_idx'),
+            models.Index(fields=['-degree'], name='graph_stats_degree_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} : {self.degree} connexions, PageRank {self.pagerank:.6f}"
@@ -0,0 +1,51 @@
+"""
+Relations en commun entre un utilisateur et une liste de profils.
+
+Les relations communes de tous les profils sont lues en une seule requête sur
+la liste d'adjacence : pour chaque profil, ses arêtes acceptées dont l'autre
+extrémité est une connexion du lecteur. Des fonctions de fenêtre donnent le
+total par profil et ne renvoient que les premiers noms à afficher.
+"""
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .models import ConnectionEdge
+
+# Nombre de noms affichés à côté du total
+MUTUAL_SAMPLE_SIZE = 3
+
+
+def get_mutual_connections(viewer_id, target_ids, samples=MUTUAL_SAMPLE_SIZE):
+    """
+    Relations en commun de viewer_id avec chaque profil de target_ids :
+    {target_id: (nombre, [utilisateurs échantillons])}. Les profils sans
+    relation commune sont absents.
+    """
+    target_ids = [target_id for target_id in target_ids if target_id != viewer_id]
+    if not target_ids:
+        return {}
+
+    viewer_friends = ConnectionEdge.objects.filter(user_id=viewer_id, status='ACCEPTED').values('other_id')
+    rows = ConnectionEdge.objects.filter(
+        user_id__in=target_ids,
+        status='ACCEPTED',
+        other_id__in=viewer_friends
+    ).annotate(
+        total=Window(Count('id'), partition_by=[F('user_id')]),
+        rank=Window(RowNumber(), partition_by=[F('user_id')], order_by=F('other_id').asc()),
+    ).filter(rank__lte=samples).select_related('other').order_by('user_id', 'rank')
+
+    mutual = {}
+    for edge in rows:
+        count, sample = mutual.setdefault(edge.user_id, (edge.total, []))
+        sample.append(edge.other)
+    return mutual
+
+
+def attach_mutual_connections(viewer, users, samples=MUTUAL_SAMPLE_SIZE):
+    """Renseigne mutual_count et mutual_sample sur chaque utilisateur de users"""
+    users = list(users)
+    mutual = get_mutual_connections(viewer.id, [user.id for user in users], samples)
+    for user in users:
+        user.mutual_count, user.mutual_sample = mutual.get(user.id, (0, []))
+    return users
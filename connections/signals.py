@@ -0,0 +1,73 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from .degrees import invalidate_degrees
+from .edges import create_edges, set_edges_status
+from .models import Connection
+from .suggestions import update_suggestions, forget_pair
+
+# Envoyé quand le statut d'une connexion change.
+# Arguments : instance, old_status (None à la création), new_status (None à la suppression)
+# et bulk (vrai lors d'une action groupée, voir connections/bulk.py : les effets
+# sont alors appliqués une seule fois, à la réception de connections_bulk_changed)
+connection_status_changed = Signal()
+
+# Envoyé une fois par action groupée, après les connection_status_changed (bulk=True).
+# Arguments : user (utilisateur à l'origine de l'action), connections, old_status, new_status
+connections_bulk_changed = Signal()
+
+
+@receiver(post_init, sender=Connection)
+def remember_connection_status(sender, instance, **kwargs):
+    """Mémorise le statut chargé pour détecter un changement à la sauvegarde"""
+    instance._initial_status = instance.status
+
+
+@receiver(post_save, sender=Connection)
+def connection_saved(sender, instance, created, **kwargs):
+    old_status = None if created else instance._initial_status
+    instance._initial_status = instance.status
+    if created:
+        create_edges(instance)
+    elif old_status != instance.status:
+        set_edges_status([instance.id], instance.status)
+    if old_status != instance.status:
+        connection_status_changed.send(
+            sender=Connection, instance=instance, old_status=old_status, new_status=instance.status
+        )
+
+
+@receiver(post_delete, sender=Connection)
+def connection_deleted(sender, instance, **kwargs):
+    # Les arêtes ont déjà été supprimées en cascade
+    connection_status_changed.send(
+        sender=Connection, instance=instance, old_status=instance._initial_status, new_status=None
+    )
+
+
+@receiver(connection_status_changed)
+def refresh_suggestions(sender, instance, old_status, new_status, bulk=False, **kwargs):
+    if bulk:
+        return
+    if old_status is None:
+        # Une demande en cours exclut déjà la paire des suggestions
+        forget_pair(instance.from_user_id, instance.to_user_id)
+    if new_status == 'ACCEPTED':
+        # Les relations en commun de chacun ont changé
+        update_suggestions(instance.from_user_id)
+        update_suggestions(instance.to_user_id)
+
+
+@receiver(connection_status_changed)
+def refresh_degrees(sender, instance, old_status, new_status, bulk=False, **kwargs):
+    if not bulk and 'ACCEPTED' in (old_status, new_status):
+        invalidate_degrees()
+
+
+@receiver(connections_bulk_changed)
+def bulk_refresh_suggestions(sender, user, connections, old_status, new_status, **kwargs):
+    if new_status == 'ACCEPTED':
+        # Seules les suggestions de user sont recalculées tout de suite ; celles
+        # des autres utilisateurs le sont par la commande compute_suggestions
+        update_suggestions(user.id)
+        invalidate_degrees()
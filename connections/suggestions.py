@@ -0,0 +1,181 @@
+"""
+Suggestions de connexions (« Vous connaissez peut-être »).
+
+Les candidats sont classés selon le nombre de relations en commun, de compétences
+en commun et d'entreprises en commun. Les utilisateurs ayant déjà une connexion
+en attente, acceptée ou bloquée avec l'utilisateur sont exclus.
+
+Le calcul complet (compute_suggestions) charge le graphe une seule fois en mémoire ;
+update_suggestions recalcule un seul utilisateur avec quelques requêtes ciblées.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import Lower
+
+from accounts.models import Skill, UserSkill, Experience
+from .models import Connection, ConnectionEdge, Suggestion
+
+MUTUAL_WEIGHT = 3
+SKILL_WEIGHT = 1
+COMPANY_WEIGHT = 2
+
+# Nombre de suggestions conservées par utilisateur
+SUGGESTIONS_PER_USER = 20
+
+# Au-delà de ce nombre de membres, une compétence ou une entreprise n'est plus discriminante
+MAX_GROUP_SIZE = 500
+
+EXCLUDED_STATUSES = ['PENDING', 'ACCEPTED', 'BLOCKED']
+
+
+def rank_candidates(user_id, mutual, shared_skills, shared_companies, excluded):
+    """Construit les meilleures suggestions de user_id à partir des compteurs par candidat"""
+    candidates = (set(mutual) | set(shared_skills) | set(shared_companies)) - excluded
+    candidates.discard(user_id)
+
+    scored = (
+        (
+            MUTUAL_WEIGHT * mutual[candidate]
+            + SKILL_WEIGHT * shared_skills[candidate]
+            + COMPANY_WEIGHT * shared_companies[candidate],
+            candidate
+        )
+        for candidate in candidates
+    )
+    return [
+        Suggestion(
+            user_id=user_id,
+            candidate_id=candidate,
+            score=score,
+            mutual_count=mutual[candidate],
+            shared_skills_count=shared_skills[candidate],
+            shared_companies_count=shared_companies[candidate],
+        )
+        for score, candidate in heapq.nlargest(SUGGESTIONS_PER_USER, scored)
+    ]
+
+
+def save_suggestions(user_ids, suggestions):
+    """Remplace les suggestions des utilisateurs donnés"""
+    with transaction.atomic():
+        Suggestion.objects.filter(user_id__in=user_ids).delete()
+        Suggestion.objects.bulk_create(suggestions, batch_size=1000)
+
+
+def _groups(rows):
+    """Regroupe des couples (utilisateur, clé) : clé -> membres et utilisateur -> clés"""
+    members = defaultdict(set)
+    keys = defaultdict(set)
+    for user_id, key in rows:
+        if key:
+            members[key].add(user_id)
+            keys[user_id].add(key)
+    return members, keys
+
+
+def _shared(user_id, keys, members):
+    """Nombre de clés partagées avec chaque autre membre, hors groupes trop larges"""
+    shared = Counter()
+    for key in keys.get(user_id, ()):
+        group = members[key]
+        if len(group) <= MAX_GROUP_SIZE:
+            shared.update(group)
+    return shared
+
+
+def compute_suggestions(batch_size=500, progress=None):
+    """
+    Recalcule les suggestions de tous les utilisateurs.
+
+    Les connexions, compétences et entreprises sont lues une seule fois ;
+    les suggestions sont écrites par lots de batch_size utilisateurs.
+    """
+    adjacency = defaultdict(set)
+    excluded = defaultdict(set)
+    rows = Connection.objects.filter(status__in=EXCLUDED_STATUSES).values_list(
+        'from_user_id', 'to_user_id', 'status'
+    )
+    for from_id, to_id, status in rows.iterator(chunk_size=10000):
+        excluded[from_id].add(to_id)
+        excluded[to_id].add(from_id)
+        if status == 'ACCEPTED':
+            adjacency[from_id].add(to_id)
+            adjacency[to_id].add(from_id)
+
+    skill_members, user_skills = _groups(
+        UserSkill.objects.values_list('user_id', 'skill_id').iterator(chunk_size=10000)
+    )
+    company_members, user_companies = _groups(
+        Experience.objects.values_list('user_id', Lower('company')).iterator(chunk_size=10000)
+    )
+
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        suggestions = []
+        for user_id in batch:
+            mutual = Counter()
+            for friend_id in adjacency.get(user_id, ()):
+                mutual.update(adjacency[friend_id])
+            suggestions.extend(rank_candidates(
+                user_id,
+                mutual,
+                _shared(user_id, user_skills, skill_members),
+                _shared(user_id, user_companies, company_members),
+                excluded.get(user_id, set()),
+            ))
+        save_suggestions(batch, suggestions)
+        if progress:
+            progress(start + len(batch), len(user_ids))
+
+    return len(user_ids)
+
+
+def update_suggestions(user_id):
+    """Recalcule les suggestions d'un seul utilisateur"""
+    rows = ConnectionEdge.objects.filter(
+        user_id=user_id,
+        status__in=EXCLUDED_STATUSES
+    ).values_list('other_id', 'status')
+    excluded = set()
+    friend_ids = set()
+    for other_id, status in rows:
+        excluded.add(other_id)
+        if status == 'ACCEPTED':
+            friend_ids.add(other_id)
+
+    # Voisins des connexions : chaque voisin d'une connexion compte une relation commune
+    mutual = Counter(ConnectionEdge.objects.filter(
+        user_id__in=friend_ids,
+        status='ACCEPTED'
+    ).values_list('other_id', flat=True))
+
+    skill_ids = Skill.objects.filter(
+        id__in=UserSkill.objects.filter(user_id=user_id).values('skill_id')
+    ).annotate(members=Count('user_skills')).filter(members__lte=MAX_GROUP_SIZE).values('id')
+    shared_skills = Counter(
+        UserSkill.objects.filter(skill_id__in=skill_ids).values_list('user_id', flat=True)
+    )
+
+    companies = set(
+        Experience.objects.filter(user_id=user_id).annotate(name=Lower('company')).values_list('name', flat=True)
+    )
+    company_rows = Experience.objects.annotate(name=Lower('company')).filter(name__in=companies).values_list(
+        'user_id', 'name'
+    ).distinct()
+    company_members, user_companies = _groups(company_rows)
+    shared_companies = _shared(user_id, user_companies, company_members)
+
+    save_suggestions([user_id], rank_candidates(user_id, mutual, shared_skills, shared_companies, excluded))
+
+
+def forget_pair(user_id, other_id):
+    """Retire les suggestions réciproques entre deux utilisateurs"""
+    Suggestion.objects.filter(
+        Q(user_id=user_id, candidate_id=other_id) |
+        Q(user_id=other_id, candidate_id=user_id)
+    ).delete()
@@ -1,3 +1,377 @@
+import re
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db import connection as db_connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Skill, UserSkill, Experience
+from posts.models import Post, TimelineEntry
+from achievements.models import AchievementCounters
+from notifications.models import Notification
+from notifications.unread import get_unread_count
+from . import graph
+from .bulk import apply_bulk_action
+from .models import Connection, ConnectionEdge, Suggestion, UserGraphStats
+from .suggestions import compute_suggestions
+from .degrees import compute_degree, get_degree
+from .listing import CONNECTIONS_PER_PAGE
+from .mutual import get_mutual_connections
+from .utils import get_connection_ids
+from .views import MAX_SEARCH_PAGE
+
+
+def create_users(*names):
+    return [
+        User.objects.create_user(username=name, email=f'{name}@example.com', password='pass')
+        for name in names
+    ]
+
+
+def connect(from_user, to_user, status='ACCEPTED'):
+    return Connection.objects.create(from_user=from_user, to_user=to_user, status=status)
+
+
+class SuggestionTest(TestCase):
+    """Suggestions « Vous connaissez peut-être »"""
+
+    def setUp(self):
+        self.me, self.friend1, self.friend2, self.close, self.far, self.pending = create_users(
+            'me', 'friend1', 'friend2', 'close', 'far', 'pending'
+        )
+        connect(self.me, self.friend1)
+        connect(self.friend2, self.me)
+        connect(self.friend1, self.close)
+        connect(self.close, self.friend2)
+        connect(self.friend1, self.far)
+        connect(self.friend1, self.pending)
+        connect(self.me, self.pending, status='PENDING')
+
+    def suggested(self, user):
+        return list(Suggestion.objects.filter(user=user).order_by('-score').values_list('candidate__username', 'mutual_count'))
+
+    def test_batch_ranks_by_mutual_connections(self):
+        compute_suggestions()
+        self.assertEqual(self.suggested(self.me), [('close', 2), ('far', 1)])
+
+    def test_shared_skills_and_companies(self):
+        python = Skill.objects.create(name='Python')
+        UserSkill.objects.create(user=self.me, skill=python)
+        UserSkill.objects.create(user=self.far, skill=python)
+        for user in (self.me, self.far):
+            Experience.objects.create(user=user, company='ACME', position='Dev', start_date='2020-01-01', is_current=True)
+
+        compute_suggestions()
+        suggestion = Suggestion.objects.get(user=self.me, candidate=self.far)
+        self.assertEqual((suggestion.shared_skills_count, suggestion.shared_companies_count), (1, 1))
+        self.assertEqual(self.suggested(self.me)[0][0], 'far')
+
+    def test_incremental_update_on_accept(self):
+        compute_suggestions()
+        newcomer, = create_users('newcomer')
+        connect(newcomer, self.close)
+        request = connect(self.me, newcomer, status='PENDING')
+        self.assertFalse(Suggestion.objects.filter(user=self.me, candidate=newcomer).exists())
+
+        request.status = 'ACCEPTED'
+        request.save()
+        # close devient une relation commune via newcomer
+        self.assertEqual(self.suggested(self.me)[0], ('close', 3))
+        self.assertIn(('friend1', 2), self.suggested(newcomer))
+
+
+class ConnectionEdgeTest(TestCase):
+    """Liste d'adjacence non orientée"""
+
+    def setUp(self):
+        self.alice, self.bob = create_users('alice', 'bob')
+
+    def edges(self):
+        return sorted(ConnectionEdge.objects.values_list('user__username', 'other__username', 'status', 'outgoing'))
+
+    def test_edges_follow_connection(self):
+        connection = connect(self.alice, self.bob, status='PENDING')
+        self.assertEqual(self.edges(), [
+            ('alice', 'bob', 'PENDING', True),
+            ('bob', 'alice', 'PENDING', False),
+        ])
+
+        connection.status = 'ACCEPTED'
+        connection.save()
+        self.assertEqual(get_connection_ids(self.bob.id), [self.alice.id])
+
+        connection.delete()
+        self.assertEqual(self.edges(), [])
+
+    def test_lookup_is_single_query_in_both_directions(self):
+        connect(self.bob, self.alice)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_connection_ids(self.alice.id), [self.bob.id])
+
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('connections:user_profile', args=[self.bob.id]))
+        self.assertEqual(response.context['connection_status'], 'ACCEPTED')
+        response = self.client.get(reverse('connections:connection_list'))
+        self.assertEqual([edge.other for edge in response.context['accepted_connections']], [self.bob])
+
+    def test_one_connection_per_pair(self):
+        connect(self.alice, self.bob, status='PENDING')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            connect(self.bob, self.alice, status='PENDING')
+
+        self.client.force_login(self.bob)
+        self.client.post(reverse('connections:send_connection_request', args=[self.alice.id]))
+        self.assertEqual(Connection.objects.count(), 1)
+        self.assertEqual(len(self.edges()), 2)
+
+    def test_rebuild_command(self):
+        connect(self.alice, self.bob)
+        ConnectionEdge.objects.all().delete()
+        call_command('rebuild_connection_edges', stdout=StringIO())
+        self.assertEqual(len(self.edges()), 2)
+
+
+class BulkConnectionActionTest(TestCase):
+    """Actions groupées sur les demandes en attente"""
+
+    def setUp(self):
+        self.me, = create_users('me')
+        self.senders = create_users(*[f'sender{i}' for i in range(5)])
+        self.requests = [connect(sender, self.me, status='PENDING') for sender in self.senders]
+        self.sent = connect(self.me, create_users('target')[0], status='PENDING')
+        self.client.force_login(self.me)
+
+    def bulk(self, action, connections, **headers):
+        return self.client.post(reverse('connections:bulk_connection_action'), {
+            'action': action,
+            'connection_ids': [connection.id for connection in connections],
+        }, **headers)
+
+    def test_accept_returns_counts_as_json(self):
+        response = self.bulk('accept', self.requests[:3] + [self.sent], HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['processed'], 3)
+        self.assertEqual(response.json()['counts'], {'accepted': 3, 'received': 2, 'sent': 1})
+        self.assertEqual(sorted(get_connection_ids(self.me.id)), [user.id for user in self.senders[:3]])
+        # Les fils d'actualité sont reliés comme pour une acceptation unitaire
+        post = Post.objects.create(author=self.senders[0], content='Bonjour')
+        self.assertTrue(TimelineEntry.objects.filter(user=self.me, post=post).exists())
+
+    def test_reject_and_cancel(self):
+        self.bulk('reject', self.requests)
+        self.assertEqual(Connection.objects.filter(status='REJECTED').count(), 5)
+        self.assertFalse(ConnectionEdge.objects.filter(status='PENDING', outgoing=False, user=self.me).exists())
+
+        # Une demande reçue ne peut pas être annulée par son destinataire
+        self.bulk('cancel', self.requests + [self.sent])
+        self.assertFalse(Connection.objects.filter(id=self.sent.id).exists())
+        self.assertEqual(Connection.objects.count(), 5)
+
+    def test_accept_all(self):
+        self.client.post(reverse('connections:bulk_connection_action'), {'action': 'accept', 'all': '1'})
+        self.assertEqual(len(get_connection_ids(self.me.id)), 5)
+        self.assertEqual(Connection.objects.get(id=self.sent.id).status, 'PENDING')
+
+    def test_invalid_action(self):
+        response = self.bulk('delete', self.requests, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_side_effects_are_batched(self):
+        def accept_all(name, count):
+            user, = create_users(name)
+            senders = create_users(*[f'{name}_sender{i}' for i in range(count)])
+            for sender in senders:
+                connect(sender, user, status='PENDING')
+                Post.objects.create(author=sender, content='Bonjour')
+            with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(db_connection) as queries:
+                apply_bulk_action(user, 'accept')
+            return user, senders, len(queries)
+
+        _, _, few = accept_all('few', 2)
+        user, senders, many = accept_all('many', 12)
+        # Nombre de requêtes indépendant du nombre de demandes acceptées
+        self.assertEqual(few, many)
+
+        self.assertEqual(TimelineEntry.objects.filter(user=user).count(), 12)
+        self.assertEqual(AchievementCounters.objects.get(user=user).connections_count, 12)
+        self.assertEqual(AchievementCounters.objects.filter(user__in=senders, connections_count=1).count(), 12)
+        self.assertEqual(
+            Notification.objects.filter(from_user=user, notification_type='CONNECTION_ACCEPTED').count(), 12
+        )
+
+
+class ConnectionListTest(TestCase):
+    """Sections paginées de « Mes connexions »"""
+
+    def setUp(self):
+        self.me, = create_users('me')
+        self.friends = create_users(*[f'friend{i:02d}' for i in range(30)])
+        for friend in self.friends:
+            connect(self.me, friend)
+        self.requester, = create_users('requester')
+        connect(self.requester, self.me, status='PENDING')
+        self.client.force_login(self.me)
+
+    def test_first_page_and_counts(self):
+        # session, utilisateur, totaux groupés, connexions, demandes reçues
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('connections:connection_list'))
+        self.assertEqual(response.context['counts'], {'accepted': 30, 'received': 1, 'sent': 0})
+        self.assertEqual(len(response.context['accepted_connections']), CONNECTIONS_PER_PAGE)
+        self.assertContains(response, 'Voir plus')
+
+    def test_load_more_endpoint(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'section': 'accepted', **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(reverse('connections:connection_section'), params).json()
+            seen += re.findall(r'/connections/profile/(\d+)/', data['html'])
+            if not data['has_next']:
+                break
+            cursor = data['next_cursor']
+        self.assertEqual(sorted(map(int, seen)), sorted(friend.id for friend in self.friends))
+
+        response = self.client.get(reverse('connections:connection_section'), {'section': 'other'})
+        self.assertEqual(response.status_code, 400)
+
+
+class MutualConnectionsTest(TestCase):
+    """Relations en commun"""
+
+    def setUp(self):
+        self.me, self.target, self.other, *self.friends = create_users(
+            'me', 'target', 'other', 'f1', 'f2', 'f3', 'f4'
+        )
+        for friend in self.friends:
+            connect(self.me, friend)
+            connect(friend, self.target)
+        connect(self.friends[0], self.other)
+        connect(self.other, create_users('stranger')[0])
+
+    def test_counts_and_samples_in_one_query(self):
+        with self.assertNumQueries(1):
+            mutual = get_mutual_connections(self.me.id, [self.target.id, self.other.id, self.me.id], samples=2)
+        self.assertEqual(mutual[self.target.id], (4, self.friends[:2]))
+        self.assertEqual(mutual[self.other.id], (1, [self.friends[0]]))
+        self.assertNotIn(self.me.id, mutual)
+
+    def test_rendered_on_profile(self):
+        self.client.force_login(self.me)
+        response = self.client.get(reverse('connections:user_profile', args=[self.target.id]))
+        self.assertContains(response, "4 relations en commun")
+
+
+class ConnectionDegreeTest(TestCase):
+    """Degré de relation par recherche en largeur bidirectionnelle"""
+
+    def setUp(self):
+        cache.clear()
+        self.users = create_users('u0', 'u1', 'u2', 'u3', 'u4')
+        # Chaîne u0 - u1 - u2 - u3 - u4
+        for left, right in zip(self.users, self.users[1:]):
+            connect(left, right)
+
+    def test_compute_degree(self):
+        u0 = self.users[0].id
+        self.assertEqual([compute_degree(u0, user.id) for user in self.users], [0, 1, 2, 3, None])
+        self.assertEqual(compute_degree(self.users[4].id, u0), None)
+        self.assertEqual(compute_degree(self.users[4].id, self.users[1].id), 3)
+
+    def test_cached_and_invalidated_on_accept(self):
+        u0, u3 = self.users[0], self.users[3]
+        self.assertEqual(get_degree(u0.id, u3.id), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_degree(u3.id, u0.id), 3)
+
+        request = connect(u0, u3, status='PENDING')
+        self.assertEqual(get_degree(u0.id, u3.id), 3)
+        request.status = 'ACCEPTED'
+        request.save()
+        self.assertEqual(get_degree(u0.id, u3.id), 1)
+
+        self.client.force_login(u0)
+        response = self.client.get(reverse('connections:user_profile', args=[self.users[4].id]))
+        self.assertEqual(response.context['degree'], 2)
+
+
+class GraphStatsTest(TestCase):
+    """Instantané CSR du graphe et statistiques"""
+
+    def setUp(self):
+        self.hub, self.l1, self.l2, self.l3, self.x, self.y, self.alone = create_users(
+            'hub', 'l1', 'l2', 'l3', 'x', 'y', 'alone'
+        )
+        for leaf in (self.l1, self.l2, self.l3):
+            connect(self.hub, leaf)
+        connect(self.y, self.x)
+        connect(self.alone, self.hub, status='PENDING')
+
+    def stats(self, use_numpy):
+        snapshot = graph.load_snapshot(use_numpy)
+        degrees, components, sizes, pagerank = graph.compute_graph_stats(snapshot)
+        return snapshot, degrees, components, sizes, [round(rank, 6) for rank in pagerank]
+
+    def test_python_and_numpy_agree(self):
+        snapshot, degrees, components, sizes, pagerank = self.stats(use_numpy=False)
+        self.assertEqual(snapshot.edge_count, 4)
+        self.assertEqual(degrees, [3, 1, 1, 1, 1, 1, 0])
+        self.assertEqual(components, [self.hub.id] * 4 + [self.x.id] * 2 + [self.alone.id])
+        self.assertEqual(sizes, [4, 4, 4, 4, 2, 2, 1])
+        self.assertAlmostEqual(sum(pagerank), 1, places=4)
+        self.assertEqual(max(range(7), key=pagerank.__getitem__), 0)
+
+        if graph.np is not None:
+            self.assertEqual(self.stats(use_numpy=True)[1:], (degrees, components, sizes, pagerank))
+
+    def test_command_writes_stats(self):
+        call_command('compute_graph_stats', stdout=StringIO())
+        stats = UserGraphStats.objects.get(user=self.l2)
+        self.assertEqual((stats.degree, stats.component, stats.component_size), (1, self.hub.id, 4))
+        self.assertEqual(UserGraphStats.objects.order_by('-pagerank').first().user, self.hub)
+
+
+class SearchUsersTest(TestCase):
+    """Recherche d'utilisateurs à connecter"""
+
+    def setUp(self):
+        self.me, = create_users('me')
+        self.client.force_login(self.me)
+        self.others = create_users(*[f'dupont{i:02d}' for i in range(25)])
+        # Les premiers résultats sont déjà liés : ils ne doivent pas raccourcir la page
+        connect(self.me, self.others[0])
+        connect(self.others[1], self.me, status='PENDING')
+        connect(self.me, self.others[2], status='BLOCKED')
+        connect(self.others[3], self.me, status='REJECTED')
+        # Compteur de notifications non lues de la barre de navigation déjà en cache
+        get_unread_count(self.me.id)
+
+    def search(self, **params):
+        return self.client.get(reverse('connections:search_users'), {'q': 'dupont', **params})
+
+    def test_excludes_linked_users_and_fills_pages(self):
+        with self.assertNumQueries(4):  # session, utilisateur, recherche, relations en commun
+            response = self.search()
+        users = [user.username for user in response.context['users']]
+        self.assertEqual(len(users), 20)
+        self.assertNotIn('dupont00', users)
+        self.assertNotIn('dupont01', users)
+        self.assertNotIn('dupont02', users)
+        self.assertIn('dupont03', users)
+        self.assertTrue(response.context['has_next'])
+
+        response = self.search(page=2)
+        self.assertEqual(len(response.context['users']), 2)
+        self.assertFalse(response.context['has_next'])
+        self.assertTrue(response.context['has_previous'])
 
-# Create your tests here.
+    def test_page_number_is_clamped(self):
+        response = self.search(page=10 ** 20)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_number'], MAX_SEARCH_PAGE)
+        self.assertEqual(list(response.context['users']), [])
+        self.assertEqual(self.search(page='-3').context['page_number'], 1)
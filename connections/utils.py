@@ -0,0 +1,24 @@
+from django.db.models import Exists, OuterRef
+
+from .models import ConnectionEdge
+
+# Statuts qui retirent un utilisateur des recherches et suggestions
+LINKED_STATUSES = ['PENDING', 'ACCEPTED', 'BLOCKED']
+
+
+def get_connection_ids(user_id):
+    """Identifiants des utilisateurs ayant une connexion acceptée avec user_id"""
+    return list(ConnectionEdge.objects.filter(
+        user_id=user_id,
+        status='ACCEPTED'
+    ).values_list('other_id', flat=True))
+
+
+def exclude_linked_users(queryset, user_id, statuses=LINKED_STATUSES):
+    """
+    Retire d'un queryset d'utilisateurs ceux qui ont une connexion avec user_id
+    dans l'un des statuts donnés, par un NOT EXISTS servi par l'index unique
+    (user, other) des arêtes.
+    """
+    edges = ConnectionEdge.objects.filter(user_id=user_id, other_id=OuterRef('pk'), status__in=statuses)
+    return queryset.filter(~Exists(edges))
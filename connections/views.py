@@ -2,10 +2,18 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Q
+from django.template.loader import render_to_string
+from django.db import IntegrityError, transaction
 from django.contrib.auth.models import User
 from .models import Connection
 from accounts.models import Profile
+from accounts.search import search_users
+from posts.feed import CursorPage
+from .bulk import BULK_ACTIONS, apply_bulk_action
+from .degrees import get_degree
+from .listing import SECTIONS, get_connection_counts, get_section_page
+from .mutual import attach_mutual_connections
+from .utils import exclude_linked_users
 
 from django.views.generic import TemplateView, View
 
@@ -20,35 +28,56 @@ class ConnectionListView(TemplateView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
-        """Récupère les données de contexte pour la liste des connexions"""
+        """Récupère la première page de chaque section et les totaux"""
         context = super().get_context_data(**kwargs)
 
-        # Connexions acceptées
-        accepted_connections = Connection.objects.filter(
-            Q(from_user=self.request.user, status='ACCEPTED') |
-            Q(to_user=self.request.user, status='ACCEPTED')
-        ).select_related('from_user', 'from_user__profile', 'to_user', 'to_user__profile')
+        # Sans JavaScript, « Voir plus » recharge la page avec le curseur de la section
+        section = self.request.GET.get('section')
+        cursor = self.request.GET.get('cursor')
+        counts = get_connection_counts(self.request.user.id)
 
-        # Demandes envoyées en attente
-        sent_pending = Connection.objects.filter(
-            from_user=self.request.user,
-            status='PENDING'
-        ).select_related('to_user', 'to_user__profile')
-
-        # Demandes reçues en attente
-        received_pending = Connection.objects.filter(
-            to_user=self.request.user,
-            status='PENDING'
-        ).select_related('from_user', 'from_user__profile')
+        # Les sections vides ne sont pas interrogées
+        pages = {
+            name: get_section_page(self.request.user, name, cursor if name == section else None)
+            if counts[name] else CursorPage([], None)
+            for name in SECTIONS
+        }
 
         context.update({
-            'accepted_connections': accepted_connections,
-            'sent_pending': sent_pending,
-            'received_pending': received_pending,
+            'counts': counts,
+            'accepted_connections': pages['accepted'],
+            'received_pending': pages['received'],
+            'sent_pending': pages['sent'],
         })
 
         return context
 
+class ConnectionSectionView(View):
+    """Page suivante d'une section de « Mes connexions » en JSON"""
+    http_method_names = ['get']
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect('accounts:login')
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        section = request.GET.get('section')
+        if section not in SECTIONS:
+            return JsonResponse({'success': False, 'error': 'Section invalide.'}, status=400)
+
+        page = get_section_page(request.user, section, request.GET.get('cursor'))
+        html = ''.join(
+            render_to_string('connections/connection_card.html', {'edge': edge, 'section': section}, request=request)
+            for edge in page
+        )
+        return JsonResponse({
+            'success': True,
+            'html': html,
+            'next_cursor': page.next_cursor,
+            'has_next': page.has_next,
+        })
+
 class SendConnectionRequestView(View):
     """Envoyer une demande de connexion"""
 
@@ -65,8 +94,8 @@ class SendConnectionRequestView(View):
             return redirect('connections:connection_list')
 
         existing_connection = Connection.objects.filter(
-            Q(from_user=request.user, to_user=target_user) |
-            Q(from_user=target_user, to_user=request.user)
+            edges__user=request.user,
+            edges__other=target_user
         ).first()
 
         if existing_connection:
@@ -88,12 +117,18 @@ class SendConnectionRequestView(View):
             elif existing_connection.status == 'BLOCKED':
                 messages.error(request, "Vous ne pouvez pas envoyer de demande à cet utilisateur.")
         else:
-            Connection.objects.create(
-                from_user=request.user,
-                to_user=target_user,
-                status='PENDING'
-            )
-            messages.success(request, f"Demande de connexion envoyée à {target_user.get_full_name() or target_user.username}")
+            try:
+                with transaction.atomic():
+                    Connection.objects.create(
+                        from_user=request.user,
+                        to_user=target_user,
+                        status='PENDING'
+                    )
+            except IntegrityError:
+                # Demande croisée envoyée au même moment par l'autre utilisateur
+                messages.info(request, "Cet utilisateur vous a déjà envoyé une demande de connexion.")
+            else:
+                messages.success(request, f"Demande de connexion envoyée à {target_user.get_full_name() or target_user.username}")
 
         return redirect('connections:connection_list')
 
@@ -169,6 +204,47 @@ class CancelConnectionRequestView(View):
         )
         return redirect('connections:connection_list')
 
+class BulkConnectionActionView(View):
+    """Accepter, refuser ou annuler plusieurs demandes de connexion en une fois"""
+    http_method_names = ['post']
+
+    SUCCESS_MESSAGES = {
+        'accept': "{count} demande(s) de connexion acceptée(s)",
+        'reject': "{count} demande(s) de connexion refusée(s)",
+        'cancel': "{count} demande(s) de connexion annulée(s)",
+    }
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect('accounts:login')
+        return super().dispatch(request, *args, **kwargs)
+
+    def wants_json(self):
+        return 'application/json' in self.request.headers.get('Accept', '')
+
+    def post(self, request):
+        action = request.POST.get('action')
+        if action not in BULK_ACTIONS:
+            if self.wants_json():
+                return JsonResponse({'success': False, 'error': 'Action invalide.'}, status=400)
+            messages.error(request, "Action invalide.")
+            return redirect('connections:connection_list')
+
+        connection_ids = None
+        if not request.POST.get('all'):
+            connection_ids = [value for value in request.POST.getlist('connection_ids') if value.isdigit()]
+        count = apply_bulk_action(request.user, action, connection_ids)
+
+        if self.wants_json():
+            return JsonResponse({
+                'success': True,
+                'action': action,
+                'processed': count,
+                'counts': get_connection_counts(request.user.id),
+            })
+        messages.success(request, self.SUCCESS_MESSAGES[action].format(count=count))
+        return redirect('connections:connection_list')
+
 class RemoveConnectionView(View):
     """Supprimer une connexion existante"""
 
@@ -196,6 +272,16 @@ class RemoveConnectionView(View):
         )
         return redirect('connections:connection_list')
 
+SEARCH_RESULTS_PER_PAGE = 20
+# Au-delà, le décalage n'apporte rien et peut dépasser les entiers de la base
+MAX_SEARCH_PAGE = 50
+
+def get_page_number(request):
+    try:
+        return min(max(int(request.GET.get('page', 1)), 1), MAX_SEARCH_PAGE)
+    except ValueError:
+        return 1
+
 class SearchUsersView(TemplateView):
     """Rechercher des utilisateurs"""
     template_name = 'connections/search_users.html'
@@ -210,32 +296,26 @@ class SearchUsersView(TemplateView):
 
         query = self.request.GET.get('q', '')
         users = []
+        page_number = get_page_number(self.request)
+        has_next = False
 
         if query:
-            users = User.objects.filter(
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(username__icontains=query) |
-                Q(profile__bio__icontains=query)
-            ).exclude(id=self.request.user.id).select_related('profile')[:20]
-
-            existing_connections = Connection.objects.filter(
-                Q(from_user=self.request.user) | Q(to_user=self.request.user),
-                status__in=['PENDING', 'ACCEPTED', 'BLOCKED']
-            ).values_list('from_user_id', 'to_user_id')
-
-            excluded_user_ids = set()
-            for from_id, to_id in existing_connections:
-                if from_id == self.request.user.id:
-                    excluded_user_ids.add(to_id)
-                else:
-                    excluded_user_ids.add(from_id)
-
-            users = [user for user in users if user.id not in excluded_user_ids]
+            candidates = exclude_linked_users(
+                User.objects.exclude(id=self.request.user.id).select_related('profile'),
+                self.request.user.id
+            )
+            # Un élément de plus que la page pour savoir s'il existe une page suivante, sans COUNT
+            offset = (page_number - 1) * SEARCH_RESULTS_PER_PAGE
+            users = list(search_users(candidates, query)[offset:offset + SEARCH_RESULTS_PER_PAGE + 1])
+            has_next = len(users) > SEARCH_RESULTS_PER_PAGE
+            users = attach_mutual_connections(self.request.user, users[:SEARCH_RESULTS_PER_PAGE])
 
         context.update({
             'users': users,
             'query': query,
+            'page_number': page_number,
+            'has_next': has_next,
+            'has_previous': page_number > 1,
         })
 
         return context
@@ -259,18 +339,25 @@ class UserProfileView(TemplateView):
         connection_id = None
         if target_user != self.request.user:
             connection = Connection.objects.filter(
-                Q(from_user=self.request.user, to_user=target_user) |
-                Q(from_user=target_user, to_user=self.request.user)
+                edges__user=self.request.user,
+                edges__other=target_user
             ).first()
 
             if connection:
                 connection_status = connection.status
                 connection_id = connection.id
 
+        degree = None
+        if target_user != self.request.user:
+            attach_mutual_connections(self.request.user, [target_user])
+            degree = get_degree(self.request.user.id, target_user.id)
+
         context.update({
             'target_user': target_user,
             'connection_status': connection_status,
             'connection_id': connection_id,
+            'degree': degree,
+            'trophies': target_user.trophies.select_related('trophy'),
         })
 
         return context
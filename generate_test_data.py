@@ -15,6 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'linkedin_project.settings')
 django.setup()
 
 from django.contrib.auth.models import User
+from django.db.models import Q
 from django.utils import timezone
 from accounts.models import Profile, Skill, UserSkill, Experience
 from posts.models import Post, Comment, Reaction
@@ -222,8 +223,10 @@ def create_connections(users):
         connections = random.sample(other_users, random.randint(2, min(5, len(other_users))))
 
         for other_user in connections:
-            # Éviter les doublons
-            if not Connection.objects.filter(from_user=user, to_user=other_user).exists():
+            # Éviter les doublons, dans un sens comme dans l'autre
+            if not Connection.objects.filter(
+                Q(from_user=user, to_user=other_user) | Q(from_user=other_user, to_user=user)
+            ).exists():
                 Connection.objects.create(
                     from_user=user,
                     to_user=other_user,
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import Job, DeadJob
+from .queue import requeue
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at')
+    list_filter = ('task',)
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at')
+    ordering = ('run_at', 'id')
+
+class DeadJobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'attempts', 'created_at', 'failed_at')
+    list_filter = ('task', 'failed_at')
+    readonly_fields = ('task', 'args', 'attempts', 'error', 'created_at', 'failed_at')
+    ordering = ('-failed_at',)
+    actions = ['requeue_jobs']
+
+    @admin.action(description="Relancer les tâches sélectionnées")
+    def requeue_jobs(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(request, f"{count} tâche(s) reprogrammée(s)")
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(DeadJob, DeadJobAdmin)
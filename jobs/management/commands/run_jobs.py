@@ -0,0 +1,55 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs.queue import claim_job, release_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches en attente (traitement des images téléversées, etc.)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help="S'arrête dès que la file est vide")
+        parser.add_argument('--sleep', type=float, default=None, help="Attente (secondes) quand la file est vide")
+
+    def stop(self, signum, frame):
+        # La tâche en cours se termine avant l'arrêt
+        self.stopping = True
+
+    def handle(self, *args, **options):
+        interval = options['sleep'] if options['sleep'] is not None else settings.JOB_POLL_INTERVAL
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        previous = {signum: signal.signal(signum, self.stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+        self.stdout.write(f"Worker {worker} démarré")
+        release_stale_jobs()
+        done = failed = 0
+        try:
+            while not self.stopping:
+                # Connexion renouvelée entre deux tâches, sauf si la commande est
+                # appelée dans une transaction (tests, call_command)
+                if not connection.in_atomic_block:
+                    close_old_connections()
+                job = claim_job(worker)
+                if job is None:
+                    if options['burst']:
+                        break
+                    release_stale_jobs()
+                    time.sleep(interval)
+                    continue
+                if run_job(job):
+                    done += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"  Échec de {job} (tentative {job.attempts}/{job.max_attempts})")
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {done} tâche(s) exécutée(s), {failed} échec(s)"))
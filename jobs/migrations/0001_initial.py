@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200, verbose_name='Tâche')),
+                ('args', models.JSONField(default=list, verbose_name='Arguments')),
+                ('attempts', models.PositiveIntegerField(verbose_name='Tentatives')),
+                ('error', models.TextField(verbose_name='Erreur')),
+                ('created_at', models.DateTimeField(verbose_name='Date de création')),
+                ('failed_at', models.DateTimeField(auto_now_add=True, verbose_name="Date d'abandon")),
+            ],
+            options={
+                'verbose_name': 'Tâche en échec',
+                'verbose_name_plural': 'Tâches en échec',
+                'ordering': ['-failed_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200, verbose_name='Tâche')),
+                ('args', models.JSONField(default=list, verbose_name='Arguments')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Tentatives maximales')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Exécution prévue')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Prise en charge')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+            ],
+            options={
+                'verbose_name': 'Tâche',
+                'verbose_name_plural': 'Tâches',
+                'ordering': ['run_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('locked_at__isnull', True)), fields=['run_at', 'id'], name='job_ready_idx')],
+            },
+        ),
+    ]
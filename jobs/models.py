@@ -0,0 +1,55 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Tâche en attente d'exécution par un worker (commande run_jobs). Une tâche
+    réussie est supprimée ; une tâche qui a épuisé ses tentatives passe dans
+    DeadJob.
+    """
+    # Chemin pointé de la fonction à appeler, par exemple 'linkedin_project.images.process_image'
+    task = models.CharField(max_length=200, verbose_name="Tâche")
+    args = models.JSONField(default=list, verbose_name="Arguments")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Tentatives maximales")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Exécution prévue")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Prise en charge")
+    last_error = models.TextField(blank=True, verbose_name="Dernière erreur")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date de création")
+
+    class Meta:
+        verbose_name = "Tâche"
+        verbose_name_plural = "Tâches"
+        ordering = ['run_at', 'id']
+        indexes = [
+            # Tâches libres, dans l'ordre où les workers les prennent
+            models.Index(
+                fields=['run_at', 'id'],
+                name='job_ready_idx',
+                condition=Q(locked_at__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.id}"
+
+
+class DeadJob(models.Model):
+    """Tâche abandonnée après ses tentatives (file des échecs)"""
+    task = models.CharField(max_length=200, verbose_name="Tâche")
+    args = models.JSONField(default=list, verbose_name="Arguments")
+    attempts = models.PositiveIntegerField(verbose_name="Tentatives")
+    error = models.TextField(verbose_name="Erreur")
+    created_at = models.DateTimeField(verbose_name="Date de création")
+    failed_at = models.DateTimeField(auto_now_add=True, verbose_name="Date d'abandon")
+
+    class Meta:
+        verbose_name = "Tâche en échec"
+        verbose_name_plural = "Tâches en échec"
+        ordering = ['-failed_at']
+
+    def __str__(self):
+        return f"{self.task} ({self.failed_at:%d/%m/%Y %H:%M})"
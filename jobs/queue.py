@@ -0,0 +1,135 @@
+"""
+File de tâches en base de données, sans broker externe.
+
+enqueue insère une ligne Job dans la transaction courante : la tâche n'est
+visible des workers qu'une fois la requête validée, et disparaît avec elle si
+la transaction est annulée. Les workers (commande run_jobs) prennent les
+tâches dues par un UPDATE conditionnel (locked_at IS NULL), ce qui fonctionne
+sur SQLite comme sur PostgreSQL : deux workers ne peuvent pas prendre la même
+tâche.
+
+Une tâche en échec est reprogrammée avec un délai doublé à chaque tentative
+(settings.JOB_RETRY_DELAY), puis déplacée dans DeadJob après max_attempts.
+Une tâche prise par un worker arrêté brutalement est libérée après
+settings.JOB_LOCK_TIMEOUT.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import DeadJob, Job
+
+logger = logging.getLogger(__name__)
+
+
+def task_path(task):
+    """Chemin pointé d'une fonction de tâche"""
+    return f'{task.__module__}.{task.__qualname__}'
+
+
+def enqueue(task, *args, delay=0, max_attempts=None):
+    """
+    Programme task(*args) ; les arguments doivent être sérialisables en JSON.
+    Retourne la tâche créée.
+    """
+    return Job.objects.create(
+        task=task_path(task),
+        args=list(args),
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def release_stale_jobs():
+    """Libère les tâches prises depuis plus de JOB_LOCK_TIMEOUT ; retourne leur nombre"""
+    stale = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(locked_at__lt=stale).update(locked_at=None, locked_by='')
+
+
+def claim_job(worker):
+    """Prend la prochaine tâche due pour worker ; None si aucune"""
+    while True:
+        now = timezone.now()
+        job_id = Job.objects.filter(
+            locked_at__isnull=True,
+            run_at__lte=now
+        ).order_by('run_at', 'id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        # Un autre worker a pu prendre la tâche entre-temps : on passe à la suivante
+        claimed = Job.objects.filter(id=job_id, locked_at__isnull=True).update(
+            locked_at=now,
+            locked_by=worker,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+
+
+def _fail(job, error):
+    if job.attempts >= job.max_attempts:
+        logger.error("Tâche %s abandonnée après %d tentative(s)", job, job.attempts)
+        with transaction.atomic():
+            DeadJob.objects.create(
+                task=job.task,
+                args=job.args,
+                attempts=job.attempts,
+                error=error,
+                created_at=job.created_at
+            )
+            job.delete()
+        return
+    delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+    Job.objects.filter(id=job.id).update(
+        locked_at=None,
+        locked_by='',
+        run_at=timezone.now() + timedelta(seconds=delay),
+        last_error=error
+    )
+
+
+def run_job(job):
+    """Exécute une tâche prise ; retourne True si elle a réussi"""
+    try:
+        task = import_string(job.task)
+        # Les écritures d'une tâche en échec sont annulées
+        with transaction.atomic():
+            task(*job.args)
+    except Exception:
+        logger.exception("Échec de la tâche %s (tentative %d)", job, job.attempts)
+        _fail(job, traceback.format_exc())
+        return False
+    job.delete()
+    return True
+
+
+def run_pending(worker='inline', limit=None):
+    """Exécute les tâches dues jusqu'à épuisement ; retourne (réussies, en échec)"""
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        job = claim_job(worker)
+        if job is None:
+            break
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
+
+
+def requeue(dead_jobs):
+    """Reprogramme des tâches en échec avec des tentatives remises à zéro ; retourne leur nombre"""
+    dead_jobs = list(dead_jobs)
+    with transaction.atomic():
+        Job.objects.bulk_create([
+            Job(task=dead.task, args=dead.args, max_attempts=settings.JOB_MAX_ATTEMPTS)
+            for dead in dead_jobs
+        ])
+        DeadJob.objects.filter(id__in=[dead.id for dead in dead_jobs]).delete()
+    return len(dead_jobs)
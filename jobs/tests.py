@@ -0,0 +1,84 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from posts.models import Post
+from .models import DeadJob, Job
+from .queue import claim_job, enqueue, release_stale_jobs, requeue, run_pending
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def explode(content):
+    # Les écritures d'une tâche en échec doivent être annulées
+    Post.objects.update(content=content)
+    raise RuntimeError("boum")
+
+
+class JobQueueTest(TestCase):
+    """File de tâches en base : exécution, nouvelles tentatives et file des échecs"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_in_order_once(self):
+        enqueue(record, 'b', delay=60)
+        enqueue(record, 'a')
+        enqueue(record, 'c', delay=-60)
+        out = StringIO()
+        call_command('run_jobs', '--burst', stdout=out)
+
+        self.assertEqual(calls, ['c', 'a'])
+        self.assertIn('2 tâche(s) exécutée(s)', out.getvalue())
+        # Une tâche prise n'est plus proposée aux autres workers
+        job = Job.objects.get()
+        job.run_at = timezone.now()
+        job.save()
+        self.assertEqual(claim_job('w1').id, job.id)
+        self.assertIsNone(claim_job('w2'))
+
+    @override_settings(JOB_RETRY_DELAY=0)
+    def test_failures_are_retried_then_dead_lettered(self):
+        post = Post.objects.create(author=User.objects.create_user('alice'), content='Bonjour')
+        enqueue(explode, 'modifié', max_attempts=3)
+        with self.assertLogs('jobs.queue', 'ERROR') as logs:
+            self.assertEqual(run_pending(), (0, 3))
+        self.assertIn('abandonnée après 3 tentative(s)', logs.output[-1])
+        post.refresh_from_db()
+        self.assertEqual(post.content, 'Bonjour')
+
+        self.assertFalse(Job.objects.exists())
+        dead = DeadJob.objects.get()
+        self.assertEqual((dead.task, dead.args, dead.attempts), ('jobs.tests.explode', ['modifié'], 3))
+        self.assertIn('RuntimeError: boum', dead.error)
+
+        self.assertEqual(requeue(DeadJob.objects.all()), 1)
+        self.assertEqual(Job.objects.get().attempts, 0)
+        self.assertFalse(DeadJob.objects.exists())
+
+    def test_retry_is_delayed(self):
+        job = enqueue(explode, 'modifié')
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.assertEqual(run_pending(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIsNone(claim_job('w1'))
+
+    @override_settings(JOB_LOCK_TIMEOUT=60)
+    def test_stale_jobs_are_released(self):
+        enqueue(record, 'a')
+        claim_job('w1')
+        self.assertEqual(release_stale_jobs(), 0)
+        Job.objects.update(locked_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(release_stale_jobs(), 1)
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(calls, ['a'])
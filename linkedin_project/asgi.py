@@ -3,6 +3,11 @@ ASGI config for linkedin_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Le flux temps réel des notifications (notifications/realtime.py) est une vue
+asynchrone : en production, servir le projet avec un serveur ASGI, par exemple
+``uvicorn linkedin_project.asgi:application``. Avec InMemoryBroker, n'utiliser
+qu'un seul processus (voir notifications/broker.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
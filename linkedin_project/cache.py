@@ -0,0 +1,74 @@
+"""
+Cache applicatif avec protection contre l'effet de meute (cache stampede).
+
+Chaque valeur est stockée avec une date d'expiration logique plus courte que sa
+durée de vie réelle dans le cache. Une fois la date dépassée, un seul processus
+obtient le verrou (cache.add) et recalcule la valeur ; les autres continuent de
+servir l'ancienne valeur au lieu d'envoyer la même requête à la base.
+"""
+import time
+
+from django.core.cache import cache
+
+# Durée pendant laquelle une valeur périmée peut encore être servie
+STALE_GRACE = 300
+# Durée de vie maximale d'un verrou de recalcul
+LOCK_TIMEOUT = 10
+# Attente maximale d'un calcul mené par un autre processus (premier accès)
+MAX_WAIT = 2.0
+WAIT_INTERVAL = 0.05
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _store(key, value, ttl):
+    cache.set(key, (value, time.time() + ttl), ttl + STALE_GRACE)
+    return value
+
+
+def _compute(key, compute, ttl):
+    """Calcule et stocke la valeur en libérant le verrou ensuite"""
+    try:
+        return _store(key, compute(), ttl)
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def get_or_compute(key, compute, ttl):
+    """
+    Retourne la valeur en cache pour key, en appelant compute() si nécessaire.
+
+    Un seul appelant à la fois exécute compute() pour une même clé.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at = entry
+        if expires_at > time.time():
+            return value
+        # Valeur périmée : un seul processus la recalcule, les autres la servent
+        if cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+            return _compute(key, compute, ttl)
+        return value
+
+    # Premier accès : attendre le processus qui calcule plutôt que de le doubler
+    deadline = time.time() + MAX_WAIT
+    while not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+        if time.time() > deadline:
+            return compute()
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return _compute(key, compute, ttl)
+
+
+def expire(key):
+    """
+    Marque la valeur comme périmée sans la supprimer : le prochain lecteur la
+    recalcule pendant que les autres continuent de servir l'ancienne valeur.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        cache.set(key, (entry[0], 0), STALE_GRACE)
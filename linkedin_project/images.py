@@ -0,0 +1,254 @@
+"""
+Déclinaisons des images téléversées (photos de profil, de couverture, images
+des posts).
+
+À chaque nouveau fichier, une tâche process_image est mise en file (jobs) dans
+la transaction qui enregistre le fichier : la requête ne décode aucune image.
+Le worker remplace l'original par une copie sans métadonnées EXIF, sous un
+nouveau nom, puis enregistre à côté d'elle une version compressée par largeur
+du preset (settings.IMAGE_VARIANTS) :
+profile_pics/photo.jpg -> profile_pics/photo.jpg.96w.webp. Le nom complet de
+l'original est conservé : photo.jpg et photo.png, téléversés dans le même
+dossier par deux utilisateurs, ont des déclinaisons distinctes. Les noms sont
+déterministes : les balises de gabarit (accounts/templatetags/images.py)
+construisent le srcset sans requête, et affichent un emplacement réservé tant
+que les déclinaisons n'existent pas (fichiers antérieurs : commande
+generate_image_variants).
+
+Jusqu'au passage du worker, l'original téléversé, métadonnées comprises, reste
+accessible à son URL sous MEDIA_URL. Les pages publiques ne l'affichent pas
+(emplacement réservé), seules les pages de modification de son propriétaire le
+montrent, et le fichier est supprimé une fois la copie enregistrée : son URL
+ne sert plus après le traitement.
+
+Les JPEG sont décodés directement à la taille utile (Image.draft) : une photo
+de 12 mégapixels n'est jamais décompressée en entier.
+"""
+import logging
+from functools import partial
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from jobs.queue import enqueue
+
+logger = logging.getLogger(__name__)
+
+# WebP si Pillow le prend en charge, JPEG sinon
+FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+EXTENSION = 'webp' if FORMAT == 'WEBP' else 'jpg'
+
+ORIENTATION = 0x0112
+
+# (modèle, champ, preset) des images déclinées
+IMAGE_FIELDS = [
+    ('accounts.Profile', 'profile_picture', 'avatar'),
+    ('accounts.Profile', 'cover_picture', 'cover'),
+    ('posts.Post', 'image', 'post'),
+]
+
+
+def _ready_key(name):
+    return f'images:variants:{name}'
+
+
+def preset_widths(preset):
+    return sorted(settings.IMAGE_VARIANTS[preset]['widths'])
+
+
+def variant_name(name, width):
+    """Nom de la déclinaison de largeur width d'un fichier, extension de l'original comprise"""
+    return f'{name}.{width}w.{EXTENSION}'
+
+
+def file_name(instance, field):
+    """
+    Nom du fichier d'un champ image sans déclencher de requête : '' si le
+    champ est vide, None s'il est différé
+    """
+    if field not in instance.__dict__:
+        return None
+    value = instance.__dict__[field]
+    return getattr(value, 'name', value) or ''
+
+
+def _prepare(image, width):
+    """Orientation EXIF appliquée, mode compatible avec FORMAT"""
+    # Réduction à l'échelle 1/2, 1/4 ou 1/8 dès le décodage (JPEG uniquement)
+    image.draft('RGB', (width, width))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if has_alpha and FORMAT == 'WEBP':
+        return image.convert('RGBA')
+    if has_alpha:
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _resize(image, width, crop):
+    if crop:
+        side = min(width, image.width, image.height)
+        return ImageOps.fit(image, (side, side), Image.LANCZOS)
+    if image.width <= width:
+        # Jamais d'agrandissement : la déclinaison garde la taille de l'original
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+
+def _encode(image):
+    buffer = BytesIO()
+    if FORMAT == 'WEBP':
+        image.save(buffer, 'WEBP', quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=settings.IMAGE_VARIANT_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_variants(file, preset):
+    """
+    Enregistre les déclinaisons d'un fichier (FieldFile) ; retourne leurs noms.
+    Les métadonnées de l'original (EXIF) ne sont pas recopiées.
+    """
+    spec = settings.IMAGE_VARIANTS[preset]
+    crop = spec.get('crop', False)
+    widths = sorted(spec['widths'], reverse=True)
+    storage = file.storage
+    with file.open('rb'), Image.open(file) as original:
+        image = _prepare(original, widths[0])
+
+    names = []
+    # Chaque déclinaison est réduite à partir de la précédente, plus grande
+    for width in widths:
+        image = _resize(image, width, crop)
+        name = variant_name(file.name, width)
+        storage.delete(name)
+        names.append(storage.save(name, ContentFile(_encode(image))))
+    cache.set(_ready_key(file.name), True, settings.IMAGE_VARIANTS_TTL)
+    return names
+
+
+def delete_variants(name, preset):
+    """Supprime les déclinaisons d'un fichier, par exemple remplacé"""
+    if not name:
+        return
+    for width in preset_widths(preset):
+        default_storage.delete(variant_name(name, width))
+    cache.delete(_ready_key(name))
+
+
+def discard_variants(name, preset):
+    """
+    Supprime les déclinaisons d'un fichier après la validation de la
+    transaction courante : une suppression annulée les laisse en place
+    """
+    if name:
+        transaction.on_commit(partial(delete_variants, name, preset))
+
+
+def strip_metadata(file):
+    """
+    Enregistre à côté de l'original une copie sans ses métadonnées EXIF
+    (position GPS, appareil), orientation appliquée ; retourne le nom de la
+    copie, None si l'original n'en avait pas. L'original n'est pas modifié.
+    """
+    with file.open('rb'), Image.open(file) as image:
+        exif = image.getexif()
+        if not exif or image.format not in ('JPEG', 'PNG', 'WEBP'):
+            return None
+        buffer = BytesIO()
+        if image.format == 'JPEG' and exif.get(ORIENTATION, 1) == 1:
+            # Tables de quantification d'origine : pas de perte supplémentaire
+            image.save(buffer, 'JPEG', quality='keep')
+        else:
+            ImageOps.exif_transpose(image).save(buffer, image.format, quality=95)
+    # Le stockage choisit un nom libre, différent de celui de l'original
+    return file.storage.save(file.name, ContentFile(buffer.getvalue()))
+
+
+def process_image(label, pk, field, preset, name, previous):
+    """
+    Tâche : remplace les déclinaisons de previous par celles de name, si name
+    est toujours le fichier du champ.
+
+    Exécutée dans une transaction (jobs.queue.run_job) que les fichiers ne
+    suivent pas : la copie sans métadonnées est écrite avant que le champ ne la
+    désigne, et les fichiers remplacés ne sont supprimés qu'après validation.
+    """
+    discard_variants(previous, preset)
+    model = apps.get_model(label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or file_name(instance, field) != name:
+        # Objet supprimé ou fichier remplacé depuis : une autre tâche s'en charge
+        return
+    file = getattr(instance, field)
+    stripped = None
+    try:
+        stripped = strip_metadata(file)
+        if stripped:
+            # Le champ ne désigne la copie que s'il désigne toujours l'original
+            if not model.objects.filter(pk=pk, **{field: name}).update(**{field: stripped}):
+                file.storage.delete(stripped)
+                return
+            transaction.on_commit(partial(file.storage.delete, name))
+            file.name = stripped
+        generate_variants(file, preset)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        # Fichier illisible : inutile de réessayer
+        logger.exception("Échec de la déclinaison de %s", name)
+    except Exception:
+        # La transaction est annulée : le champ désigne toujours l'original
+        if stripped:
+            file.storage.delete(stripped)
+        raise
+
+
+def schedule_variants(instance, field, previous, preset):
+    """
+    Met en file le traitement du fichier du champ s'il a changé depuis previous
+    (nom chargé en post_init)
+    """
+    current = file_name(instance, field)
+    if current is None or current == previous:
+        return
+    if not current:
+        discard_variants(previous, preset)
+        return
+    cache.delete(_ready_key(current))
+    enqueue(process_image, instance._meta.label, instance.pk, field, preset, current, previous)
+
+
+def variants_ready(file, preset):
+    """
+    Indique si les déclinaisons d'un fichier existent. Le résultat est mémorisé
+    dans le cache, brièvement s'il est négatif : les déclinaisons d'une image en
+    cours de traitement apparaissent sans attendre l'expiration.
+    """
+    key = _ready_key(file.name)
+    ready = cache.get(key)
+    if ready is None:
+        ready = file.storage.exists(variant_name(file.name, preset_widths(preset)[0]))
+        ttl = settings.IMAGE_VARIANTS_TTL if ready else settings.IMAGE_VARIANTS_PENDING_TTL
+        cache.set(key, ready, ttl)
+    return ready
+
+
+def variant_urls(file, preset):
+    """[(largeur, url)] des déclinaisons d'un fichier, vide si elles n'existent pas"""
+    if not file or not variants_ready(file, preset):
+        return []
+    return [(width, file.storage.url(variant_name(file.name, width))) for width in preset_widths(preset)]
+
+
+def image_fields():
+    """(modèle, champ, preset) des images déclinées"""
+    for label, field, preset in IMAGE_FIELDS:
+        yield apps.get_model(label), field, preset
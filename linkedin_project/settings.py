@@ -41,7 +41,8 @@ INSTALLED_APPS = [
     'posts',
     'connections',
     'notifications',
-    'achievements'
+    'achievements',
+    'jobs'
 ]
 
 MIDDLEWARE = [
@@ -67,6 +68,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -82,6 +84,21 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Verrou d'écriture pris dès le début de chaque transaction : deux
+            # transactions concurrentes attendent leur tour au lieu de
+            # s'interbloquer en passant de la lecture à l'écriture (« database
+            # is locked »). Nécessite Django 5.1.
+            'transaction_mode': 'IMMEDIATE',
+            # Attente maximale (secondes) du verrou d'écriture
+            'timeout': 20,
+        },
+        # Base de test sur disque : les tests concurrents ont besoin du
+        # verrouillage de fichier de SQLite (la base en mémoire partagée
+        # échoue sans attendre)
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -144,3 +161,73 @@ MESSAGE_TAGS = {
 
 # Login URL pour @login_required
 LOGIN_URL = '/accounts/login/'
+
+# Fil d'actualité personnalisé (posts/timeline.py)
+TIMELINE_STORE = 'posts.timeline.DatabaseTimelineStore'
+TIMELINE_MAX_ENTRIES = 500
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL_SIZE = 50
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Mémoire locale par défaut. Alternatives :
+#   'django.core.cache.backends.filebased.FileBasedCache' avec LOCATION = BASE_DIR / 'cache'
+#   'django.core.cache.backends.redis.RedisCache' avec LOCATION = 'redis://127.0.0.1:6379'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'linkedong',
+    }
+}
+
+# Durée de validité (secondes) des statistiques de la barre latérale du dashboard
+SIDEBAR_STATS_TTL = 300
+
+# Sujets tendance (posts/trending.py)
+TRENDING_WINDOW_HOURS = 168
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_TOP_K = 5
+TRENDING_TTL = 300
+
+# Degré de relation affiché sur les profils (connections/degrees.py)
+CONNECTION_DEGREE_MAX = 3
+CONNECTION_DEGREE_TTL = 3600
+
+# Durée de vie (secondes) du compteur de notifications non lues (notifications/unread.py)
+NOTIFICATION_UNREAD_TTL = 86400
+
+# Diffusion en temps réel (notifications/broker.py et notifications/realtime.py).
+# InMemoryBroker ne relie que les connexions d'un même processus ASGI.
+# Le flux n'est ouvert que pour les pages servies par ASGI (uvicorn) : sous WSGI
+# (runserver, gunicorn), la réponse serait mise en mémoire tampon et occuperait
+# un thread pendant toute sa durée. False le désactive aussi sous ASGI.
+NOTIFICATION_STREAM_ENABLED = True
+NOTIFICATION_BROKER = 'notifications.broker.InMemoryBroker'
+# Intervalle (secondes) des messages de maintien de connexion et durée maximale d'un flux
+NOTIFICATION_STREAM_KEEPALIVE = 15
+NOTIFICATION_STREAM_TIMEOUT = 300
+
+# Conservation (jours) des notifications lues (commande purge_notifications)
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Déclinaisons des images téléversées (linkedin_project/images.py) : largeurs en
+# pixels de chaque preset, recadrées en carré pour les photos de profil
+IMAGE_VARIANTS = {
+    'avatar': {'widths': [48, 96, 160, 320], 'crop': True},
+    'cover': {'widths': [400, 800, 1600]},
+    'post': {'widths': [480, 960, 1440]},
+}
+IMAGE_VARIANT_QUALITY = 80
+# Durée de vie (secondes) de l'existence mémorisée des déclinaisons d'un fichier,
+# et de leur absence (image en cours de traitement)
+IMAGE_VARIANTS_TTL = 86400
+IMAGE_VARIANTS_PENDING_TTL = 10
+
+# File de tâches en base (jobs/queue.py, commande run_jobs)
+JOB_MAX_ATTEMPTS = 5
+# Délai (secondes) avant la première nouvelle tentative, doublé ensuite
+JOB_RETRY_DELAY = 30
+# Durée (secondes) au-delà de laquelle une tâche prise par un worker arrêté est libérée
+JOB_LOCK_TIMEOUT = 600
+# Attente (secondes) d'un worker quand la file est vide
+JOB_POLL_INTERVAL = 1.0
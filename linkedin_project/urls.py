@@ -24,6 +24,8 @@ urlpatterns = [
     path('', include('posts.urls')),
     path('accounts/', include('accounts.urls')),
     path('connections/', include('connections.urls')),
+    path('notifications/', include('notifications.urls')),
+    path('achievements/', include('achievements.urls')),
 ]
 
 if settings.DEBUG:
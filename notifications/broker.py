@@ -0,0 +1,104 @@
+"""
+Publication / abonnement pour la diffusion en temps réel.
+
+Les vues et signaux synchrones publient des messages sur des canaux (par exemple
+« user:42 ») ; les connexions de notifications/realtime.py s'y abonnent et les
+transmettent aux navigateurs. Aucun client inactif n'interroge la base.
+
+Le broker est choisi par le réglage NOTIFICATION_BROKER (chemin pointé d'une
+sous-classe de BaseBroker). InMemoryBroker ne relie que les connexions d'un même
+processus : il convient au développement, aux tests et aux déploiements ASGI à
+un seul processus. Plusieurs processus nécessitent un broker partagé (Redis
+pub/sub, PostgreSQL LISTEN/NOTIFY...) implémentant la même interface.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Messages en attente par abonnement : au-delà, les plus anciens sont abandonnés
+MAX_PENDING = 100
+
+
+class BaseBroker:
+    """Interface commune des brokers"""
+
+    def publish(self, channel, message):
+        """Envoie message (un dict sérialisable en JSON) aux abonnés du canal ; appelable depuis du code synchrone"""
+        raise NotImplementedError
+
+    def subscribe(self, channels):
+        """
+        Gestionnaire de contexte asynchrone donnant un abonnement aux canaux
+        donnés ; await subscription.get() attend le message suivant.
+        """
+        raise NotImplementedError
+
+
+class Subscription:
+    """File de messages d'un abonné, rattachée à sa boucle asyncio"""
+
+    def __init__(self, loop, max_pending=MAX_PENDING):
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pending)
+
+    def _put(self, message):
+        if self.queue.full():
+            # Client trop lent : on garde les messages les plus récents
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def put(self, message):
+        """Dépose un message depuis n'importe quel thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Boucle fermée : la connexion est terminée
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InMemoryBroker(BaseBroker):
+    """Broker interne au processus"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, channels):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                for channel in channels:
+                    subscribers = self._subscribers.get(channel)
+                    if subscribers is not None:
+                        subscribers.discard(subscription)
+                        if not subscribers:
+                            del self._subscribers[channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Broker configuré, partagé par tout le processus"""
+    return import_string(settings.NOTIFICATION_BROKER)()
@@ -0,0 +1,16 @@
+from .realtime import stream_available
+from .unread import get_unread_count
+
+
+def unread_notifications(request):
+    """
+    Nombre de notifications non lues pour le badge de la barre de navigation,
+    et disponibilité du flux temps réel qui le tient à jour
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications_count': get_unread_count(user.id),
+        'notification_stream_available': stream_available(request),
+    }
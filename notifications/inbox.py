@@ -0,0 +1,34 @@
+"""
+Boîte de réception des notifications.
+
+Les pages sont lues par pagination par curseur sur (created_at, id), servie par
+l'index (to_user, -created_at, -id) : la première page coûte autant pour un
+utilisateur avec dix notifications que pour un autre avec des dizaines de
+milliers. Émetteur, profil, publication et commentaire sont chargés par
+jointure dans la même requête.
+"""
+from django.db.models import Q
+
+from posts.feed import CursorPage, decode_cursor, encode_cursor
+from .models import Notification
+
+NOTIFICATIONS_PER_PAGE = 20
+
+
+def get_inbox_page(user, cursor=None, per_page=NOTIFICATIONS_PER_PAGE):
+    """Page de notifications située après le curseur donné"""
+    queryset = Notification.objects.filter(to_user=user).select_related(
+        'from_user', 'from_user__profile', 'post', 'comment'
+    ).order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, notification_id = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, id__lt=notification_id)
+        )
+
+    # Un élément de plus pour savoir s'il existe une page suivante
+    notifications = list(queryset[:per_page + 1])
+    next_cursor = encode_cursor(notifications[per_page - 1]) if len(notifications) > per_page else None
+    return CursorPage(notifications[:per_page], next_cursor)
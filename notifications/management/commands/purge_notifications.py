@@ -0,0 +1,39 @@
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.retention import Archive, compact_duplicates, purge_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Supprime les notifications lues anciennes et les doublons (tâche planifiée)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+            help="Durée de conservation des notifications lues, en jours"
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help="Notifications supprimées par transaction")
+        parser.add_argument('--archive', help="Fichier .jsonl.gz où archiver les notifications supprimées")
+        parser.add_argument('--sleep', type=float, default=0, help="Pause entre deux lots, en secondes")
+        parser.add_argument('--no-compact', action='store_true', help="Ne pas supprimer les doublons")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        def progress(done):
+            self.stdout.write(f"  {done} notification(s) supprimée(s)...")
+
+        batch = {'batch_size': options['batch_size'], 'pause': options['sleep'], 'progress': progress}
+        with Archive(options['archive']) if options['archive'] else nullcontext() as archive:
+            purged = purge_read_notifications(options['days'], archive=archive, **batch)
+            self.stdout.write(f"Notifications lues de plus de {options['days']} jours : {purged} supprimée(s)")
+            if not options['no_compact']:
+                compacted = compact_duplicates(archive=archive, **batch)
+                self.stdout.write(f"Doublons : {compacted} supprimé(s)")
+
+        if archive is not None:
+            self.stdout.write(f"{archive.count} notification(s) archivée(s) dans {archive.path}")
+        self.stdout.write(self.style.SUCCESS(f"✓ Rétention appliquée en {time.perf_counter() - start:.1f}s"))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        ('posts', '0005_topic_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actor_count',
+            field=models.PositiveIntegerField(default=1, verbose_name="Nombre d'émetteurs"),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='group_key',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Clé de regroupement'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['to_user', 'group_key'], name='notification_group_idx'),
+        ),
+    ]
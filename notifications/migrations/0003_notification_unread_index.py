@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_grouping'),
+        ('posts', '0005_topic_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['to_user', 'is_read'], name='notification_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_unread_index'),
+        ('posts', '0005_topic_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['to_user', '-created_at', '-id'], name='notification_inbox_idx'),
+        ),
+    ]
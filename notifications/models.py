@@ -57,10 +57,32 @@ class Notification(models.Model):
         related_name='notifications'
     )
 
+    # Regroupement des notifications similaires (voir notifications/pipeline.py)
+    group_key = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Clé de regroupement"
+    )
+    actor_count = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Nombre d'émetteurs"
+    )
+
     class Meta:
         verbose_name = "Notification"
         verbose_name_plural = "Notifications"
         ordering = ['-created_at']
+        indexes = [
+            # Boîte de réception paginée par curseur (notifications/inbox.py)
+            models.Index(fields=['to_user', '-created_at', '-id'], name='notification_inbox_idx'),
+            models.Index(fields=['to_user', 'group_key'], name='notification_group_idx'),
+            # Comptage des non lues (notifications/unread.py)
+            models.Index(
+                fields=['to_user', 'is_read'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Notification pour {self.to_user.username}: {self.get_notification_type_display()}"
@@ -0,0 +1,195 @@
+"""
+Création des notifications à partir des événements du site.
+
+notify() ne fait aucune requête : la notification est préparée en mémoire et
+n'est retenue qu'après la validation de la transaction (transaction.on_commit).
+Pendant une requête HTTP, les notifications retenues attendent la fin de la
+requête (request_finished, une fois la réponse envoyée) ; ailleurs (commandes,
+shell) elles sont écrites aussitôt.
+
+deliver() écrit un lot en une fois : les notifications d'un même groupe (par
+exemple les réactions à une même publication) sont fusionnées entre elles et
+avec la notification non lue existante du groupe, puis le reste est inséré par
+bulk_create. 50 réactions donnent ainsi une seule ligne « Alice et 49 autres
+personnes ont réagi à votre publication ».
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.local import Local
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification
+from .realtime import publish_notifications
+from .unread import adjust_unread_counts
+
+logger = logging.getLogger(__name__)
+
+# Une notification non lue plus ancienne n'absorbe plus les nouvelles de son groupe
+COLLAPSE_WINDOW = timedelta(days=1)
+
+# Type -> (message pour un émetteur, message pour plusieurs émetteurs ou None si non regroupable)
+MESSAGES = {
+    'LIKE': (
+        "{name} a réagi à votre publication",
+        "{name} et {others} autre{plural} personne{plural} ont réagi à votre publication",
+    ),
+    'COMMENT': (
+        "{name} a commenté votre publication",
+        "{name} et {others} autre{plural} personne{plural} ont commenté votre publication",
+    ),
+    'CONNECTION_REQUEST': ("{name} vous a envoyé une demande de connexion", None),
+    'CONNECTION_ACCEPTED': ("{name} a accepté votre demande de connexion", None),
+}
+
+_state = Local()
+
+
+def render_message(notification):
+    single, grouped = MESSAGES[notification.notification_type]
+    user = notification.from_user
+    name = user.first_name or user.username
+    if notification.actor_count > 1 and grouped:
+        others = notification.actor_count - 1
+        return grouped.format(name=name, others=others, plural='s' if others > 1 else '')
+    return single.format(name=name)
+
+
+def _build(to_user_id, from_user_id, notification_type, post_id=None, comment_id=None):
+    if to_user_id == from_user_id:
+        return None
+    group_key = ''
+    if MESSAGES[notification_type][1] and post_id:
+        group_key = f'{notification_type}:post:{post_id}'
+    return Notification(
+        to_user_id=to_user_id,
+        from_user_id=from_user_id,
+        notification_type=notification_type,
+        post_id=post_id,
+        comment_id=comment_id,
+        group_key=group_key,
+    )
+
+
+def notify(to_user_id, from_user_id, notification_type, post_id=None, comment_id=None):
+    """Prépare une notification, écrite après la validation de la transaction courante"""
+    notify_many([(to_user_id, from_user_id, notification_type, post_id, comment_id)])
+
+
+def notify_many(items):
+    """
+    Version groupée de notify pour des tuples (to_user_id, from_user_id,
+    notification_type[, post_id[, comment_id]]) : hors requête, le lot est
+    écrit en une fois
+    """
+    notifications = [notification for notification in (_build(*item) for item in items) if notification]
+    if notifications:
+        transaction.on_commit(lambda: _enqueue(notifications))
+
+
+def _enqueue(notifications):
+    outbox = getattr(_state, 'outbox', None)
+    if outbox is None:
+        deliver(notifications)
+    else:
+        outbox.extend(notifications)
+
+
+def open_outbox(**kwargs):
+    """Début de requête : les notifications attendront la fin de la réponse"""
+    _state.outbox = []
+
+
+def flush_outbox(**kwargs):
+    """Fin de requête : écrit les notifications retenues pendant la requête"""
+    outbox = getattr(_state, 'outbox', None)
+    _state.outbox = None
+    if outbox:
+        try:
+            deliver(outbox)
+        except Exception:
+            # La réponse est déjà partie : on journalise plutôt que de lever
+            logger.exception("Échec de l'écriture de %d notification(s)", len(outbox))
+
+
+def _collapse(notifications):
+    """Fusionne en mémoire les notifications d'un même groupe et d'un même destinataire"""
+    groups = {}
+    singles = []
+    for notification in notifications:
+        if not notification.group_key:
+            singles.append(notification)
+            continue
+        key = (notification.to_user_id, notification.group_key)
+        group = groups.get(key)
+        if group is None:
+            notification.actor_ids = {notification.from_user_id}
+            groups[key] = notification
+        elif notification.from_user_id not in group.actor_ids:
+            # Le dernier émetteur est celui affiché
+            group.actor_ids.add(notification.from_user_id)
+            group.actor_count += 1
+            group.from_user_id = notification.from_user_id
+            group.comment_id = notification.comment_id or group.comment_id
+    return groups, singles
+
+
+@transaction.atomic
+def deliver(notifications):
+    """Écrit un lot de notifications ; retourne les notifications créées ou mises à jour"""
+    groups, singles = _collapse(notifications)
+    now = timezone.now()
+
+    updated = []
+    if groups:
+        condition = Q()
+        for to_user_id, group_key in groups:
+            condition |= Q(to_user_id=to_user_id, group_key=group_key)
+        existing = {
+            (notification.to_user_id, notification.group_key): notification
+            for notification in Notification.objects.select_for_update().filter(
+                condition, is_read=False, created_at__gte=now - COLLAPSE_WINDOW
+            ).order_by('created_at')
+        }
+        for key, notification in groups.items():
+            current = existing.get(key)
+            if current is None:
+                singles.append(notification)
+                continue
+            new_actors = notification.actor_ids - {current.from_user_id}
+            if not new_actors:
+                continue
+            current.actor_count += len(new_actors)
+            current.from_user_id = notification.from_user_id
+            current.comment_id = notification.comment_id or current.comment_id
+            current.created_at = now
+            updated.append(current)
+
+    written = updated + singles
+    if not written:
+        return []
+
+    # Noms des émetteurs en une requête, pour construire les messages
+    users = User.objects.only('id', 'first_name', 'username').in_bulk(
+        {notification.from_user_id for notification in written}
+    )
+    # Un émetteur supprimé entre-temps n'a plus rien à notifier
+    updated = [notification for notification in updated if notification.from_user_id in users]
+    singles = [notification for notification in singles if notification.from_user_id in users]
+    for notification in updated + singles:
+        notification.from_user = users[notification.from_user_id]
+        notification.message = render_message(notification)
+
+    if updated:
+        Notification.objects.bulk_update(
+            updated, ['actor_count', 'from_user', 'comment', 'created_at', 'message']
+        )
+    created = Notification.objects.bulk_create(singles)
+    # Seules les nouvelles lignes comptent : une notification fusionnée était déjà non lue
+    adjust_unread_counts(Counter(notification.to_user_id for notification in created))
+    publish_notifications(updated, created)
+    return updated + created
@@ -0,0 +1,119 @@
+"""
+Diffusion en temps réel par Server-Sent Events.
+
+Chaque onglet connecté ouvre un flux (NotificationStreamView) servi par
+l'application ASGI : la connexion reste ouverte sans occuper de thread et ne
+fait aucune requête en base tant qu'aucun événement n'arrive. Sous WSGI, le
+flux n'est pas ouvert (stream_available) : les pages gardent le badge calculé
+au rendu. Les événements
+sont publiés par le broker après la validation des transactions :
+
+- « notification » sur le canal de l'utilisateur destinataire, à l'écriture
+  d'une notification (deliver) ;
+- « reactions » sur le canal d'une publication, quand ses compteurs de
+  réactions changent.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+
+from .broker import get_broker
+from .unread import peek_unread_count
+
+# Publications suivies au plus par un flux
+MAX_STREAM_POSTS = 50
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def post_channel(post_id):
+    return f'post:{post_id}'
+
+
+def stream_available(request):
+    """
+    Indique si le flux peut être servi pour request : seulement sous ASGI, une
+    réponse en continu sous WSGI étant mise en mémoire tampon et occupant un
+    thread jusqu'à sa fin
+    """
+    return settings.NOTIFICATION_STREAM_ENABLED and isinstance(request, ASGIRequest)
+
+
+def notification_event(notification, created, unread_count=None):
+    event = {
+        'type': 'notification',
+        'id': notification.id,
+        'notification_type': notification.notification_type,
+        'message': notification.message,
+        'actor_count': notification.actor_count,
+        'post_id': notification.post_id,
+        'created_at': notification.created_at.isoformat(),
+        # Faux pour une notification non lue qui a absorbé de nouveaux émetteurs
+        'created': created,
+    }
+    if unread_count is not None:
+        event['unread_count'] = unread_count
+    return event
+
+
+def publish_notifications(updated, created):
+    """Publie les notifications écrites par deliver() après la validation de la transaction"""
+    def publish():
+        broker = get_broker()
+        for notifications, is_new in ((updated, False), (created, True)):
+            for notification in notifications:
+                event = notification_event(notification, is_new, peek_unread_count(notification.to_user_id))
+                broker.publish(user_channel(notification.to_user_id), event)
+
+    if updated or created:
+        transaction.on_commit(publish)
+
+
+def publish_reactions(post):
+    """Publie les compteurs de réactions d'une publication après la validation de la transaction"""
+    event = {
+        'type': 'reactions',
+        'post_id': post.id,
+        'reactions_stats': post.get_reactions_stats(),
+        'total_reactions': post.reactions_count,
+    }
+    transaction.on_commit(lambda: get_broker().publish(post_channel(post.id), event))
+
+
+def format_event(event):
+    """Sérialise un événement au format text/event-stream"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_events(user_id, post_ids=(), initial_events=()):
+    """
+    Flux SSE d'un utilisateur : événements de son canal et de ceux des
+    publications données, avec un commentaire périodique pour garder la
+    connexion ouverte. Le flux se termine après NOTIFICATION_STREAM_TIMEOUT
+    secondes ; EventSource se reconnecte alors automatiquement.
+    """
+    channels = [user_channel(user_id)] + [post_channel(post_id) for post_id in post_ids[:MAX_STREAM_POSTS]]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.NOTIFICATION_STREAM_TIMEOUT
+
+    async with get_broker().subscribe(channels) as subscription:
+        yield 'retry: 5000\n\n'
+        for event in initial_events:
+            yield format_event(event)
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), min(settings.NOTIFICATION_STREAM_KEEPALIVE, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
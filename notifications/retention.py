@@ -0,0 +1,131 @@
+"""
+Rétention des notifications.
+
+- purge_read_notifications : supprime les notifications lues plus anciennes que
+  la durée de rétention ;
+- compact_duplicates : supprime les doublons exacts (même destinataire,
+  émetteur, type, publication et commentaire) en gardant le plus récent. Les
+  notifications regroupées (group_key renseigné) ne sont jamais compactées :
+  chacune résume déjà plusieurs émetteurs (actor_count).
+
+Les suppressions sont faites par lots de batch_size lignes, chacun dans sa
+propre transaction courte : aucun verrou n'est tenu sur toute la table. Les lots
+sont parcourus par clé croissante (pagination par clé), ce qui évite de relire
+les lignes déjà écartées : par identifiant pour la purge, par destinataire pour
+la compaction, dont les doublons sont cherchés destinataire par destinataire.
+Les lignes supprimées peuvent être archivées au format JSON Lines compressé
+(gzip) avant leur suppression.
+"""
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Notification
+
+ARCHIVE_FIELDS = [
+    'id', 'to_user_id', 'from_user_id', 'notification_type', 'message', 'is_read',
+    'created_at', 'post_id', 'comment_id', 'group_key', 'actor_count',
+]
+
+DUPLICATE_KEY = ['to_user_id', 'from_user_id', 'notification_type', 'post_id', 'comment_id']
+
+
+class Archive:
+    """Fichier JSON Lines compressé, ouvert en ajout"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+
+    def __enter__(self):
+        self.file = gzip.open(self.path, 'at', encoding='utf-8')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def write(self, rows):
+        for row in rows:
+            row['created_at'] = row['created_at'].isoformat()
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+            self.count += 1
+        # Les lignes archivées sont sur disque avant la suppression du lot
+        self.file.flush()
+
+
+def _delete_batch(ids, archive):
+    with transaction.atomic():
+        batch = Notification.objects.filter(id__in=ids)
+        if archive is not None:
+            archive.write(batch.order_by('id').values(*ARCHIVE_FIELDS))
+        # delete() et non une requête brute : les signaux tiennent à jour
+        # les compteurs de non lues
+        return batch.delete()[1].get(Notification._meta.label, 0)
+
+
+def purge_read_notifications(days, batch_size=1000, archive=None, pause=0, progress=None):
+    """
+    Supprime les notifications lues créées il y a plus de days jours ;
+    retourne le nombre de notifications supprimées.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    candidates = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by('id')
+    deleted = 0
+    last_id = 0
+    while True:
+        ids = list(candidates.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += _delete_batch(ids, archive)
+        last_id = ids[-1]
+        if progress:
+            progress(deleted)
+        if pause:
+            # Laisse passer les écritures concurrentes entre deux lots
+            time.sleep(pause)
+
+
+def find_duplicates(to_user_ids=None):
+    """
+    Identifiants des doublons à supprimer (tous sauf le plus récent de chaque
+    groupe), parmi les notifications non regroupées des destinataires
+    to_user_ids (tous par défaut)
+    """
+    notifications = Notification.objects.filter(group_key='')
+    if to_user_ids is not None:
+        notifications = notifications.filter(to_user_id__in=to_user_ids)
+    ranked = notifications.annotate(rank=Window(
+        RowNumber(),
+        partition_by=[F(field) for field in DUPLICATE_KEY],
+        order_by=[F('created_at').desc(), F('id').desc()],
+    ))
+    return ranked.filter(rank__gt=1).order_by('id').values_list('id', flat=True)
+
+
+def compact_duplicates(batch_size=1000, archive=None, pause=0, progress=None):
+    """Supprime les doublons exacts ; retourne le nombre de notifications supprimées"""
+    recipients = Notification.objects.filter(group_key='').order_by('to_user_id').values_list(
+        'to_user_id', flat=True
+    ).distinct()
+    deleted = 0
+    last_user_id = 0
+    while True:
+        # Doublons cherchés par lots de destinataires (index notification_group_idx)
+        to_user_ids = list(recipients.filter(to_user_id__gt=last_user_id)[:batch_size])
+        if not to_user_ids:
+            return deleted
+        ids = list(find_duplicates(to_user_ids))
+        for start in range(0, len(ids), batch_size):
+            deleted += _delete_batch(ids[start:start + batch_size], archive)
+            if progress:
+                progress(deleted)
+            if pause:
+                time.sleep(pause)
+        last_user_id = to_user_ids[-1]
@@ -0,0 +1,57 @@
+from django.core.signals import request_started, request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from connections.signals import connection_status_changed, connections_bulk_changed
+from posts.models import Comment, Reaction
+from posts.signals import reactions_changed
+from .models import Notification
+from .pipeline import notify, notify_many, open_outbox, flush_outbox
+from .realtime import publish_reactions
+from .unread import adjust_unread_counts
+
+request_started.connect(open_outbox, dispatch_uid='notifications_open_outbox')
+request_finished.connect(flush_outbox, dispatch_uid='notifications_flush_outbox')
+
+
+@receiver(post_save, sender=Reaction)
+def reaction_saved(sender, instance, created, **kwargs):
+    if created:
+        notify(instance.post.author_id, instance.user_id, 'LIKE', post_id=instance.post_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        notify(instance.post.author_id, instance.author_id, 'COMMENT',
+               post_id=instance.post_id, comment_id=instance.id)
+
+
+@receiver(connection_status_changed)
+def connection_status_updated(sender, instance, old_status, new_status, bulk=False, **kwargs):
+    if bulk:
+        return
+    if old_status is None and new_status == 'PENDING':
+        notify(instance.to_user_id, instance.from_user_id, 'CONNECTION_REQUEST')
+    elif old_status == 'PENDING' and new_status == 'ACCEPTED':
+        notify(instance.from_user_id, instance.to_user_id, 'CONNECTION_ACCEPTED')
+
+
+@receiver(connections_bulk_changed)
+def connections_bulk_updated(sender, user, connections, old_status, new_status, **kwargs):
+    if old_status == 'PENDING' and new_status == 'ACCEPTED':
+        notify_many([
+            (connection.from_user_id, connection.to_user_id, 'CONNECTION_ACCEPTED')
+            for connection in connections
+        ])
+
+
+@receiver(reactions_changed)
+def reactions_updated(sender, post, **kwargs):
+    publish_reactions(post)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread_counts({instance.to_user_id: -1})
@@ -1,3 +1,397 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from connections.models import Connection
+from posts.models import Comment, Post, Reaction
+from posts.reactions import toggle_reaction
+from .broker import InMemoryBroker, get_broker
+from .models import Notification
+from .context_processors import unread_notifications
+from .inbox import NOTIFICATIONS_PER_PAGE, get_inbox_page
+from .pipeline import deliver, notify
+from .retention import compact_duplicates, purge_read_notifications
+from .unread import get_unread_count, mark_read
+
+
+class NotificationPipelineTest(TestCase):
+    """Génération et regroupement des notifications"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', first_name='Alice', password='pass')
+        cls.fans = [User.objects.create_user(username=f'fan{i}', password='pass') for i in range(5)]
+        cls.post = Post.objects.create(author=cls.author, content='Bonjour')
+
+    def test_reactions_are_collapsed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans[:3]:
+                Reaction.objects.create(user=fan, post=self.post, reaction_type='LIKE')
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.create(user=self.fans[3], post=self.post, reaction_type='LIKE')
+
+        notification = Notification.objects.get(to_user=self.author)
+        self.assertEqual(notification.actor_count, 4)
+        self.assertEqual(notification.from_user, self.fans[3])
+        self.assertEqual(notification.message, "fan3 et 3 autres personnes ont réagi à votre publication")
+
+    def test_read_notification_is_not_reused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.create(user=self.fans[0], post=self.post, reaction_type='LIKE')
+        Notification.objects.update(is_read=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.create(user=self.fans[1], post=self.post, reaction_type='LIKE')
+
+        self.assertEqual(Notification.objects.filter(to_user=self.author).count(), 2)
+
+    def test_own_activity_is_ignored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.create(user=self.author, post=self.post, reaction_type='LIKE')
+            Comment.objects.create(post=self.post, author=self.author, content='Merci')
+        self.assertFalse(Notification.objects.exists())
+
+    def test_comment_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(post=self.post, author=self.fans[0], content='Bravo')
+        notification = Notification.objects.get(to_user=self.author)
+        self.assertEqual(notification.notification_type, 'COMMENT')
+        self.assertEqual(notification.comment, comment)
+
+    def test_connection_notifications(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            connection = Connection.objects.create(from_user=self.fans[0], to_user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.status = 'ACCEPTED'
+            connection.save()
+
+        request = Notification.objects.get(notification_type='CONNECTION_REQUEST')
+        self.assertEqual((request.to_user, request.from_user), (self.author, self.fans[0]))
+        accepted = Notification.objects.get(notification_type='CONNECTION_ACCEPTED')
+        self.assertEqual((accepted.to_user, accepted.from_user), (self.fans[0], self.author))
+
+    def test_request_outbox_is_written_in_one_batch(self):
+        # Comme le client de test : la connexion de la transaction du test reste ouverte
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        request_started.send(sender=self.__class__)
+        with self.captureOnCommitCallbacks(execute=True):
+            for fan in self.fans:
+                notify(self.author.id, fan.id, 'LIKE', post_id=self.post.id)
+        self.assertFalse(Notification.objects.exists())
+
+        # Savepoint, lecture des existants, noms des émetteurs, insertion, fin du savepoint
+        with self.assertNumQueries(5):
+            request_finished.send(sender=self.__class__)
+        self.assertEqual(Notification.objects.get().actor_count, 5)
+
+    def test_deliver_without_groups(self):
+        written = deliver([
+            Notification(to_user=self.author, from_user=fan, notification_type='CONNECTION_REQUEST')
+            for fan in self.fans[:2]
+        ])
+        self.assertEqual(len(written), 2)
+        self.assertEqual(written[0].message, "fan0 vous a envoyé une demande de connexion")
+
+
+class UnreadCounterTest(TestCase):
+    """Compteur de notifications non lues"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='pass')
+        cls.fans = [User.objects.create_user(username=f'fan{i}', password='pass') for i in range(3)]
+        cls.post = Post.objects.create(author=cls.author, content='Bonjour')
+
+    def setUp(self):
+        cache.clear()
+
+    def send(self, *notifications):
+        with self.captureOnCommitCallbacks(execute=True):
+            for from_user, notification_type in notifications:
+                notify(self.author.id, from_user.id, notification_type, post_id=self.post.id)
+
+    def test_counter_is_cached(self):
+        self.send((self.fans[0], 'LIKE'), (self.fans[1], 'COMMENT'))
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.author.id), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.author.id), 2)
+
+    def test_counter_follows_creation_and_collapsing(self):
+        self.assertEqual(get_unread_count(self.author.id), 0)
+        self.send((self.fans[0], 'LIKE'))
+        self.send((self.fans[1], 'LIKE'), (self.fans[2], 'COMMENT'))
+
+        # La deuxième réaction rejoint la notification existante
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.author.id), 2)
+        self.assertEqual(Notification.objects.filter(to_user=self.author, is_read=False).count(), 2)
+
+    def test_mark_read(self):
+        self.send((self.fans[0], 'LIKE'), (self.fans[1], 'COMMENT'))
+        self.assertEqual(get_unread_count(self.author.id), 2)
+        notification = Notification.objects.get(notification_type='LIKE')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_read(self.author.id, [notification.id]), 1)
+        self.assertEqual(get_unread_count(self.author.id), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_read(self.author.id), 1)
+        self.assertEqual(get_unread_count(self.author.id), 0)
+
+    def test_context_processor(self):
+        self.send((self.fans[0], 'LIKE'))
+        get_unread_count(self.author.id)
+        request = RequestFactory().get('/')
+        request.user = self.author
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_notifications(request), {
+                'unread_notifications_count': 1,
+                # RequestFactory construit une requête WSGI
+                'notification_stream_available': False,
+            })
+
+
+class InboxTest(TestCase):
+    """Boîte de réception paginée par curseur"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        cls.sender = User.objects.create_user(username='sender', password='pass')
+        Profile.objects.create(user=cls.sender)
+        cls.post = Post.objects.create(author=cls.user, content='Bonjour')
+        notifications = Notification.objects.bulk_create([
+            Notification(to_user=cls.user, from_user=cls.sender, notification_type='LIKE',
+                         post=cls.post, message=f'Notification {i}')
+            for i in range(NOTIFICATIONS_PER_PAGE * 2 + 5)
+        ])
+        # Plusieurs notifications à la même date pour vérifier le départage par id
+        Notification.objects.filter(id__in=[n.id for n in notifications[15:25]]).update(
+            created_at=notifications[15].created_at
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_pages_cover_inbox_once(self):
+        seen = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(1):
+                page = get_inbox_page(self.user, cursor)
+                for notification in page:
+                    notification.from_user.profile, notification.post, notification.comment
+            seen += [notification.id for notification in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(Notification.objects.filter(to_user=self.user).order_by('-created_at', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_inbox_views(self):
+        response = self.client.get(reverse('notifications:notification_list'))
+        self.assertEqual(len(response.context['notifications']), NOTIFICATIONS_PER_PAGE)
+        self.assertContains(response, 'Tout marquer comme lu')
+
+        data = self.client.get(
+            reverse('notifications:notification_page'),
+            {'cursor': response.context['notifications'].next_cursor}
+        ).json()
+        self.assertTrue(data['has_next'])
+        self.assertEqual(data['html'].count('<li'), NOTIFICATIONS_PER_PAGE)
+
+    def test_mark_all_read_is_one_update(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(mark_read(self.user.id), NOTIFICATIONS_PER_PAGE * 2 + 5)
+
+    def test_mark_read_view(self):
+        notification = Notification.objects.filter(to_user=self.user).first()
+        url = reverse('notifications:mark_notifications_read')
+        data = self.client.post(url, {'notification_ids': [notification.id]}, HTTP_ACCEPT='application/json').json()
+        self.assertEqual(data['processed'], 1)
+
+        response = self.client.post(url, {'all': '1'})
+        self.assertRedirects(response, reverse('notifications:notification_list'))
+        self.assertFalse(Notification.objects.filter(to_user=self.user, is_read=False).exists())
+
+
+class RealtimeTest(TestCase):
+    """Diffusion des notifications et des réactions par le broker"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', password='pass')
+        cls.fan = User.objects.create_user(username='fan', password='pass')
+        cls.post = Post.objects.create(author=cls.author, content='Bonjour')
+
+    def setUp(self):
+        cache.clear()
+
+    def react(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            toggle_reaction(self.fan, self.post.id, 'LIKE')
+
+    async def test_in_memory_broker(self):
+        broker = InMemoryBroker()
+        async with broker.subscribe(['a', 'b']) as subscription:
+            # Publication depuis un autre thread, comme depuis une vue synchrone
+            await sync_to_async(broker.publish, thread_sensitive=False)('b', {'value': 1})
+            broker.publish('c', {'value': 2})
+            self.assertEqual(await asyncio.wait_for(subscription.get(), 1), {'value': 1})
+            self.assertEqual(broker.subscriber_count('a'), 1)
+        self.assertEqual(broker.subscriber_count('a'), 0)
+
+    async def test_reaction_and_notification_events(self):
+        channels = [f'user:{self.author.id}', f'post:{self.post.id}']
+        async with get_broker().subscribe(channels) as subscription:
+            await sync_to_async(self.react)()
+            events = {}
+            for _ in range(2):
+                event = await asyncio.wait_for(subscription.get(), 1)
+                events[event['type']] = event
+
+        self.assertEqual(events['reactions']['total_reactions'], 1)
+        self.assertEqual(events['notification']['notification_type'], 'LIKE')
+        self.assertTrue(events['notification']['created'])
+
+    @override_settings(NOTIFICATION_STREAM_KEEPALIVE=0.1, NOTIFICATION_STREAM_TIMEOUT=0.5)
+    async def test_stream_view(self):
+        response = await self.async_client.get(reverse('notifications:notification_stream'))
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.get(
+            reverse('notifications:notification_stream'), {'posts': f'{self.post.id},x'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+        self.assertIn(b'"unread_count": 0', await anext(chunks))
+
+        # L'abonnement est pris au premier morceau du flux
+        await sync_to_async(self.react)()
+        received = [await asyncio.wait_for(anext(chunks), 1) for _ in range(2)]
+        self.assertEqual(sorted(chunk.split(b'\n')[0] for chunk in received),
+                         [b'event: notification', b'event: reactions'])
+        data = json.loads(received[0].split(b'data: ')[1])
+        self.assertEqual(data['post_id'], self.post.id)
+
+        # Maintien de connexion puis fin du flux à l'échéance
+        remaining = [chunk async for chunk in chunks]
+        self.assertIn(b': keepalive\n\n', remaining)
+
+    def test_no_stream_under_wsgi(self):
+        # Sous WSGI, la page n'ouvre pas le flux et la vue répond sans contenu
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('notifications:notification_list'))
+        self.assertNotContains(response, 'new EventSource')
+        response = self.client.get(reverse('notifications:notification_stream'))
+        self.assertEqual(response.status_code, 204)
+
+    async def test_stream_disabled(self):
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.get(reverse('notifications:notification_list'))
+        self.assertContains(response, 'new EventSource')
+        with override_settings(NOTIFICATION_STREAM_ENABLED=False):
+            response = await self.async_client.get(reverse('notifications:notification_list'))
+            self.assertNotContains(response, 'new EventSource')
+            response = await self.async_client.get(reverse('notifications:notification_stream'))
+            self.assertEqual(response.status_code, 204)
+
+
+class RetentionTest(TestCase):
+    """Purge, compaction et archivage des notifications"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        cls.sender = User.objects.create_user(username='sender', password='pass')
+        cls.post = Post.objects.create(author=cls.user, content='Bonjour')
+
+    def setUp(self):
+        cache.clear()
+
+    def create(self, count, days_ago=0, is_read=True, notification_type='LIKE', **kwargs):
+        notifications = Notification.objects.bulk_create([
+            Notification(to_user=self.user, from_user=self.sender, notification_type=notification_type,
+                         is_read=is_read, message='Notification', **kwargs)
+            for _ in range(count)
+        ])
+        Notification.objects.filter(id__in=[n.id for n in notifications]).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return notifications
+
+    def test_purge_only_old_read_notifications(self):
+        self.create(7, days_ago=100)
+        kept = self.create(2, days_ago=100, is_read=False) + self.create(3, days_ago=10)
+        batches = []
+        self.assertEqual(purge_read_notifications(90, batch_size=3, progress=batches.append), 7)
+        self.assertEqual(batches, [3, 6, 7])
+        self.assertEqual(set(Notification.objects.values_list('id', flat=True)), {n.id for n in kept})
+
+    def test_compact_duplicates_keeps_latest(self):
+        self.create(3, days_ago=5, notification_type='CONNECTION_REQUEST')
+        latest = self.create(1, days_ago=1, is_read=False, notification_type='CONNECTION_REQUEST')[0]
+        other = self.create(1, post=self.post)[0]
+        self.assertEqual(get_unread_count(self.user.id), 1)
+
+        self.assertEqual(compact_duplicates(), 3)
+        self.assertEqual(set(Notification.objects.values_list('id', flat=True)), {latest.id, other.id})
+
+    def test_compaction_skips_grouped_notifications(self):
+        # Deux notifications regroupées successives (la première a été lue) restent distinctes
+        group_key = f'LIKE:post:{self.post.id}'
+        grouped = self.create(2, post=self.post, group_key=group_key, actor_count=3)
+        others = [User.objects.create_user(username=f'other{i}', password='pass') for i in range(3)]
+        for other in others:
+            Notification.objects.bulk_create([
+                Notification(to_user=other, from_user=self.sender, notification_type='CONNECTION_REQUEST')
+                for _ in range(2)
+            ])
+
+        # Un destinataire par lot : la recherche des doublons est paginée
+        self.assertEqual(compact_duplicates(batch_size=1), 3)
+        self.assertEqual(Notification.objects.filter(to_user__in=others).count(), 3)
+        self.assertEqual(Notification.objects.filter(group_key=group_key).count(), len(grouped))
+
+    def test_compacting_unread_duplicates_updates_counter(self):
+        self.create(2, days_ago=1, is_read=False, notification_type='CONNECTION_REQUEST')
+        self.assertEqual(get_unread_count(self.user.id), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            compact_duplicates()
+        self.assertEqual(get_unread_count(self.user.id), 1)
+
+    def test_command_archives_deleted_notifications(self):
+        old = self.create(4, days_ago=100)
+        self.create(2, days_ago=1, notification_type='CONNECTION_REQUEST')
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'notifications.jsonl.gz'
+            out = StringIO()
+            call_command('purge_notifications', days=90, batch_size=2, archive=str(path), stdout=out)
+            with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                rows = [json.loads(line) for line in archive]
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row['id'] for row in rows[:4]], [n.id for n in old])
+        self.assertIn('5 notification(s) archivée(s)', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 1)
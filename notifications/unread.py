@@ -0,0 +1,78 @@
+"""
+Compteur de notifications non lues, tenu dans le cache.
+
+Le badge de la barre de navigation est affiché sur toutes les pages : il est lu
+dans le cache (aucune requête) et n'est recompté en base, grâce à l'index partiel
+notification_unread_idx, qu'après une éviction ou à l'expiration du compteur.
+
+Le compteur est incrémenté à la création d'une notification (deliver) et
+décrémenté quand des notifications sont marquées comme lues (mark_read), une
+fois la transaction validée. Une notification non lue qui absorbe de nouveaux
+émetteurs ne change pas le compteur.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notification
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    """Nombre de notifications non lues de l'utilisateur"""
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(to_user_id=user_id, is_read=False).count()
+        # add et non set : ne pas écraser un compteur remis en place entre-temps
+        cache.add(_key(user_id), count, settings.NOTIFICATION_UNREAD_TTL)
+    return count
+
+
+def peek_unread_count(user_id):
+    """Compteur en cache, ou None s'il doit être recompté (aucune requête)"""
+    return cache.get(_key(user_id))
+
+
+def _adjust(user_id, delta):
+    try:
+        if delta > 0:
+            cache.incr(_key(user_id), delta)
+        elif cache.decr(_key(user_id), -delta) < 0:
+            cache.delete(_key(user_id))
+    except ValueError:
+        # Compteur absent : il sera recompté à la prochaine lecture
+        pass
+
+
+def adjust_unread_counts(deltas):
+    """Applique {user_id: variation} aux compteurs après la validation de la transaction"""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    def apply():
+        for user_id, delta in deltas.items():
+            _adjust(user_id, delta)
+
+    transaction.on_commit(apply)
+
+
+def mark_read(user_id, notification_ids=None):
+    """
+    Marque comme lues les notifications données (toutes si notification_ids est
+    None) en un seul UPDATE ; retourne le nombre de notifications modifiées.
+    """
+    notifications = Notification.objects.filter(to_user_id=user_id, is_read=False)
+    if notification_ids is not None:
+        notifications = notifications.filter(id__in=notification_ids)
+    updated = notifications.update(is_read=True)
+    adjust_unread_counts({user_id: -updated})
+    return updated
+
+
+def reset_unread_count(user_id):
+    """Force un nouveau comptage à la prochaine lecture"""
+    cache.delete(_key(user_id))
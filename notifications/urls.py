@@ -0,0 +1,11 @@
+from django.urls import path
+from . import views
+
+app_name = 'notifications'
+
+urlpatterns = [
+    path('', views.NotificationListView.as_view(), name='notification_list'),
+    path('page/', views.NotificationPageView.as_view(), name='notification_page'),
+    path('read/', views.MarkNotificationsReadView.as_view(), name='mark_notifications_read'),
+    path('stream/', views.NotificationStreamView.as_view(), name='notification_stream'),
+]
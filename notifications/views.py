@@ -1,3 +1,92 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.views.generic import TemplateView, View
 
-# Create your views here.
+from .inbox import get_inbox_page
+from .realtime import stream_available, stream_events
+from .unread import get_unread_count, mark_read
+
+
+class NotificationListView(LoginRequiredMixin, TemplateView):
+    """Boîte de réception des notifications"""
+    template_name = 'notifications/notification_list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Sans JavaScript, « Voir plus » recharge la page avec le curseur
+        context['notifications'] = get_inbox_page(self.request.user, self.request.GET.get('cursor'))
+        return context
+
+
+class NotificationPageView(LoginRequiredMixin, View):
+    """Page suivante de la boîte de réception en JSON"""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        page = get_inbox_page(request.user, request.GET.get('cursor'))
+        html = ''.join(
+            render_to_string('notifications/notification_item.html', {'notification': notification}, request=request)
+            for notification in page
+        )
+        return JsonResponse({
+            'success': True,
+            'html': html,
+            'next_cursor': page.next_cursor,
+            'has_next': page.has_next,
+        })
+
+
+class MarkNotificationsReadView(LoginRequiredMixin, View):
+    """Marquer comme lues les notifications données, ou toutes, en une requête"""
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        notification_ids = None
+        if not request.POST.get('all'):
+            notification_ids = [value for value in request.POST.getlist('notification_ids') if value.isdigit()]
+        count = mark_read(request.user.id, notification_ids)
+
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse({'success': True, 'processed': count})
+        if count:
+            messages.success(request, f"{count} notification(s) marquée(s) comme lue(s)")
+        return redirect('notifications:notification_list')
+
+
+class NotificationStreamView(View):
+    """
+    Flux Server-Sent Events des notifications de l'utilisateur et des compteurs
+    de réactions des publications données (?posts=1,2,3).
+
+    Vue asynchrone : servie par l'application ASGI, une connexion inactive
+    n'occupe aucun thread. Sous WSGI ou si le flux est désactivé, la réponse
+    est vide (204), ce qui arrête les reconnexions d'EventSource.
+    """
+    http_method_names = ['get']
+
+    async def get(self, request, *args, **kwargs):
+        if not stream_available(request):
+            return HttpResponse(status=204)
+        user_id, unread_count = await sync_to_async(self.get_user_state)(request)
+        if user_id is None:
+            return HttpResponse(status=401)
+
+        post_ids = [int(value) for value in request.GET.get('posts', '').split(',') if value.isdigit()]
+        # Le compteur initial rattrape ce qui a pu être manqué pendant une reconnexion
+        initial_events = [{'type': 'unread', 'unread_count': unread_count}]
+        response = StreamingHttpResponse(
+            stream_events(user_id, post_ids, initial_events), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def get_user_state(request):
+        if not request.user.is_authenticated:
+            return None, 0
+        return request.user.id, get_unread_count(request.user.id)
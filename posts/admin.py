@@ -37,12 +37,14 @@ class PostAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Contenu'
     
     def get_comments_count(self, obj):
-        return obj.comments.count()
+        return obj.comments_count
     get_comments_count.short_description = 'Commentaires'
+    get_comments_count.admin_order_field = 'comments_count'
     
     def get_reactions_count(self, obj):
-        return obj.reactions.count()
+        return obj.reactions_count
     get_reactions_count.short_description = 'Réactions'
+    get_reactions_count.admin_order_field = 'reactions_count'
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'post_preview', 'content_preview', 'created_at')
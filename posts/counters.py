@@ -0,0 +1,80 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Post, Comment, Reaction, REACTION_COUNT_FIELDS
+
+
+def _shift(field, delta):
+    """Expression F() + delta bornée à zéro"""
+    return Greatest(F(field) + delta, Value(0))
+
+
+def update_reaction_counters(post_id, reaction_type, delta):
+    """Ajoute delta au compteur du type de réaction et au total (UPDATE atomique)"""
+    updates = {'reactions_count': _shift('reactions_count', delta)}
+    field = REACTION_COUNT_FIELDS.get(reaction_type)
+    if field:
+        updates[field] = _shift(field, delta)
+    Post.objects.filter(id=post_id).update(**updates)
+
+
+def move_reaction_counter(post_id, old_type, new_type):
+    """Transfère une réaction d'un type à un autre, le total reste inchangé"""
+    updates = {}
+    old_field = REACTION_COUNT_FIELDS.get(old_type)
+    new_field = REACTION_COUNT_FIELDS.get(new_type)
+    if old_field:
+        updates[old_field] = _shift(old_field, -1)
+    if new_field:
+        updates[new_field] = _shift(new_field, 1)
+    if updates:
+        Post.objects.filter(id=post_id).update(**updates)
+
+
+def update_comments_counter(post_id, delta):
+    """Ajoute delta au nombre de commentaires du post"""
+    Post.objects.filter(id=post_id).update(comments_count=_shift('comments_count', delta))
+
+
+def _count_subquery(queryset):
+    """Sous-requête corrélée comptant les lignes liées au post courant"""
+    counts = queryset.filter(post=OuterRef('pk')).order_by().values('post').annotate(
+        count=Count('id')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def rebuild_post_counters(queryset=None):
+    """
+    Recalcule tous les compteurs à partir des tables Reaction et Comment.
+
+    Un seul UPDATE avec des sous-requêtes corrélées, sans charger les posts en mémoire.
+    Retourne le nombre de posts mis à jour.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+
+    updates = {
+        field: _count_subquery(Reaction.objects.filter(reaction_type=reaction_type))
+        for reaction_type, field in REACTION_COUNT_FIELDS.items()
+    }
+    updates['reactions_count'] = _count_subquery(Reaction.objects.all())
+    updates['comments_count'] = _count_subquery(Comment.objects.all())
+    return queryset.order_by().update(**updates)
+
+
+def apply_reaction_change(post, old_type, new_type):
+    """
+    Reproduit sur l'instance post la variation appliquée en base par les signaux.
+
+    old_type vaut None pour un ajout, new_type vaut None pour une suppression.
+    """
+    for reaction_type, delta in ((old_type, -1), (new_type, 1)):
+        field = REACTION_COUNT_FIELDS.get(reaction_type)
+        if field:
+            setattr(post, field, max(getattr(post, field) + delta, 0))
+
+    if old_type is None and new_type is not None:
+        post.reactions_count += 1
+    elif old_type is not None and new_type is None:
+        post.reactions_count = max(post.reactions_count - 1, 0)
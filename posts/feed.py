@@ -0,0 +1,139 @@
+import base64
+
+from django.core.paginator import Paginator
+from django.db.models import Prefetch, Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Post, Comment, Reaction
+from .timeline import get_timeline_positions
+
+POSTS_PER_PAGE = 10
+
+
+def get_feed_queryset():
+    """Queryset de base du fil d'actualité (auteurs et commentaires préchargés)"""
+    comments = Comment.objects.select_related('author', 'author__profile')
+    return Post.objects.select_related('author', 'author__profile').prefetch_related(
+        Prefetch('comments', queryset=comments)
+    ).order_by('-created_at', '-id')
+
+
+def attach_reactions(posts, user):
+    """
+    Ajoute reactions_stats, total_reactions et user_reaction à chaque post.
+
+    Les statistiques proviennent des compteurs dénormalisés de Post ; seule la
+    réaction de l'utilisateur nécessite une requête, commune à toute la page.
+    """
+    posts = list(posts)
+    post_ids = [post.id for post in posts]
+    if not post_ids:
+        return posts
+
+    user_reactions = {}
+    if user.is_authenticated:
+        user_reactions = {
+            reaction.post_id: reaction
+            for reaction in Reaction.objects.filter(user=user, post_id__in=post_ids)
+        }
+
+    for post in posts:
+        post.reactions_stats = post.get_reactions_stats()
+        post.total_reactions = post.reactions_count
+        post.user_reaction = user_reactions.get(post.id)
+
+    return posts
+
+
+def get_feed_page(user, page_number, per_page=POSTS_PER_PAGE):
+    """Pagine le fil puis enrichit uniquement les posts de la page demandée"""
+    paginator = Paginator(get_feed_queryset(), per_page)
+    page_obj = paginator.get_page(page_number)
+    page_obj.object_list = attach_reactions(page_obj.object_list, user)
+    return page_obj
+
+
+class CursorPage:
+    """Page du fil obtenue par pagination par curseur (keyset)"""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(post):
+    """Encode la position (created_at, id) d'un post dans un jeton opaque"""
+    raw = f"{post.created_at.isoformat()}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Décode un jeton de curseur, retourne None s'il est invalide"""
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        created_at, post_id = raw.rsplit('|', 1)
+        created_at = parse_datetime(created_at)
+        post_id = int(post_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if created_at is None:
+        return None
+    return created_at, post_id
+
+
+def get_feed_cursor_page(user, cursor=None, per_page=POSTS_PER_PAGE):
+    """
+    Retourne une page du fil située après le curseur donné.
+
+    Le filtre (created_at, id) < curseur s'appuie sur l'index composite de Post :
+    aucune requête COUNT ni OFFSET, une page profonde coûte autant que la première.
+    """
+    queryset = get_feed_queryset()
+    position = decode_cursor(cursor)
+    if position:
+        created_at, post_id = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, id__lt=post_id)
+        )
+
+    # Un élément de plus pour savoir s'il existe une page suivante
+    posts = list(queryset[:per_page + 1])
+    return build_cursor_page(posts, user, per_page)
+
+
+def get_timeline_cursor_page(user, cursor=None, per_page=POSTS_PER_PAGE):
+    """
+    Page du fil personnalisé (posts de l'utilisateur et de ses connexions).
+
+    Les positions sont lues dans le fil matérialisé, puis les posts sont chargés
+    par clé primaire.
+    """
+    positions = get_timeline_positions(user.id, decode_cursor(cursor), per_page + 1)
+    post_ids = [post_id for _, post_id in positions]
+    posts_by_id = get_feed_queryset().in_bulk(post_ids)
+    posts = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+    return build_cursor_page(posts, user, per_page)
+
+
+def build_cursor_page(posts, user, per_page):
+    """Construit la page à partir de per_page + 1 posts triés"""
+    next_cursor = encode_cursor(posts[per_page - 1]) if len(posts) > per_page else None
+    posts = attach_reactions(posts[:per_page], user)
+    return CursorPage(posts, next_cursor)
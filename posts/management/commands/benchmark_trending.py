@@ -0,0 +1,83 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import TopicBucket
+from posts.trending import aggregate_topics, compute_trending_topics, record_topics, write_buckets
+
+WORDS = [
+    'django', 'python', 'javascript', 'react', 'docker', 'kubernetes', 'cloud', 'données',
+    'intelligence', 'artificielle', 'recrutement', 'carrière', 'startup', 'produit', 'design',
+    'sécurité', 'devops', 'mobile', 'backend', 'frontend', 'architecture', 'performance',
+    'équipe', 'projet', 'conférence', 'formation', 'télétravail', 'innovation', 'marketing',
+]
+HASHTAGS = ['#django', '#python', '#ia', '#devops', '#emploi', '#tech', '#cloud', '#startup']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mesure l'extraction, l'écriture et la lecture des sujets tendance sur des publications synthétiques"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000, help="Nombre de publications synthétiques")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def generate_posts(self, count):
+        """Publications synthétiques réparties sur la fenêtre de tendance"""
+        rng = random.Random(self.seed)
+        now = timezone.now()
+        window = settings.TRENDING_WINDOW_HOURS * 3600
+        for _ in range(count):
+            words = rng.choices(WORDS, k=rng.randint(5, 25))
+            if rng.random() < 0.3:
+                words.append(rng.choice(HASHTAGS))
+            yield ' '.join(words), now - timedelta(seconds=rng.randint(0, window))
+
+    def handle(self, *args, **options):
+        # La mesure tient le verrou d'écriture de la base pendant toute sa durée
+        # et ses tranches entreraient en conflit avec les tranches réelles
+        if TopicBucket.objects.exists():
+            raise CommandError(
+                "La table des sujets tendance n'est pas vide : lancer la mesure sur une "
+                "base de développement vide ou une copie de la base"
+            )
+        self.seed = options['seed']
+        count = options['posts']
+
+        start = time.perf_counter()
+        counts = aggregate_topics(self.generate_posts(count))
+        extract_time = time.perf_counter() - start
+        self.stdout.write(f"Extraction de {count} publications : {extract_time:.2f}s "
+                          f"({count / extract_time:,.0f} publications/s, {len(counts)} tranches)")
+
+        # Les données synthétiques sont annulées à la fin de la mesure
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                write_buckets(counts)
+                self.stdout.write(f"Écriture des tranches : {time.perf_counter() - start:.2f}s")
+
+                start = time.perf_counter()
+                for content, created_at in self.generate_posts(1000):
+                    record_topics(content, created_at, 1)
+                per_post = (time.perf_counter() - start) / 1000
+                self.stdout.write(f"Mise à jour incrémentale : {per_post * 1000:.2f}ms par publication")
+
+                start = time.perf_counter()
+                topics = compute_trending_topics()
+                self.stdout.write(f"Calcul du top {len(topics)} : {(time.perf_counter() - start) * 1000:.1f}ms")
+                for topic in topics:
+                    self.stdout.write(f"  {topic['title']} : {topic['count']} publications (score {topic['score']:.1f})")
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("✓ Mesure terminée, aucune donnée conservée"))
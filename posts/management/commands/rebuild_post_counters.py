@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_post_counters
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de réactions et de commentaires des publications"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--post',
+            type=int,
+            action='append',
+            dest='post_ids',
+            help="Limiter le recalcul à une publication (option répétable)"
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['post_ids']:
+            queryset = queryset.filter(id__in=options['post_ids'])
+
+        updated = rebuild_post_counters(queryset)
+        self.stdout.write(self.style.SUCCESS(f"✓ Compteurs recalculés pour {updated} publication(s)"))
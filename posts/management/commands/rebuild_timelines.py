@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les fils d'actualité personnalisés à partir des posts et des connexions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help="Limiter la reconstruction à un utilisateur (option répétable)"
+        )
+
+    def handle(self, *args, **options):
+        user_ids = User.objects.order_by('id').values_list('id', flat=True)
+        if options['user_ids']:
+            user_ids = user_ids.filter(id__in=options['user_ids'])
+
+        count = 0
+        for user_id in user_ids.iterator():
+            rebuild_timeline(user_id)
+            count += 1
+            if count % 100 == 0:
+                self.stdout.write(f"  {count} fils reconstruits...")
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {count} fil(s) reconstruit(s)"))
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import Post, TopicBucket
+from posts.trending import TRENDING_KEY, aggregate_topics, write_buckets
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de sujets tendance à partir des publications récentes"
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+        posts = Post.objects.filter(created_at__gte=since).values_list('content', 'created_at')
+
+        counts = aggregate_topics(posts.iterator(chunk_size=2000))
+
+        # Les tranches hors de la fenêtre ne servent plus : on repart de zéro
+        with transaction.atomic():
+            TopicBucket.objects.all().delete()
+            write_buckets(counts)
+
+        cache.delete(TRENDING_KEY)
+        self.stdout.write(self.style.SUCCESS(f"✓ {len(counts)} tranche(s) de sujets recalculée(s)"))
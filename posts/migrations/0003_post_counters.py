@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:31
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset):
+    counts = queryset.filter(post=OuterRef('pk')).order_by().values('post').annotate(
+        count=Count('id')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Reaction = apps.get_model('posts', 'Reaction')
+
+    updates = {
+        f'{reaction_type.lower()}_count': count_subquery(Reaction.objects.filter(reaction_type=reaction_type))
+        for reaction_type in ['LIKE', 'LOVE', 'FUNNY', 'WOW', 'SAD', 'ANGRY']
+    }
+    updates['reactions_count'] = count_subquery(Reaction.objects.all())
+    updates['comments_count'] = count_subquery(Comment.objects.all())
+    Post.objects.update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_post_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='angry_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='En colère'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Nombre de commentaires'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='funny_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Haha'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, verbose_name="J'aime"),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='love_count',
+            field=models.PositiveIntegerField(default=0, verbose_name="J'adore"),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reactions_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Nombre de réactions'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='sad_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Triste'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='wow_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Wow'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
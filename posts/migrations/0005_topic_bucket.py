@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=100, verbose_name='Sujet')),
+                ('bucket', models.PositiveIntegerField(verbose_name='Tranche horaire')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Nombre de publications')),
+            ],
+            options={
+                'verbose_name': 'Tranche de sujet',
+                'verbose_name_plural': 'Tranches de sujets',
+                'indexes': [models.Index(fields=['bucket'], name='topic_bucket_idx')],
+                'unique_together': {('topic', 'bucket')},
+            },
+        ),
+    ]
@@ -19,14 +19,36 @@ class Post(models.Model):
         verbose_name="Date de création"
     )
 
+    # Compteurs dénormalisés, maintenus par les signaux de posts/signals.py
+    like_count = models.PositiveIntegerField(default=0, verbose_name="J'aime")
+    love_count = models.PositiveIntegerField(default=0, verbose_name="J'adore")
+    funny_count = models.PositiveIntegerField(default=0, verbose_name="Haha")
+    wow_count = models.PositiveIntegerField(default=0, verbose_name="Wow")
+    sad_count = models.PositiveIntegerField(default=0, verbose_name="Triste")
+    angry_count = models.PositiveIntegerField(default=0, verbose_name="En colère")
+    reactions_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de réactions")
+    comments_count = models.PositiveIntegerField(default=0, verbose_name="Nombre de commentaires")
+
     class Meta:
         verbose_name = "Publication"
         verbose_name_plural = "Publications"
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='post_feed_idx'),
+        ]
 
     def __str__(self):
         return f"Publication de {self.author.username} - {self.created_at.strftime('%d/%m/%Y')}"
 
+    def get_reactions_stats(self):
+        """Répartition des réactions par type, triée par nombre décroissant"""
+        stats = [
+            {'reaction_type': reaction_type, 'count': getattr(self, field)}
+            for reaction_type, field in REACTION_COUNT_FIELDS.items()
+            if getattr(self, field)
+        ]
+        return sorted(stats, key=lambda stat: stat['count'], reverse=True)
+
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
@@ -94,3 +116,79 @@ class Reaction(models.Model):
 
     def __str__(self):
         return f"{self.user.username} a réagi {self.get_reaction_type_display()} à {self.post}"
+
+# Champ compteur de Post correspondant à chaque type de réaction
+REACTION_COUNT_FIELDS = {
+    reaction_type: f'{reaction_type.lower()}_count'
+    for reaction_type, _ in Reaction.REACTION_TYPES
+}
+
+class TimelineEntry(models.Model):
+    """Entrée du fil personnalisé d'un utilisateur, écrite lors de la publication"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Utilisateur",
+        related_name='timeline_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Publication",
+        related_name='timeline_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Auteur",
+        related_name='+'
+    )
+    # Copie de post.created_at pour parcourir le fil sans jointure
+    created_at = models.DateTimeField(verbose_name="Date de publication")
+
+    class Meta:
+        verbose_name = "Entrée de fil"
+        verbose_name_plural = "Entrées de fil"
+        unique_together = ['user', 'post']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_idx'),
+            models.Index(fields=['user', 'author'], name='timeline_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f"Fil de {self.user_id} : publication {self.post_id}"
+
+class HighFanoutAuthor(models.Model):
+    """Auteur trop connecté pour la diffusion à l'écriture : ses posts sont lus à la demande"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Utilisateur",
+        related_name='+'
+    )
+
+    class Meta:
+        verbose_name = "Auteur à forte audience"
+        verbose_name_plural = "Auteurs à forte audience"
+
+    def __str__(self):
+        return f"Auteur à forte audience {self.user_id}"
+
+class TopicBucket(models.Model):
+    """Nombre de publications mentionnant un sujet pendant une heure donnée"""
+    topic = models.CharField(max_length=100, verbose_name="Sujet")
+    # Nombre d'heures écoulées depuis l'epoch Unix
+    bucket = models.PositiveIntegerField(verbose_name="Tranche horaire")
+    count = models.PositiveIntegerField(default=0, verbose_name="Nombre de publications")
+
+    class Meta:
+        verbose_name = "Tranche de sujet"
+        verbose_name_plural = "Tranches de sujets"
+        unique_together = ['topic', 'bucket']
+        indexes = [
+            models.Index(fields=['bucket'], name='topic_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} ({self.bucket}) : {self.count}"
@@ -0,0 +1,66 @@
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.shortcuts import get_object_or_404
+
+from .counters import apply_reaction_change
+from .models import Post, Reaction
+from .signals import reactions_changed
+
+
+def toggle_reaction(user, post_id, reaction_type):
+    """
+    Ajoute, modifie ou retire la réaction de l'utilisateur sur un post.
+
+    Le post est verrouillé et lu avec la réaction existante de l'utilisateur en
+    une seule requête, puis une seule écriture est faite. Les statistiques
+    renvoyées sont déduites des compteurs du post verrouillé, sans relecture.
+
+    Retourne (post, action, type de réaction courant de l'utilisateur ou None).
+    """
+    post, action, current = _toggle_reaction(user, post_id, reaction_type)
+    if action != 'unchanged':
+        reactions_changed.send(sender=Post, post=post)
+    return post, action, current
+
+
+def _toggle_reaction(user, post_id, reaction_type):
+    user_reactions = Reaction.objects.filter(post=OuterRef('pk'), user=user)
+
+    with transaction.atomic():
+        post = get_object_or_404(
+            Post.objects.select_for_update().annotate(
+                user_reaction_id=Subquery(user_reactions.values('id')[:1]),
+                user_reaction_type=Subquery(user_reactions.values('reaction_type')[:1]),
+                user_reaction_created_at=Subquery(user_reactions.values('created_at')[:1]),
+            ),
+            id=post_id
+        )
+        previous_type = post.user_reaction_type
+
+        if previous_type is None:
+            try:
+                with transaction.atomic():
+                    Reaction.objects.create(user=user, post=post, reaction_type=reaction_type)
+            except IntegrityError:
+                # Double clic concurrent : l'autre requête a déjà créé la réaction
+                post.refresh_from_db()
+                current = Reaction.objects.filter(user=user, post=post).values_list('reaction_type', flat=True).first()
+                return post, 'unchanged', current
+            apply_reaction_change(post, None, reaction_type)
+            return post, 'added', reaction_type
+
+        # Instance construite sans requête : les signaux connaissent l'ancien type
+        reaction = Reaction(
+            id=post.user_reaction_id, user=user, post=post, reaction_type=previous_type,
+            created_at=post.user_reaction_created_at
+        )
+
+        if previous_type == reaction_type:
+            reaction.delete()
+            apply_reaction_change(post, previous_type, None)
+            return post, 'removed', None
+
+        reaction.reaction_type = reaction_type
+        reaction.save(update_fields=['reaction_type'])
+        apply_reaction_change(post, previous_type, reaction_type)
+        return post, 'updated', reaction_type
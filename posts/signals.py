@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from accounts.models import Profile
+from linkedin_project.images import discard_variants, file_name, schedule_variants
+from connections.signals import connection_status_changed, connections_bulk_changed
+from .counters import update_reaction_counters, move_reaction_counter, update_comments_counter
+from .models import Post, Comment, Reaction
+from .stats import expire_post_stats, expire_user_stats
+from .timeline import publish_post, connect_timelines, connect_timelines_many, disconnect_timelines
+from .trending import record_topics
+
+# Envoyé par toggle_reaction quand les compteurs de réactions d'un post changent.
+# Argument : post (compteurs à jour en mémoire)
+reactions_changed = Signal()
+
+
+@receiver(post_init, sender=Reaction)
+def remember_reaction_type(sender, instance, **kwargs):
+    """Mémorise le type chargé pour détecter un changement à la sauvegarde"""
+    instance._initial_reaction_type = instance.reaction_type
+
+
+@receiver(post_save, sender=Reaction)
+def reaction_saved(sender, instance, created, **kwargs):
+    if created:
+        update_reaction_counters(instance.post_id, instance.reaction_type, 1)
+    elif instance._initial_reaction_type != instance.reaction_type:
+        move_reaction_counter(instance.post_id, instance._initial_reaction_type, instance.reaction_type)
+    instance._initial_reaction_type = instance.reaction_type
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance, **kwargs):
+    update_reaction_counters(instance.post_id, instance._initial_reaction_type, -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        update_comments_counter(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    update_comments_counter(instance.post_id, -1)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_content(sender, instance, **kwargs):
+    instance._initial_content = instance.content
+    instance._initial_image = file_name(instance, 'image')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_post(instance)
+        record_topics(instance.content, instance.created_at, 1)
+        expire_post_stats()
+    elif instance._initial_content != instance.content:
+        record_topics(instance._initial_content, instance.created_at, -1)
+        record_topics(instance.content, instance.created_at, 1)
+    instance._initial_content = instance.content
+    schedule_variants(instance, 'image', instance._initial_image, 'post')
+    instance._initial_image = file_name(instance, 'image')
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    record_topics(instance._initial_content, instance.created_at, -1)
+    expire_post_stats()
+    discard_variants(instance._initial_image, 'post')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # Les connexions (mise à jour de last_login) ne changent pas les statistiques
+    if created:
+        expire_user_stats()
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=User)
+def user_changed(sender, **kwargs):
+    expire_user_stats()
+
+
+@receiver(connection_status_changed)
+def connection_status_updated(sender, instance, old_status, new_status, bulk=False, **kwargs):
+    if bulk:
+        return
+    if new_status == 'ACCEPTED':
+        connect_timelines(instance.from_user_id, instance.to_user_id)
+    elif old_status == 'ACCEPTED':
+        disconnect_timelines(instance.from_user_id, instance.to_user_id)
+
+
+@receiver(connections_bulk_changed)
+def connections_bulk_updated(sender, user, connections, old_status, new_status, **kwargs):
+    if new_status == 'ACCEPTED':
+        other_ids = [
+            connection.to_user_id if connection.from_user_id == user.id else connection.from_user_id
+            for connection in connections
+        ]
+        connect_timelines_many(user.id, other_ids)
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from connections.models import Suggestion
+from connections.utils import exclude_linked_users
+from linkedin_project.cache import get_or_compute, expire
+from .models import Post
+
+TOTAL_POSTS_KEY = 'stats:total_posts'
+TOTAL_USERS_KEY = 'stats:total_users'
+
+SUGGESTIONS_COUNT = 3
+
+
+def get_total_posts():
+    """Nombre total de publications (en cache)"""
+    return get_or_compute(TOTAL_POSTS_KEY, Post.objects.count, settings.SIDEBAR_STATS_TTL)
+
+
+def get_total_users():
+    """Nombre total d'utilisateurs (en cache)"""
+    return get_or_compute(TOTAL_USERS_KEY, User.objects.count, settings.SIDEBAR_STATS_TTL)
+
+
+def get_suggested_users(user):
+    """
+    Suggestions de la barre latérale, lues dans la table précalculée de
+    connections/suggestions.py. Les utilisateurs sans suggestion calculée
+    (nouveaux comptes, suggestions épuisées) reçoivent les premiers comptes
+    avec lesquels ils n'ont encore aucun lien.
+    """
+    suggestions = Suggestion.objects.filter(user=user).select_related(
+        'candidate', 'candidate__profile'
+    ).order_by('-score')[:SUGGESTIONS_COUNT]
+    users = []
+    for suggestion in suggestions:
+        suggestion.candidate.mutual_count = suggestion.mutual_count
+        users.append(suggestion.candidate)
+    if users:
+        return users
+
+    # Propre à chaque utilisateur (ses connexions, demandes et blocages) : pas de cache partagé
+    candidates = exclude_linked_users(User.objects.exclude(id=user.id), user.id)
+    return list(candidates.select_related('profile').order_by('id')[:SUGGESTIONS_COUNT])
+
+
+def expire_post_stats():
+    expire(TOTAL_POSTS_KEY)
+
+
+def expire_user_stats():
+    expire(TOTAL_USERS_KEY)
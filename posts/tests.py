@@ -1,3 +1,417 @@
-from django.test import TestCase
+import re
+import threading
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Profile
+from connections.models import Connection
+from . import reactions
+from .models import Post, Comment, Reaction, TimelineEntry, TopicBucket
+from .stats import get_suggested_users, get_total_posts, get_total_users
+from .timeline import DatabaseTimelineStore, get_timeline_positions
+from .trending import extract_topics, compute_trending_topics, current_bucket
+
+
+class DashboardQueryCountTest(TestCase):
+    """Le coût d'une page du dashboard ne dépend pas du nombre de posts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = []
+        for i in range(6):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='pass')
+            Profile.objects.create(user=user)
+            cls.users.append(user)
+        cls.viewer = cls.users[0]
+
+    def create_posts(self, count):
+        reaction_types = [choice for choice, _ in Reaction.REACTION_TYPES]
+        for i in range(count):
+            post = Post.objects.create(author=self.users[i % len(self.users)], content=f'Post {i}')
+            Comment.objects.create(post=post, author=self.users[(i + 1) % len(self.users)], content='Bravo')
+            for j, user in enumerate(self.users[:(i % len(self.users)) + 1]):
+                Reaction.objects.create(user=user, post=post, reaction_type=reaction_types[j % len(reaction_types)])
+
+    def count_dashboard_queries(self, page=1):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('posts:dashboard'), {'page': page})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant(self):
+        self.client.force_login(self.viewer)
+        self.create_posts(10)
+        baseline = self.count_dashboard_queries()
+
+        self.create_posts(40)
+        self.assertEqual(self.count_dashboard_queries(), baseline)
+        self.assertEqual(self.count_dashboard_queries(page=4), baseline)
+
+    def test_reactions_are_attached(self):
+        self.client.force_login(self.viewer)
+        post = Post.objects.create(author=self.users[1], content='Hello')
+        Reaction.objects.create(user=self.viewer, post=post, reaction_type='LOVE')
+        Reaction.objects.create(user=self.users[2], post=post, reaction_type='LOVE')
+        Reaction.objects.create(user=self.users[3], post=post, reaction_type='LIKE')
+
+        response = self.client.get(reverse('posts:dashboard'))
+        feed_post = response.context['page_obj'][0]
+
+        self.assertEqual(feed_post.total_reactions, 3)
+        self.assertEqual(feed_post.reactions_stats[0], {'reaction_type': 'LOVE', 'count': 2})
+        self.assertEqual(feed_post.user_reaction.reaction_type, 'LOVE')
+
+
+class FeedCursorTest(TestCase):
+    """Pagination par curseur du fil d'actualité"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', email='reader@example.com', password='pass')
+        Profile.objects.create(user=cls.user)
+        cls.posts = [Post.objects.create(author=cls.user, content=f'Post {i}') for i in range(25)]
+        # Plusieurs posts à la même date pour vérifier le départage par id
+        same_date = cls.posts[10].created_at
+        Post.objects.filter(id__in=[p.id for p in cls.posts[8:14]]).update(created_at=same_date)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_walks_whole_feed_without_duplicates(self):
+        seen = []
+        cursor = ''
+        while True:
+            data = self.client.get(reverse('posts:feed'), {'cursor': cursor}).json()
+            seen.extend(int(pk) for pk in re.findall(r'id="post-(\d+)"', data['html']))
+            if not data['has_next']:
+                break
+            cursor = data['next_cursor']
+
+        expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_deep_page_costs_the_same(self):
+        first = self.client.get(reverse('posts:feed')).json()
+        with CaptureQueriesContext(connection) as first_ctx:
+            self.client.get(reverse('posts:feed'))
+        with CaptureQueriesContext(connection) as deep_ctx:
+            self.client.get(reverse('posts:feed'), {'cursor': first['next_cursor']})
+
+        self.assertEqual(len(first_ctx.captured_queries), len(deep_ctx.captured_queries))
+        self.assertFalse(any('COUNT(*)' in q['sql'] or 'OFFSET' in q['sql'] for q in deep_ctx.captured_queries))
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('posts:dashboard'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+
+class PostCountersTest(TestCase):
+    """Compteurs dénormalisés de réactions et de commentaires"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author', email='author@example.com', password='pass')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='pass')
+
+    def setUp(self):
+        self.post = Post.objects.create(author=self.author, content='Hello')
+
+    def test_reaction_lifecycle(self):
+        reaction = Reaction.objects.create(user=self.other, post=self.post, reaction_type='LIKE')
+        Reaction.objects.create(user=self.author, post=self.post, reaction_type='LIKE')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.reactions_count), (2, 2))
+
+        reaction.reaction_type = 'WOW'
+        reaction.save()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.wow_count, self.post.reactions_count), (1, 1, 2))
+
+        reaction.delete()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.wow_count, self.post.reactions_count), (1, 0, 1))
+
+    def test_comment_lifecycle(self):
+        comment = Comment.objects.create(post=self.post, author=self.other, content='Bravo')
+        Comment.objects.create(post=self.post, author=self.author, content='Merci')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_rebuild_command(self):
+        Reaction.objects.create(user=self.other, post=self.post, reaction_type='LOVE')
+        Comment.objects.create(post=self.post, author=self.other, content='Bravo')
+        Post.objects.update(love_count=7, reactions_count=0, comments_count=3)
+
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.love_count, self.post.reactions_count, self.post.comments_count), (1, 1, 1))
+
+
+class ToggleReactionTest(TestCase):
+    """Bascule des réactions en une lecture verrouillée et une écriture"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='fan', email='fan@example.com', password='pass')
+        author = User.objects.create_user(username='author', email='author@example.com', password='pass')
+        cls.post = Post.objects.create(author=author, content='Hello')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('posts:toggle_reaction', args=[self.post.id])
+
+    def toggle(self, reaction_type):
+        return self.client.post(self.url, {'reaction_type': reaction_type})
+
+    def test_add_update_remove(self):
+        data = self.toggle('LIKE').json()
+        self.assertEqual((data['action'], data['user_reaction'], data['total_reactions']), ('added', 'LIKE', 1))
+
+        data = self.toggle('LOVE').json()
+        self.assertEqual((data['action'], data['user_reaction'], data['total_reactions']), ('updated', 'LOVE', 1))
+        self.assertEqual(data['reactions_stats'], [{'reaction_type': 'LOVE', 'count': 1}])
+
+        data = self.toggle('LOVE').json()
+        self.assertEqual((data['action'], data['user_reaction'], data['total_reactions']), ('removed', None, 0))
+        self.assertFalse(Reaction.objects.exists())
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.love_count, self.post.reactions_count), (0, 0))
+
+    def test_query_count(self):
+        for reaction_type in ('LIKE', 'WOW', 'WOW'):
+            with CaptureQueriesContext(connection) as ctx:
+                self.toggle(reaction_type)
+            statements = [
+                q['sql'] for q in ctx.captured_queries
+                if not q['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+                and 'django_session' not in q['sql'] and 'auth_user' not in q['sql']
+            ]
+            # Lecture verrouillée, écriture de la réaction, mise à jour des compteurs
+            self.assertEqual(len(statements), 3, statements)
+
+    def test_invalid_reaction_type(self):
+        response = self.toggle('NOPE')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Reaction.objects.exists())
+
+
+class ConcurrentReactionTest(TransactionTestCase):
+    """Double clic : deux bascules simultanées sur le même post"""
+
+    def test_concurrent_toggles_do_not_fail(self):
+        author = User.objects.create_user(username='author', password='pass')
+        fan = User.objects.create_user(username='fan', password='pass')
+        post = Post.objects.create(author=author, content='Hello')
+        url = reverse('posts:toggle_reaction', args=[post.id])
+        apply_reaction_change = reactions.apply_reaction_change
+
+        def slow_apply(*args):
+            # La transaction reste ouverte pendant que l'autre requête démarre
+            apply_reaction_change(*args)
+            time.sleep(0.3)
+
+        responses = []
+
+        def click():
+            client = Client()
+            client.force_login(fan)
+            try:
+                responses.append(client.post(url, {'reaction_type': 'LIKE'}))
+            finally:
+                connection.close()
+
+        with mock.patch('posts.reactions.apply_reaction_change', slow_apply):
+            threads = [threading.Thread(target=click) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(sorted(response.json()['action'] for response in responses), ['added', 'removed'])
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.reactions_count, Reaction.objects.count()), (0, 0, 0))
+
+
+class RecordingTimelineStore(DatabaseTimelineStore):
+    """Stockage de test qui note les posts diffusés"""
+    published = []
+
+    def add_post(self, post, user_ids):
+        self.published.append(post.id)
+        super().add_post(post, user_ids)
+
+
+class TimelineTest(TestCase):
+    """Fil personnalisé diffusé à l'écriture"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob, cls.carol = [
+            User.objects.create_user(username=name, email=f'{name}@example.com', password='pass')
+            for name in ('alice', 'bob', 'carol')
+        ]
+
+    def timeline_post_ids(self, user):
+        return [post_id for _, post_id in get_timeline_positions(user.id, None, 100)]
+
+    def test_fan_out_to_connections(self):
+        Connection.objects.create(from_user=self.alice, to_user=self.bob, status='ACCEPTED')
+        post = Post.objects.create(author=self.alice, content='Hello')
+
+        self.assertEqual(self.timeline_post_ids(self.alice), [post.id])
+        self.assertEqual(self.timeline_post_ids(self.bob), [post.id])
+        self.assertEqual(self.timeline_post_ids(self.carol), [])
+
+    def test_accept_backfills_and_remove_purges(self):
+        post = Post.objects.create(author=self.alice, content='Hello')
+        connection = Connection.objects.create(from_user=self.bob, to_user=self.alice)
+        self.assertEqual(self.timeline_post_ids(self.bob), [])
+
+        connection.status = 'ACCEPTED'
+        connection.save()
+        self.assertEqual(self.timeline_post_ids(self.bob), [post.id])
+
+        connection.delete()
+        self.assertEqual(self.timeline_post_ids(self.bob), [])
+        self.assertEqual(self.timeline_post_ids(self.alice), [post.id])
+
+    def test_store_follows_setting(self):
+        RecordingTimelineStore.published = []
+        with override_settings(TIMELINE_STORE='posts.tests.RecordingTimelineStore'):
+            post = Post.objects.create(author=self.alice, content='Hello')
+        Post.objects.create(author=self.alice, content='Encore')
+        self.assertEqual(RecordingTimelineStore.published, [post.id])
+
+    @override_settings(TIMELINE_MAX_ENTRIES=3)
+    def test_timeline_is_trimmed(self):
+        posts = [Post.objects.create(author=self.alice, content=f'Post {i}') for i in range(5)]
+        self.assertEqual(self.timeline_post_ids(self.alice), [p.id for p in reversed(posts[2:])])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_high_fanout_author_is_pulled(self):
+        Connection.objects.create(from_user=self.alice, to_user=self.bob, status='ACCEPTED')
+        Connection.objects.create(from_user=self.carol, to_user=self.alice, status='ACCEPTED')
+        post = Post.objects.create(author=self.alice, content='Hello')
+
+        self.assertFalse(TimelineEntry.objects.filter(user=self.bob).exists())
+        self.assertEqual(self.timeline_post_ids(self.bob), [post.id])
+        self.assertEqual(self.timeline_post_ids(self.carol), [post.id])
+
+    def test_network_feed_page(self):
+        Connection.objects.create(from_user=self.alice, to_user=self.bob, status='ACCEPTED')
+        Post.objects.create(author=self.carol, content='Hors réseau')
+        post = Post.objects.create(author=self.alice, content='Hello')
+
+        self.client.force_login(self.bob)
+        response = self.client.get(reverse('posts:dashboard'), {'feed': 'network'})
+        self.assertEqual([p.id for p in response.context['page_obj']], [post.id])
+
+
+class SidebarStatsTest(TestCase):
+    """Statistiques de la barre latérale servies depuis le cache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='stats', email='stats@example.com', password='pass')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_are_cached_and_refreshed(self):
+        Post.objects.create(author=self.user, content='Hello')
+        self.assertEqual(get_total_posts(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_total_posts(), 1)
+            self.assertEqual(get_total_posts(), 1)
+
+        Post.objects.create(author=self.user, content='Encore')
+        self.assertEqual(get_total_posts(), 2)
+
+    def test_waits_for_concurrent_computation(self):
+        # Un autre processus détient le verrou et publie la valeur pendant l'attente
+        cache.add('stats:total_users:lock', 1)
+        with mock.patch('linkedin_project.cache.time.sleep', side_effect=lambda _: cache.set('stats:total_users', (42, time.time() + 60))):
+            with self.assertNumQueries(0):
+                self.assertEqual(get_total_users(), 42)
+
+    def test_stale_value_served_while_locked(self):
+        self.assertEqual(get_total_users(), 1)
+        User.objects.create_user(username='new', email='new@example.com', password='pass')
+        cache.add('stats:total_users:lock', 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_total_users(), 1)
+        cache.delete('stats:total_users:lock')
+        self.assertEqual(get_total_users(), 2)
+
+    def test_fallback_suggestions_exclude_linked_users(self):
+        others = [User.objects.create_user(username=f'other{i}', password='pass') for i in range(5)]
+        for other, status in zip(others, ['ACCEPTED', 'PENDING', 'BLOCKED']):
+            Connection.objects.create(from_user=self.user, to_user=other, status=status)
+        self.assertEqual(get_suggested_users(self.user), others[3:])
+        # Sans lien avec personne : les premiers comptes, hors lui-même
+        self.assertEqual(get_suggested_users(others[4])[:2], [self.user, others[0]])
+
+
+class TrendingTopicsTest(TestCase):
+    """Sujets tendance calculés à partir des tranches horaires"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='trend', email='trend@example.com', password='pass')
+
+    def topic_count(self, topic):
+        return sum(TopicBucket.objects.filter(topic=topic).values_list('count', flat=True))
+
+    def test_extract_topics(self):
+        topics = extract_topics("Nouvelle version de #Django avec Python et Python, pour vous !")
+        self.assertIn('#django', topics)
+        self.assertIn('python', topics)
+        self.assertNotIn('pour', topics)
+        self.assertNotIn('vous', topics)
+
+    def test_counters_follow_post_lifecycle(self):
+        post = Post.objects.create(author=self.user, content='Migration vers #Kubernetes')
+        self.assertEqual(self.topic_count('#kubernetes'), 1)
+
+        post.content = 'Migration vers #Docker'
+        post.save()
+        self.assertEqual(self.topic_count('#kubernetes'), 0)
+        self.assertEqual(self.topic_count('#docker'), 1)
+
+        post.delete()
+        self.assertEqual(self.topic_count('#docker'), 0)
+
+    def test_recent_topics_rank_first(self):
+        now = current_bucket()
+        TopicBucket.objects.create(topic='ancien', bucket=now - 72, count=5)
+        TopicBucket.objects.create(topic='recent', bucket=now, count=2)
+        TopicBucket.objects.create(topic='expire', bucket=now - 1000, count=100)
+
+        titles = [topic['title'] for topic in compute_trending_topics(now)]
+        self.assertEqual(titles, ['Recent', 'Ancien'])
+
+    def test_benchmark_refuses_existing_buckets(self):
+        call_command('benchmark_trending', posts=2000, stdout=StringIO())
+        self.assertFalse(TopicBucket.objects.exists())
+
+        TopicBucket.objects.create(topic='django', bucket=current_bucket(), count=1)
+        with self.assertRaises(CommandError):
+            call_command('benchmark_trending', posts=2000, stdout=StringIO())
+        self.assertEqual(self.topic_count('django'), 1)
@@ -0,0 +1,212 @@
+"""
+Fil d'actualité personnalisé (fan-out à l'écriture).
+
+À la publication, le post est inscrit dans le fil de l'auteur et de ses connexions
+acceptées. Les auteurs dépassant TIMELINE_FANOUT_LIMIT connexions ne sont pas
+diffusés : leurs posts sont lus à la demande et fusionnés au moment de la lecture.
+
+Le stockage est interchangeable via le réglage TIMELINE_STORE.
+"""
+from django.conf import settings
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.module_loading import import_string
+
+from connections.models import ConnectionEdge
+from connections.utils import get_connection_ids
+from .models import Post, TimelineEntry, HighFanoutAuthor
+
+# Nombre maximal d'identifiants par requête IN (limite de paramètres SQLite)
+BATCH_SIZE = 500
+
+
+class BaseTimelineStore:
+    """Interface d'un stockage de fils d'actualité"""
+
+    @property
+    def max_entries(self):
+        return settings.TIMELINE_MAX_ENTRIES
+
+    def add_post(self, post, user_ids):
+        """Inscrit post dans le fil de chaque utilisateur de user_ids"""
+        raise NotImplementedError
+
+    def backfill(self, user_id, author_id, limit):
+        """Ajoute au fil de user_id les limit derniers posts de author_id"""
+        raise NotImplementedError
+
+    def backfill_many(self, user_ids, author_ids, limit):
+        """Ajoute au fil de chaque utilisateur de user_ids les limit derniers posts de chaque auteur de author_ids"""
+        for user_id in user_ids:
+            for author_id in author_ids:
+                self.backfill(user_id, author_id, limit)
+
+    def purge(self, user_id, author_id):
+        """Retire du fil de user_id tous les posts de author_id"""
+        raise NotImplementedError
+
+    def rebuild(self, user_id, author_ids):
+        """Reconstruit entièrement le fil de user_id à partir des auteurs donnés"""
+        raise NotImplementedError
+
+    def get_entries(self, user_id, position, limit):
+        """
+        Retourne au plus limit couples (created_at, post_id) du fil, du plus récent
+        au plus ancien, strictement avant position si elle est fournie.
+        """
+        raise NotImplementedError
+
+
+class DatabaseTimelineStore(BaseTimelineStore):
+    """Fils stockés dans la table TimelineEntry"""
+
+    def add_post(self, post, user_ids):
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            batch = user_ids[start:start + BATCH_SIZE]
+            TimelineEntry.objects.bulk_create([
+                TimelineEntry(user_id=user_id, post=post, author_id=post.author_id, created_at=post.created_at)
+                for user_id in batch
+            ], ignore_conflicts=True)
+            self.trim(batch)
+
+    def backfill(self, user_id, author_id, limit):
+        posts = Post.objects.filter(author_id=author_id).order_by('-created_at', '-id').values_list(
+            'id', 'created_at'
+        )[:limit]
+        TimelineEntry.objects.bulk_create([
+            TimelineEntry(user_id=user_id, post_id=post_id, author_id=author_id, created_at=created_at)
+            for post_id, created_at in posts
+        ], ignore_conflicts=True)
+        self.trim([user_id])
+
+    def backfill_many(self, user_ids, author_ids, limit):
+        # Les limit derniers posts de chaque auteur, en une requête par lot d'auteurs
+        posts = []
+        for start in range(0, len(author_ids), BATCH_SIZE):
+            ranked = Post.objects.filter(author_id__in=author_ids[start:start + BATCH_SIZE]).annotate(
+                rank=Window(
+                    RowNumber(),
+                    partition_by=[F('author_id')],
+                    order_by=[F('created_at').desc(), F('id').desc()]
+                )
+            )
+            posts.extend(ranked.filter(rank__lte=limit).values_list('id', 'author_id', 'created_at'))
+        if not posts:
+            return
+        TimelineEntry.objects.bulk_create((
+            TimelineEntry(user_id=user_id, post_id=post_id, author_id=author_id, created_at=created_at)
+            for user_id in user_ids
+            for post_id, author_id, created_at in posts
+        ), batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            self.trim(user_ids[start:start + BATCH_SIZE])
+
+    def purge(self, user_id, author_id):
+        TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+    def rebuild(self, user_id, author_ids):
+        posts = Post.objects.filter(author_id__in=author_ids).order_by('-created_at', '-id').values_list(
+            'id', 'author_id', 'created_at'
+        )[:self.max_entries]
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        TimelineEntry.objects.bulk_create([
+            TimelineEntry(user_id=user_id, post_id=post_id, author_id=post_author_id, created_at=created_at)
+            for post_id, post_author_id, created_at in posts
+        ])
+
+    def trim(self, user_ids):
+        """Ne conserve que les max_entries entrées les plus récentes de chaque fil"""
+        ranked = TimelineEntry.objects.filter(user_id__in=user_ids).annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=[F('created_at').desc(), F('post_id').desc()]
+            )
+        )
+        stale_ids = list(ranked.filter(rank__gt=self.max_entries).values_list('id', flat=True))
+        if stale_ids:
+            TimelineEntry.objects.filter(id__in=stale_ids).delete()
+
+    def get_entries(self, user_id, position, limit):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        if position:
+            created_at, post_id = position
+            entries = entries.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, post_id__lt=post_id)
+            )
+        return list(entries.order_by('-created_at', '-post_id').values_list('created_at', 'post_id')[:limit])
+
+
+def get_timeline_store():
+    """
+    Instance du stockage configuré par TIMELINE_STORE, résolu à chaque appel :
+    un changement du réglage (override_settings) est pris en compte
+    """
+    return import_string(settings.TIMELINE_STORE)()
+
+
+def publish_post(post):
+    """Diffuse un nouveau post dans le fil de son auteur et de ses connexions"""
+    recipient_ids = get_connection_ids(post.author_id)
+    if len(recipient_ids) > settings.TIMELINE_FANOUT_LIMIT:
+        # Trop de destinataires : les lecteurs iront chercher ses posts eux-mêmes
+        HighFanoutAuthor.objects.get_or_create(user_id=post.author_id)
+        recipient_ids = []
+    else:
+        HighFanoutAuthor.objects.filter(user_id=post.author_id).delete()
+
+    get_timeline_store().add_post(post, [post.author_id] + recipient_ids)
+
+
+def connect_timelines(user_id, other_id):
+    """Nouvelle connexion acceptée : chacun reçoit les posts récents de l'autre"""
+    store = get_timeline_store()
+    store.backfill(user_id, other_id, settings.TIMELINE_BACKFILL_SIZE)
+    store.backfill(other_id, user_id, settings.TIMELINE_BACKFILL_SIZE)
+
+
+def connect_timelines_many(user_id, other_ids):
+    """Version groupée de connect_timelines pour les connexions de user_id avec other_ids"""
+    store = get_timeline_store()
+    store.backfill_many([user_id], other_ids, settings.TIMELINE_BACKFILL_SIZE)
+    store.backfill_many(other_ids, [user_id], settings.TIMELINE_BACKFILL_SIZE)
+
+
+def disconnect_timelines(user_id, other_id):
+    """Connexion supprimée : chacun perd les posts de l'autre"""
+    store = get_timeline_store()
+    store.purge(user_id, other_id)
+    store.purge(other_id, user_id)
+
+
+def rebuild_timeline(user_id):
+    """Reconstruit le fil d'un utilisateur depuis ses posts et ceux de ses connexions"""
+    get_timeline_store().rebuild(user_id, [user_id] + get_connection_ids(user_id))
+
+
+def get_pulled_author_ids(user_id):
+    """Connexions de user_id dont les posts ne sont pas diffusés à l'écriture"""
+    high_fanout = HighFanoutAuthor.objects.values('user_id')
+    return list(ConnectionEdge.objects.filter(
+        user_id=user_id, status='ACCEPTED', other_id__in=high_fanout
+    ).values_list('other_id', flat=True))
+
+
+def get_timeline_positions(user_id, position, limit):
+    """
+    Couples (created_at, post_id) du fil de user_id : entrées matérialisées,
+    fusionnées avec les posts des auteurs à forte audience lus à la demande.
+    """
+    entries = get_timeline_store().get_entries(user_id, position, limit)
+
+    pulled_author_ids = get_pulled_author_ids(user_id)
+    if pulled_author_ids:
+        posts = Post.objects.filter(author_id__in=pulled_author_ids)
+        if position:
+            created_at, post_id = position
+            posts = posts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+        pulled = posts.order_by('-created_at', '-id').values_list('created_at', 'id')[:limit]
+        entries = sorted(set(entries) | set(pulled), reverse=True)
+
+    return entries[:limit]
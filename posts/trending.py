@@ -0,0 +1,127 @@
+"""
+Sujets tendance.
+
+Les hashtags et mots-clés de chaque publication sont comptés dans des tranches
+horaires (TopicBucket) au moment de l'écriture. Le classement pondère chaque
+tranche par une décroissance exponentielle (demi-vie TRENDING_HALF_LIFE_HOURS)
+et n'est recalculé qu'à l'expiration du cache : la lecture ne parcourt jamais
+le contenu des publications.
+"""
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import F, FloatField, Sum, Value
+from django.db.models.functions import Greatest, Power
+
+from linkedin_project.cache import get_or_compute
+from .models import TopicBucket
+
+TRENDING_KEY = 'trending:topics'
+
+HASHTAG_RE = re.compile(r'#(\w{2,50})')
+WORD_RE = re.compile(r"[^\W\d_]{4,30}")
+
+# Nombre maximal de mots-clés retenus par publication
+MAX_KEYWORDS = 10
+
+STOPWORDS = {
+    'alors', 'aussi', 'autre', 'autres', 'avant', 'avec', 'avoir', 'bien', 'cela', 'celle',
+    'celui', 'cette', 'ceux', 'chez', 'comme', 'comment', 'dans', 'depuis', 'donc', 'elle',
+    'elles', 'encore', 'entre', 'être', 'fait', 'faire', 'leur', 'leurs', 'mais', 'même',
+    'nous', 'notre', 'nos', 'pour', 'plus', 'peut', 'quand', 'quel', 'quelle', 'sans',
+    'sont', 'sous', 'suis', 'tout', 'tous', 'toute', 'toutes', 'très', 'vers', 'votre',
+    'vous', 'voici', 'voilà', 'about', 'after', 'also', 'been', 'from', 'have', 'just',
+    'more', 'that', 'their', 'them', 'then', 'there', 'these', 'they', 'this', 'what',
+    'when', 'which', 'will', 'with', 'your',
+}
+
+
+def current_bucket(timestamp=None):
+    """Tranche horaire (heures depuis l'epoch) d'un timestamp, maintenant par défaut"""
+    if timestamp is None:
+        timestamp = time.time()
+    return int(timestamp // 3600)
+
+
+def bucket_for(dt):
+    return current_bucket(dt.timestamp())
+
+
+def extract_topics(content):
+    """Sujets d'un texte : hashtags ('#django') puis mots-clés les plus fréquents"""
+    hashtags = {f'#{tag.lower()}' for tag in HASHTAG_RE.findall(content)}
+    text = HASHTAG_RE.sub(' ', content).lower()
+    words = Counter(word for word in WORD_RE.findall(text) if word not in STOPWORDS)
+    keywords = {word for word, _ in words.most_common(MAX_KEYWORDS)}
+    return hashtags | keywords
+
+
+def record_topics(content, created_at, delta):
+    """Ajoute delta au compteur de chaque sujet du texte dans la tranche de created_at"""
+    topics = extract_topics(content)
+    if not topics:
+        return
+    bucket = bucket_for(created_at)
+    if delta > 0:
+        TopicBucket.objects.bulk_create(
+            [TopicBucket(topic=topic, bucket=bucket) for topic in topics],
+            ignore_conflicts=True
+        )
+    TopicBucket.objects.filter(bucket=bucket, topic__in=topics).update(
+        count=Greatest(F('count') + delta, Value(0))
+    )
+
+
+def compute_trending_topics(now_bucket=None, limit=None):
+    """Classement des sujets par score décroissant, calculé en une requête groupée"""
+    if now_bucket is None:
+        now_bucket = current_bucket()
+    if limit is None:
+        limit = settings.TRENDING_TOP_K
+
+    decay = Power(
+        Value(0.5),
+        (Value(now_bucket) - F('bucket')) / Value(float(settings.TRENDING_HALF_LIFE_HOURS)),
+        output_field=FloatField()
+    )
+    rows = TopicBucket.objects.filter(
+        bucket__gt=now_bucket - settings.TRENDING_WINDOW_HOURS,
+        count__gt=0
+    ).values('topic').annotate(
+        score=Sum(F('count') * decay, output_field=FloatField()),
+        posts=Sum('count')
+    ).order_by('-score', 'topic')[:limit]
+
+    return [
+        {
+            'title': row['topic'] if row['topic'].startswith('#') else row['topic'].capitalize(),
+            'count': row['posts'],
+            'score': row['score'],
+        }
+        for row in rows
+    ]
+
+
+def get_trending_topics():
+    """Sujets tendance servis depuis le cache"""
+    return get_or_compute(TRENDING_KEY, compute_trending_topics, settings.TRENDING_TTL)
+
+
+def aggregate_topics(posts):
+    """Compte les sujets de (contenu, date) par tranche horaire, en mémoire"""
+    counts = Counter()
+    for content, created_at in posts:
+        bucket = bucket_for(created_at)
+        for topic in extract_topics(content):
+            counts[(topic, bucket)] += 1
+    return counts
+
+
+def write_buckets(counts, batch_size=5000):
+    """Insère en masse des compteurs {(sujet, tranche): nombre}"""
+    TopicBucket.objects.bulk_create(
+        (TopicBucket(topic=topic, bucket=bucket, count=count) for (topic, bucket), count in counts.items()),
+        batch_size=batch_size
+    )
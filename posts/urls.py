@@ -9,6 +9,7 @@ urlpatterns = [
 
     # Dashboard principal (fil d'actualité)
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('dashboard/feed/', views.FeedView.as_view(), name='feed'),
 
     # Gestion des posts
     path('edit/<int:post_id>/', views.EditPostView.as_view(), name='edit_post'),
@@ -1,17 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView, DeleteView, CreateView, UpdateView, View
-from django.core.paginator import Paginator
 from django.db.models import Count, Q
-from .models import Post, Comment, Reaction
+from .models import Post, Comment, Reaction, REACTION_COUNT_FIELDS
 from .forms import PostForm, CommentForm
+from .feed import get_feed_page, get_feed_cursor_page, get_timeline_cursor_page
+from .reactions import toggle_reaction
+from .stats import get_total_posts, get_total_users, get_suggested_users
+from .trending import get_trending_topics
 from django.contrib.auth.models import User
 from django.urls import reverse_lazy
 
+def get_feed_name(request):
+    """Fil demandé : 'network' (mes connexions) ou 'all' (tous les posts)"""
+    return 'network' if request.GET.get('feed') == 'network' else 'all'
+
+def get_cursor_page(request, feed):
+    """Page du fil demandé, paginée par curseur"""
+    cursor = request.GET.get('cursor')
+    if feed == 'network':
+        return get_timeline_cursor_page(request.user, cursor)
+    return get_feed_cursor_page(request.user, cursor)
+
 class HomeView(TemplateView):
     template_name = 'base/home.html'
 
@@ -28,37 +43,20 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         """Préparer les données contextuelles pour le dashboard"""
         context = super().get_context_data(**kwargs)
         context['form'] = PostForm()
-        posts = Post.objects.select_related('author', 'author__profile').prefetch_related(
-            'comments', 'reactions'
-        ).order_by('-created_at')
-
-        # Ajouter les statistiques de réactions pour chaque post
-        for post in posts:
-            # Statistiques des réactions par type
-            post.reactions_stats = post.reactions.values('reaction_type').annotate(
-                count=Count('reaction_type')
-            ).order_by('-count')
-
-            # Vérifier si l'utilisateur actuel a réagi
-            post.user_reaction = post.reactions.filter(user=self.request.user).first()
-
-            # Total des réactions
-            post.total_reactions = post.reactions.count()
-
-        paginator = Paginator(posts, 10)
         page_number = self.request.GET.get('page')
-        context['page_obj'] = paginator.get_page(page_number)
+        context['feed'] = get_feed_name(self.request)
+        if page_number:
+            # Pagination classique conservée pour les anciens liens ?page=
+            context['page_obj'] = get_feed_page(self.request.user, page_number)
+        else:
+            context['page_obj'] = get_cursor_page(self.request, context['feed'])
 
-        context['total_posts'] = Post.objects.count()
-        context['total_users'] = User.objects.count()
+        context['total_posts'] = get_total_posts()
+        context['total_users'] = get_total_users()
 
-        context['trending_topics'] = [
-            {'title': 'Développement Web', 'count': 1234},
-            {'title': 'Intelligence Artificielle', 'count': 987},
-            {'title': 'DevOps', 'count': 756},
-        ]
+        context['trending_topics'] = get_trending_topics()
 
-        context['suggested_users'] = User.objects.exclude(id=self.request.user.id)[:3]
+        context['suggested_users'] = get_suggested_users(self.request.user)
 
         return context
 
@@ -77,6 +75,22 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             context['form'] = form
             return self.render_to_response(context)
 
+class FeedView(LoginRequiredMixin, View):
+    """Page suivante du fil d'actualité en JSON (défilement infini)"""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        page = get_cursor_page(request, get_feed_name(request))
+        html = ''.join(
+            render_to_string('posts/post_card.html', {'post': post}, request=request)
+            for post in page
+        )
+        return JsonResponse({
+            'html': html,
+            'next_cursor': page.next_cursor,
+            'has_next': page.has_next,
+        })
+
 class DeletePostView(LoginRequiredMixin, DeleteView):
     """Supprimer un post"""
     model = Post
@@ -162,45 +176,20 @@ class ToggleReactionView(LoginRequiredMixin, View):
     http_method_names = ['post']
 
     def post(self, request, *args, **kwargs):
-        post_id = kwargs.get('post_id')
-        post = get_object_or_404(Post, id=post_id)
         reaction_type = request.POST.get('reaction_type', 'LIKE')
+        if reaction_type not in REACTION_COUNT_FIELDS:
+            return JsonResponse({
+                'success': False,
+                'error': 'Type de réaction invalide.'
+            }, status=400)
 
-        # Vérifier si l'utilisateur a déjà réagi
-        existing_reaction = Reaction.objects.filter(user=request.user, post=post).first()
-
-        if existing_reaction:
-            if existing_reaction.reaction_type == reaction_type:
-                # Supprimer la réaction si c'est la même
-                existing_reaction.delete()
-                action = 'removed'
-            else:
-                # Modifier le type de réaction
-                existing_reaction.reaction_type = reaction_type
-                existing_reaction.save()
-                action = 'updated'
-        else:
-            # Créer une nouvelle réaction
-            Reaction.objects.create(
-                user=request.user,
-                post=post,
-                reaction_type=reaction_type
-            )
-            action = 'added'
-
-        # Récupérer les statistiques des réactions
-        reactions_stats = post.reactions.values('reaction_type').annotate(
-            count=Count('reaction_type')
-        ).order_by('-count')
-
-        # Vérifier si l'utilisateur actuel a réagi
-        user_reaction = post.reactions.filter(user=request.user).first()
+        post, action, user_reaction = toggle_reaction(request.user, kwargs.get('post_id'), reaction_type)
 
         return JsonResponse({
             'success': True,
             'action': action,
             'reaction_type': reaction_type,
-            'user_reaction': user_reaction.reaction_type if user_reaction else None,
-            'reactions_stats': list(reactions_stats),
-            'total_reactions': post.reactions.count()
+            'user_reaction': user_reaction,
+            'reactions_stats': post.get_reactions_stats(),
+            'total_reactions': post.reactions_count
         })